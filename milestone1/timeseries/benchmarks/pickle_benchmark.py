@@ -0,0 +1,49 @@
+"""
+Serialization throughput of the timeseries classes.
+
+Compares pickling an ArrayTimeSeries with protocol 4, protocol 5 in-band
+and protocol 5 out-of-band (buffers handed over as a transport would),
+against the list-based pickling of the same data the series used before
+__reduce_ex__ (a pickled object per float). Run from milestone1/timeseries:
+
+    PYTHONPATH=. python benchmarks/pickle_benchmark.py [n]
+"""
+
+import pickle
+import sys
+import timeit
+import numpy as np
+from timeseries.ArrayTimeSeries import ArrayTimeSeries
+
+
+def throughput(roundtrip, nbytes, repeat=5):
+    """
+    best MB/s of a dumps/loads round trip over repeat runs
+    """
+    best = min(timeit.repeat(roundtrip, number=1, repeat=repeat))
+    return nbytes / best / 1e6
+
+
+def main(n):
+    ts = ArrayTimeSeries(np.arange(n, dtype=float), np.random.rand(n))
+    nbytes = ts._times.nbytes + ts.values().nbytes
+    lists = (ts._times.tolist(), ts.values().tolist())
+
+    def out_of_band():
+        buffers = []
+        data = pickle.dumps(ts, protocol=5, buffer_callback=buffers.append)
+        return pickle.loads(data, buffers=buffers)
+
+    cases = [
+        ('lists, protocol 4', lambda: pickle.loads(pickle.dumps(lists, protocol=4))),
+        ('protocol 4', lambda: pickle.loads(pickle.dumps(ts, protocol=4))),
+        ('protocol 5 in-band', lambda: pickle.loads(pickle.dumps(ts, protocol=5))),
+        ('protocol 5 out-of-band', out_of_band),
+    ]
+    print('{} points, {:.1f} MB of arrays'.format(n, nbytes / 1e6))
+    for name, roundtrip in cases:
+        print('{:<24}{:>12.1f} MB/s'.format(name, throughput(roundtrip, nbytes)))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 7)
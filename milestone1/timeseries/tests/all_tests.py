@@ -598,8 +598,9 @@ class TestTSBinaryOperators(unittest.TestCase):
                 expr + [1, 2, 3, 4]
             # with self.assertRaises(NotImplementedError):
             #    [1, 2, 3, 4] + expr
-            with self.assertRaises(NotImplementedError):
-                expr + np.array([1, 2, 3, 4])
+            # arrays are added elementwise like in numpy, if of the same length
+            with self.assertRaises(ValueError):
+                expr + np.array([1, 2, 3])
 
             scores.append( ('#ts', 'add not impl', 0))
 
@@ -712,8 +713,8 @@ class TestTSBinaryOperators(unittest.TestCase):
             ts = ts_class([1, 2, 3, 4], [0.1, 0.2, 0.3, 0.4])
             with self.assertRaises(NotImplementedError):
                 ts - [1, 2, 3, 4]
-            with self.assertRaises(NotImplementedError):
-                ts - np.array([1, 2, 3, 4])
+            with self.assertRaises(ValueError):
+                ts - np.array([1, 2, 3])
             scores.append(('#ts', 'sub array list', 1))
 
     @score(2)
@@ -766,8 +767,8 @@ class TestTSBinaryOperators(unittest.TestCase):
             ts = ts_class([1, 2, 3, 4], [0.1, 0.2, 0.3, 0.4])
             with self.assertRaises(NotImplementedError):
                 ts * [1, 2, 3, 4]
-            with self.assertRaises(NotImplementedError):
-                ts * np.array([1, 2, 3, 4])
+            with self.assertRaises(ValueError):
+                ts * np.array([1, 2, 3])
             scores.append(('#ts', '%s class should throw when multiplying with list/array' % i, 1))
 
     @score(2)
@@ -0,0 +1,558 @@
+import array
+import os
+import tempfile
+import unittest
+import numpy as np
+from timeseries.ArrayTimeSeries import ArrayTimeSeries
+from timeseries.RegularTimeSeries import RegularTimeSeries
+
+
+def scalar_interpolate(times, values, t):
+    """ Reference point-by-point interpolation with boundary clamping. """
+    ind_r = np.searchsorted(times, t, side='right')
+    if ind_r == 0:
+        return values[0]
+    if ind_r == len(times):
+        return values[-1]
+    return values[ind_r - 1] + (values[ind_r] - values[ind_r - 1]) / \
+        (times[ind_r] - times[ind_r - 1]) * (t - times[ind_r - 1])
+
+
+class TestArrayTimeSeriesInterpolation(unittest.TestCase):
+
+    def test_interpolation_matches_pointwise_reference(self):
+        rng = np.random.RandomState(0)
+        times = np.cumsum(rng.uniform(0.1, 1.0, 100))
+        values = rng.normal(size=100)
+        ts = ArrayTimeSeries(times, values)
+        grid = np.linspace(times[0] - 5, times[-1] + 5, 1000)
+        result = ts.interpolate(grid)
+        expected = [scalar_interpolate(times, values, t) for t in grid]
+        self.assertTrue(np.allclose(result.values(), expected))
+        self.assertTrue(np.array_equal(result.times(), grid))
+
+    def test_interpolation_with_unsorted_grid(self):
+        ts = ArrayTimeSeries([0, 5, 10], [1, 2, 3])
+        result = ts.interpolate([7.5, -100, 2.5, 100])
+        self.assertEqual(list(result.times()), [-100, 2.5, 7.5, 100])
+        self.assertEqual(list(result.values()), [1, 1.5, 2.5, 3])
+
+    def test_interpolation_with_single_point(self):
+        ts = ArrayTimeSeries([1], [4.0])
+        self.assertEqual(list(ts.interpolate([0, 1, 2]).values()), [4.0, 4.0, 4.0])
+
+    def test_interpolation_does_not_alias_grid(self):
+        grid = np.array([1.0, 2.0])
+        result = ArrayTimeSeries([0, 5, 10], [1, 2, 3]).interpolate(grid)
+        grid[0] = 42.0
+        self.assertEqual(result.times()[0], 1.0)
+
+
+class TestArrayTimeSeriesConstruction(unittest.TestCase):
+
+    def test_copy_false_shares_ndarray_memory(self):
+        times = np.arange(5, dtype=float)
+        values = np.ones(5)
+        ts = ArrayTimeSeries(times, values, copy=False)
+        self.assertTrue(np.shares_memory(ts.times(), times))
+        self.assertTrue(np.shares_memory(ts.values(), values))
+
+    def test_default_copies_ndarray(self):
+        values = np.ones(5)
+        ts = ArrayTimeSeries(np.arange(5), values)
+        self.assertFalse(np.shares_memory(ts.values(), values))
+
+    def test_construction_from_buffers(self):
+        times = array.array('d', [0.0, 1.0, 2.0])
+        values = array.array('d', [4.0, 5.0, 6.0])
+        ts = ArrayTimeSeries(memoryview(times), values, copy=False)
+        values[1] = 42.0
+        self.assertEqual(ts[1], 42.0)
+        self.assertEqual(list(ts.times()), [0.0, 1.0, 2.0])
+
+    def test_construction_from_generic_iterables(self):
+        ts = ArrayTimeSeries({1: 0, 2: 0}.keys(), {1: 3, 2: 4}.values())
+        self.assertEqual(list(ts.items()), [(1.0, 3.0), (2.0, 4.0)])
+
+    def test_unsorted_times_are_reordered(self):
+        times = np.array([2.0, 0.0, 1.0])
+        ts = ArrayTimeSeries(times, [20, 0, 10], copy=False)
+        self.assertEqual(list(ts.times()), [0.0, 1.0, 2.0])
+        self.assertEqual(list(ts.values()), [0.0, 10.0, 20.0])
+        self.assertEqual(list(times), [2.0, 0.0, 1.0])
+
+
+class TestArrayTimeSeriesSharedTimeAxis(unittest.TestCase):
+
+    def test_derived_series_share_time_axis(self):
+        ts = ArrayTimeSeries([1, 2, 3], [1, 2, 3])
+        for derived in [ts + 1, ts - ts, ts * 2.0, -ts, +ts]:
+            self.assertIs(derived.times(), ts.times())
+
+    def test_time_axis_is_read_only(self):
+        times = np.array([1.0, 2.0, 3.0])
+        ts = ArrayTimeSeries(times, [1, 2, 3], copy=False)
+        with self.assertRaises(ValueError):
+            ts.times()[0] = 0.0
+        times[0] = 0.0
+        self.assertEqual(ts.times()[0], 0.0)
+
+    def test_interpolation_onto_shared_grid(self):
+        grid = ArrayTimeSeries([0, 1, 2], [0, 0, 0])
+        a = ArrayTimeSeries([0, 2], [0, 2]).interpolate(grid.times())
+        b = ArrayTimeSeries([0, 2], [2, 0]).interpolate(grid.times())
+        self.assertIs(a.times(), grid.times())
+        self.assertEqual(list((a + b).values()), [2.0, 2.0, 2.0])
+
+    def test_unrelated_series_are_still_compared(self):
+        a = ArrayTimeSeries([1, 2, 3], [1, 2, 3])
+        self.assertEqual(list((a + ArrayTimeSeries([1, 2, 3], [1, 1, 1])).values()), [2, 3, 4])
+        with self.assertRaises(ValueError):
+            a - ArrayTimeSeries([1, 2, 4], [1, 1, 1])
+        with self.assertRaises(ValueError):
+            a * ArrayTimeSeries([1, 2, 4], [1, 1, 1])
+
+
+class TestArrayTimeSeriesTimeIndexing(unittest.TestCase):
+
+    def setUp(self):
+        self.ts = ArrayTimeSeries([0.5, 0.7, 0.8, 1.0], [0.5, 1., 2., 4.])
+
+    def test_at(self):
+        self.assertEqual(self.ts.at(0.8), 2.0)
+        self.assertEqual(self.ts.at(0.1 + 0.7), 2.0)
+        with self.assertRaises(KeyError):
+            self.ts.at(0.75)
+
+    def test_between_is_inclusive(self):
+        window = self.ts.between(0.7, 1.0)
+        self.assertEqual(list(window.times()), [0.7, 0.8, 1.0])
+        self.assertEqual(list(self.ts.between(None, 0.6).values()), [0.5])
+        self.assertEqual(len(self.ts.between(2, 3)), 0)
+
+    def test_slices_are_time_based(self):
+        self.assertEqual(list(self.ts[0.6:0.8].values()), [1.0, 2.0])
+        self.assertEqual(list(self.ts[0.75:].values()), [2.0, 4.0])
+        with self.assertRaises(ValueError):
+            self.ts[0.5:1.0:2]
+
+    def test_window_is_a_view(self):
+        window = self.ts[0.7:0.8]
+        self.assertTrue(np.shares_memory(window.values(), self.ts.values()))
+        window[0] = -1.0
+        self.assertEqual(self.ts[1], -1.0)
+
+
+class TestArrayTimeSeriesInPlace(unittest.TestCase):
+
+    def test_inplace_operators_reuse_buffer(self):
+        ts = ArrayTimeSeries([1, 2, 3], [1.0, 2.0, 3.0])
+        buffer = ts.values()
+        ts += 1
+        ts *= ts
+        ts -= 0.5
+        self.assertIs(ts.values(), buffer)
+        self.assertEqual(list(ts.values()), [3.5, 8.5, 15.5])
+
+    def test_inplace_operators_keep_errors(self):
+        ts = ArrayTimeSeries([1, 2, 3], [1.0, 2.0, 3.0])
+        with self.assertRaises(ValueError):
+            ts += ArrayTimeSeries([1, 2], [1.0, 2.0])
+        with self.assertRaises(TypeError):
+            ts *= 'Hello'
+        with self.assertRaises(NotImplementedError):
+            ts -= [1, 2, 3]
+
+    def test_out_buffer(self):
+        a = ArrayTimeSeries([1, 2, 3], [1.0, 2.0, 3.0])
+        b = a * 0
+        buffer = b.values()
+        result = a.add(a, out=b)
+        self.assertIs(result, b)
+        self.assertIs(b.values(), buffer)
+        self.assertEqual(list(b.values()), [2.0, 4.0, 6.0])
+        self.assertEqual(list(a.sub(1, out=b).values()), [0.0, 1.0, 2.0])
+        self.assertEqual(list(a.mul(a, out=b).values()), [1.0, 4.0, 9.0])
+        self.assertEqual(list(a.values()), [1.0, 2.0, 3.0])
+
+    def test_out_buffer_must_be_aligned(self):
+        a = ArrayTimeSeries([1, 2, 3], [1.0, 2.0, 3.0])
+        with self.assertRaises(ValueError):
+            a.add(1, out=ArrayTimeSeries([1, 2], [0.0, 0.0]))
+        with self.assertRaises(TypeError):
+            a.add(1, out=np.zeros(3))
+
+
+class TestArrayTimeSeriesAlignment(unittest.TestCase):
+
+    def setUp(self):
+        self.a = ArrayTimeSeries([0, 1, 2, 3], [0, 10, 20, 30])
+        self.b = ArrayTimeSeries([1, 2.5, 3], [1, 2, 3])
+
+    def test_exact_alignment_is_default(self):
+        with self.assertRaises(ValueError):
+            self.a.add(self.b)
+
+    def test_inner_join(self):
+        result = self.a.sub(self.b, how='inner')
+        self.assertEqual(list(result.times()), [1.0, 3.0])
+        self.assertEqual(list(result.values()), [9.0, 27.0])
+
+    def test_outer_join_interpolates(self):
+        result = self.a.add(self.b, how='outer')
+        self.assertEqual(list(result.times()), [0.0, 1.0, 2.0, 2.5, 3.0])
+        self.assertTrue(np.allclose(result.values(), [1.0, 11.0, 20 + 5 / 3., 27.0, 33.0]))
+
+    def test_asof_join_uses_previous_value(self):
+        result = self.a.mul(self.b, how='asof')
+        self.assertIs(result.times(), self.a.times())
+        self.assertTrue(np.isnan(result[0]))
+        self.assertEqual(list(result.values()[1:]), [10.0, 20.0, 90.0])
+
+    def test_asof_join_integer_values(self):
+        a = ArrayTimeSeries([0, 1, 2, 3], [0, 10, 20, 30], dtype=int)
+        b = ArrayTimeSeries([1, 2.5, 3], [1, 2, 3], dtype=int)
+        result = a.mul(b, how='asof')
+        self.assertEqual(result.values().dtype, float)
+        self.assertTrue(np.isnan(result[0]))
+        self.assertEqual(list(result.values()[1:]), [10.0, 20.0, 90.0])
+        result = a.add(ArrayTimeSeries([0, 5], [1, 2], dtype=np.float32), how='asof')
+        self.assertEqual(list(result.values()), [1.0, 11.0, 21.0, 31.0])
+
+    def test_join_with_empty_series(self):
+        empty = ArrayTimeSeries([], [])
+        self.assertEqual(len(self.a.add(empty, how='inner')), 0)
+        self.assertEqual(len(empty.add(empty, how='outer')), 0)
+
+    def test_invalid_policy(self):
+        with self.assertRaises(ValueError):
+            self.a.add(self.b, how='left')
+
+
+class TestArrayTimeSeriesDtypes(unittest.TestCase):
+
+    def setUp(self):
+        self.times = np.array(['2020-01-01T00:00', '2020-01-01T00:10', '2020-01-01T00:20'],
+                              dtype='datetime64[ns]')
+        self.ts = ArrayTimeSeries(self.times, [1, 2, 3], dtype=np.float32, time_dtype='datetime64[ns]')
+
+    def test_defaults_are_float64(self):
+        ts = ArrayTimeSeries([1, 2], [1, 2])
+        self.assertEqual(ts.times().dtype, np.float64)
+        self.assertEqual(ts.values().dtype, np.float64)
+
+    def test_dtypes_are_kept(self):
+        self.assertEqual(self.ts.times().dtype, np.dtype('datetime64[ns]'))
+        self.assertEqual(self.ts.values().dtype, np.float32)
+
+    def test_statistics_keep_dtype(self):
+        self.assertEqual(self.ts.mean().dtype, np.float32)
+        self.assertEqual(self.ts.median().dtype, np.float32)
+        self.assertEqual(self.ts.std().dtype, np.float32)
+
+    def test_operators_keep_dtype(self):
+        for result in [self.ts + self.ts, self.ts * 2.5, self.ts - self.ts.mean(), -self.ts, +self.ts]:
+            self.assertEqual(result.values().dtype, np.float32)
+        self.ts += 1
+        self.assertEqual(self.ts.values().dtype, np.float32)
+
+    def test_operators_promote(self):
+        ts64 = ArrayTimeSeries(self.times, [1, 2, 3], time_dtype='datetime64[ns]')
+        self.assertEqual((self.ts + ts64).values().dtype, np.float64)
+        self.assertEqual((self.ts * np.float64(2)).values().dtype, np.float64)
+
+    def test_interpolation_on_datetime_axis(self):
+        grid = np.array(['2020-01-01T00:05', '2020-01-01T00:30'], dtype='datetime64[ns]')
+        result = self.ts.interpolate(grid)
+        self.assertEqual(result.values().dtype, np.float32)
+        self.assertEqual(list(result.values()), [1.5, 3.0])
+
+    def test_interpolation_on_integer_axis(self):
+        ts = ArrayTimeSeries([0, 10 ** 18], [0.0, 1.0], time_dtype=np.int64)
+        self.assertEqual(ts.interpolate([5 * 10 ** 17]).values()[0], 0.5)
+
+    def test_time_lookup_on_datetime_axis(self):
+        self.assertEqual(self.ts.at(np.datetime64('2020-01-01T00:10')), 2.0)
+        self.assertEqual(list(self.ts.between(self.times[1], None).values()), [2.0, 3.0])
+
+    def test_alignment_keeps_dtype(self):
+        for how in ['inner', 'outer', 'asof']:
+            self.assertEqual(self.ts.add(self.ts, how=how).values().dtype, np.float32)
+
+
+class TestArrayTimeSeriesStatistics(unittest.TestCase):
+
+    def setUp(self):
+        self.ts = ArrayTimeSeries([0, 1, 2, 3], [4.0, 1.0, 3.0, 2.0])
+
+    def test_repeated_reads_are_cached(self):
+        self.assertEqual(self.ts.median(), 2.5)
+        self.ts._values = None
+        self.assertEqual(self.ts.median(), 2.5)
+
+    def test_setitem_invalidates(self):
+        self.assertEqual(self.ts.mean(), 2.5)
+        self.ts[0] = 8.0
+        self.assertEqual(self.ts.mean(), 3.5)
+        self.assertEqual(self.ts.median(), 2.5)
+        self.assertAlmostEqual(abs(self.ts), np.sqrt(78.0))
+
+    def test_in_place_invalidates(self):
+        self.assertEqual(self.ts.std(), np.std([4.0, 1.0, 3.0, 2.0]))
+        self.ts *= 2
+        self.assertEqual(self.ts.std(), np.std([8.0, 2.0, 6.0, 4.0]))
+        out = ArrayTimeSeries([0, 1, 2, 3], [0.0, 0.0, 0.0, 0.0])
+        self.assertEqual(out.mean(), 0.0)
+        self.ts.add(1, out=out)
+        self.assertEqual(out.mean(), 6.0)
+
+    def test_writes_through_views_invalidate(self):
+        self.assertEqual(self.ts.mean(), 2.5)
+        window = self.ts.between(1, 2)
+        self.assertEqual(window.mean(), 2.0)
+        window[0] = 5.0
+        self.assertEqual(self.ts.mean(), 3.5)
+        self.ts[2] = 1.0
+        self.assertEqual(window.mean(), 3.0)
+
+    def test_invalidate(self):
+        self.assertEqual(self.ts.mean(), 2.5)
+        self.ts.values()[:] = 0.0
+        self.ts.invalidate()
+        self.assertEqual(self.ts.mean(), 0.0)
+
+
+class TestArrayTimeSeriesQuantiles(unittest.TestCase):
+
+    def setUp(self):
+        self.values = np.random.RandomState(0).uniform(size=10001)
+        self.ts = ArrayTimeSeries(range(len(self.values)), self.values)
+
+    def test_exact(self):
+        qs = [0.1, 0.5, 0.9]
+        self.assertTrue(np.allclose(self.ts.quantiles(qs), np.quantile(self.values, qs)))
+        self.assertEqual(self.ts.median(), np.median(self.values))
+        self.assertEqual(self.ts.quantile(1.0), self.values.max())
+        with self.assertRaises(ValueError):
+            self.ts.quantile(2)
+
+    def test_approximate(self):
+        self.assertAlmostEqual(self.ts.quantile(0.5, approx=True), self.ts.median(), places=2)
+        self.assertIs(self.ts.sketch(), self.ts.sketch())
+
+    def test_mutation_invalidates(self):
+        sketch = self.ts.sketch()
+        median = self.ts.median()
+        self.ts *= 2
+        self.assertIsNot(self.ts.sketch(), sketch)
+        self.assertEqual(self.ts.median(), 2 * median)
+
+    def test_sketches_merge_across_series(self):
+        other = ArrayTimeSeries(range(10001), self.values + 1)
+        merged = self.ts.sketch().merge(other.sketch())
+        self.assertAlmostEqual(merged.quantile(0.5), 1.0, places=2)
+
+
+class TestArrayTimeSeriesResample(unittest.TestCase):
+
+    def setUp(self):
+        self.ts = ArrayTimeSeries([0.0, 0.5, 1.2, 3.9, 4.0], [1.0, 2.0, 3.0, 4.0, 5.0])
+
+    def test_single_aggregation(self):
+        result = self.ts.resample(1.0)
+        self.assertIsInstance(result, RegularTimeSeries)
+        self.assertEqual((result.start, result.step), (0.0, 1.0))
+        self.assertTrue(np.array_equal(result.values(), [1.5, 3.0, np.nan, 4.0, 5.0], equal_nan=True))
+
+    def test_all_aggregations_at_once(self):
+        result = self.ts.resample(2.0, how=['mean', 'min', 'max', 'last', 'count', 'sum'], origin=-1.0)
+        self.assertEqual(result['count'].values().tolist(), [2, 1, 2])
+        self.assertEqual(result['sum'].values().tolist(), [3.0, 3.0, 9.0])
+        self.assertEqual(result['min'].values().tolist(), [1.0, 3.0, 4.0])
+        self.assertEqual(result['max'].values().tolist(), [2.0, 3.0, 5.0])
+        self.assertEqual(result['last'].values().tolist(), [2.0, 3.0, 5.0])
+        self.assertEqual(result['mean'].start, -1.0)
+
+    def test_matches_python_loop(self):
+        rng = np.random.RandomState(0)
+        times = np.sort(rng.uniform(0, 100, 1000))
+        ts = ArrayTimeSeries(times, rng.normal(size=1000))
+        result = ts.resample(7.0, how='mean', origin=0.0)
+        for i, value in enumerate(result.values()):
+            window = ts.values()[(times >= 7.0 * i) & (times < 7.0 * (i + 1))]
+            self.assertAlmostEqual(value, window.mean())
+
+    def test_datetime_axis(self):
+        times = np.array(['2020-01-01T00:00', '2020-01-01T00:07', '2020-01-01T00:31'], dtype='datetime64[ns]')
+        ts = ArrayTimeSeries(times, [1.0, 2.0, 3.0], time_dtype=times.dtype)
+        result = ts.resample(np.timedelta64(10, 'm'), how=['count', 'last'])
+        self.assertEqual(result['count'].values().tolist(), [2, 0, 0, 1])
+        self.assertIs(result['count'].times(), result['last'].times())
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            self.ts.resample(1.0, how='median')
+        with self.assertRaises(ValueError):
+            self.ts.resample(0)
+
+
+class TestArrayTimeSeriesChunks(unittest.TestCase):
+
+    def setUp(self):
+        self.ts = ArrayTimeSeries(np.arange(10), np.arange(10) * 2.0)
+
+    def test_chunks_are_views(self):
+        chunks = list(self.ts.iterchunks(4))
+        self.assertEqual([len(v) for t, v in chunks], [4, 4, 2])
+        for t, v in chunks:
+            self.assertTrue(np.shares_memory(v, self.ts.values()))
+            self.assertTrue(np.shares_memory(t, self.ts.times()))
+        self.assertEqual(np.concatenate([v for t, v in chunks]).tolist(), self.ts.values().tolist())
+        self.assertEqual(chunks[2][0].tolist(), [8.0, 9.0])
+
+    def test_blocks(self):
+        blocks = list(self.ts.iterblocks())
+        self.assertEqual(len(blocks), 1)
+        self.assertIs(blocks[0][1], self.ts.values())
+
+    def test_invalid_size(self):
+        with self.assertRaises(ValueError):
+            list(self.ts.iterchunks(0))
+
+    def test_empty(self):
+        self.assertEqual(list(ArrayTimeSeries([], []).iterchunks(3)), [])
+
+
+class TestArrayTimeSeriesNumpyProtocols(unittest.TestCase):
+
+    def setUp(self):
+        self.ts = ArrayTimeSeries([1, 2, 3], [1.0, 2.0, 4.0])
+
+    def test_ufuncs_keep_time_axis(self):
+        result = np.log(self.ts)
+        self.assertIsInstance(result, ArrayTimeSeries)
+        self.assertIs(result.times(), self.ts.times())
+        self.assertTrue(np.allclose(result.values(), np.log([1.0, 2.0, 4.0])))
+        other = ArrayTimeSeries._from_arrays(self.ts.times(), np.array([3.0, 3.0, 3.0]))
+        self.assertEqual(np.maximum(self.ts, other).values().tolist(), [3.0, 3.0, 4.0])
+        self.assertEqual(np.add.accumulate(self.ts).values().tolist(), [1.0, 3.0, 7.0])
+        with self.assertRaises(ValueError):
+            np.add(self.ts, ArrayTimeSeries([5, 6, 7], [1.0, 1.0, 1.0]))
+
+    def test_out_writes_in_place(self):
+        values = self.ts.values()
+        self.assertEqual(self.ts.mean(), 7.0 / 3)
+        self.assertIs(np.multiply(self.ts, 2, out=self.ts), self.ts)
+        self.assertIs(self.ts.values(), values)
+        self.assertEqual(self.ts.mean(), 14.0 / 3)
+
+    def test_functions(self):
+        self.assertEqual(np.sum(self.ts), 7.0)
+        self.assertEqual(np.mean(self.ts), 7.0 / 3)
+        clipped = np.clip(self.ts, 1.5, 3)
+        self.assertIsInstance(clipped, ArrayTimeSeries)
+        self.assertEqual(clipped.values().tolist(), [1.5, 2.0, 3.0])
+        # reordering functions return plain arrays, their values no longer line up with the time points
+        self.assertIsInstance(np.sort(self.ts), np.ndarray)
+
+    def test_inplace_functions_invalidate_statistics(self):
+        self.assertEqual(self.ts.mean(), 7.0 / 3)
+        np.copyto(self.ts, np.array([10.0, 10.0, 10.0]))
+        self.assertEqual(self.ts.mean(), 10.0)
+        np.put(self.ts, [0], [1.0])
+        self.assertEqual(self.ts.mean(), 7.0)
+        np.place(self.ts, self.ts.values() > 5, [4.0])
+        self.assertEqual(self.ts.mean(), 3.0)
+        np.putmask(self.ts, self.ts.values() > 3, 7.0)
+        self.assertEqual(self.ts.mean(), 5.0)
+        np.copyto(dst=self.ts, src=np.zeros(3))
+        self.assertEqual(self.ts.mean(), 0.0)
+
+    def test_out_argument_invalidates_statistics(self):
+        self.assertEqual(self.ts.mean(), 7.0 / 3)
+        self.assertIs(np.clip(self.ts, 0, 1, out=self.ts), self.ts)
+        self.assertEqual(self.ts.mean(), 1.0)
+        np.cumsum(self.ts, out=self.ts)
+        self.assertEqual(self.ts.mean(), 2.0)
+
+    def test_where(self):
+        indices = np.where(np.greater(self.ts, 1.5))
+        self.assertIsInstance(indices, tuple)
+        self.assertIsInstance(indices[0], np.ndarray)
+        self.assertEqual(indices[0].tolist(), [1, 2])
+        chosen = np.where(np.greater(self.ts, 1.5), self.ts, 0.0)
+        self.assertIsInstance(chosen, ArrayTimeSeries)
+        self.assertEqual(chosen.values().tolist(), [0.0, 2.0, 4.0])
+
+    def test_array_conversion_does_not_copy(self):
+        self.assertIs(np.asarray(self.ts), self.ts.values())
+        self.assertFalse(np.shares_memory(np.array(self.ts), self.ts.values()))
+
+    def test_operators_with_arrays(self):
+        array = np.array([1.0, 1.0, 2.0])
+        self.assertEqual((self.ts + array).values().tolist(), (array + self.ts).values().tolist())
+        self.assertEqual((self.ts - array).values().tolist(), [0.0, 1.0, 2.0])
+        self.assertEqual((self.ts * array).values().tolist(), [1.0, 2.0, 8.0])
+        self.assertIsInstance(self.ts * array, ArrayTimeSeries)
+        with self.assertRaises(ValueError):
+            self.ts + np.array([1.0, 2.0])
+        with self.assertRaises(NotImplementedError):
+            self.ts + [1.0, 2.0, 3.0]
+
+
+class TestArrayTimeSeriesMemmap(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.times = np.arange(1000, dtype=np.int64)
+        self.values = np.sin(np.arange(1000) / 10.0)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.dir.name, name)
+
+    def test_npy_files(self):
+        np.save(self.path('t.npy'), self.times)
+        np.save(self.path('v.npy'), self.values)
+        ts = ArrayTimeSeries.from_memmap(self.path('t.npy'), self.path('v.npy'))
+        self.assertIsInstance(ts.values(), np.memmap)
+        self.assertEqual(ts.times().dtype, np.int64)
+        self.assertAlmostEqual(ts.mean(), self.values.mean())
+        window = ts.between(100, 109)
+        self.assertTrue(np.shares_memory(window.values(), ts.values()))
+        self.assertEqual(window.values().tolist(), self.values[100:110].tolist())
+        with self.assertRaises(ValueError):
+            ts[0] = 1.0
+        del ts, window
+
+    def test_raw_files_with_header(self):
+        for name, arr in (('t.raw', self.times), ('v.raw', self.values.astype(np.float32))):
+            with open(self.path(name), 'wb') as f:
+                f.write(b'HEADER..')
+                f.write(arr.tobytes())
+        ts = ArrayTimeSeries.from_memmap(self.path('t.raw'), self.path('v.raw'), dtype=np.float32,
+                                         time_dtype=np.int64, offset=8)
+        self.assertEqual(len(ts), 1000)
+        self.assertEqual(ts.at(10), np.float32(self.values[10]))
+        del ts
+
+    def test_writes_through(self):
+        np.save(self.path('t.npy'), self.times)
+        np.save(self.path('v.npy'), self.values)
+        ts = ArrayTimeSeries.from_memmap(self.path('t.npy'), self.path('v.npy'), mode='r+')
+        ts[0] = 42.0
+        ts.values().flush()
+        del ts
+        self.assertEqual(np.load(self.path('v.npy'))[0], 42.0)
+
+    def test_length_mismatch(self):
+        np.save(self.path('t.npy'), self.times)
+        np.save(self.path('v.npy'), self.values[:10])
+        with self.assertRaises(ValueError):
+            ArrayTimeSeries.from_memmap(self.path('t.npy'), self.path('v.npy'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+import numpy as np
+from timeseries.ArrayTimeSeries import ArrayTimeSeries
+from timeseries.CompressedTimeSeries import CompressedTimeSeries
+
+
+class TestCompressedTimeSeries(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        self.times = np.arange(0, 5000, 5, dtype=np.int64)
+        self.values = np.round(20 + np.cumsum(rng.normal(0, 0.1, len(self.times))), 1)
+        self.cts = CompressedTimeSeries(self.times, self.values, block_size=128, time_dtype=np.int64)
+
+    def test_round_trip_is_exact(self):
+        ts = self.cts.decompress()
+        self.assertIsInstance(ts, ArrayTimeSeries)
+        self.assertTrue(np.array_equal(ts.times(), self.times))
+        self.assertTrue(np.array_equal(ts.values(), self.values))
+        self.assertEqual(list(self.cts.itertimes()), self.times.tolist())
+        self.assertEqual(list(self.cts), self.values.tolist())
+
+    def test_round_trip_float_and_datetime_times(self):
+        for times in (np.linspace(0, 1, 300), np.arange(300).astype('datetime64[s]')):
+            ts = ArrayTimeSeries(times, np.sin(np.arange(300)), time_dtype=times.dtype)
+            cts = CompressedTimeSeries.from_series(ts, block_size=64)
+            self.assertTrue(np.array_equal(cts.times(), times))
+            self.assertTrue(np.array_equal(cts.values(), ts.values()))
+
+    def test_compresses_regular_series(self):
+        self.assertLess(self.cts.nbytes, self.times.nbytes + self.values.nbytes)
+
+    def test_statistics_from_block_summaries(self):
+        self.assertAlmostEqual(self.cts.mean(), self.values.mean())
+        self.assertAlmostEqual(self.cts.std(), self.values.std())
+        self.assertAlmostEqual(abs(self.cts), np.linalg.norm(self.values))
+        self.assertEqual(self.cts.median(), np.median(self.values))
+
+    def test_positional_and_time_access(self):
+        self.assertEqual(self.cts[0], self.values[0])
+        self.assertEqual(self.cts[300], self.values[300])
+        self.assertEqual(self.cts[-1], self.values[-1])
+        self.assertEqual(self.cts.at(1500), self.values[300])
+        with self.assertRaises(KeyError):
+            self.cts.at(1501)
+        with self.assertRaises(IndexError):
+            self.cts[len(self.values)]
+
+    def test_setitem_reencodes_block(self):
+        self.cts[300] = 1000.0
+        self.assertEqual(self.cts[300], 1000.0)
+        self.assertEqual(self.cts[301], self.values[301])
+        self.assertIn(1000.0, self.cts)
+        self.assertAlmostEqual(self.cts.mean(), (self.values.sum() - self.values[300] + 1000.0) / len(self.values))
+
+    def test_contains(self):
+        self.assertIn(self.values[700], self.cts)
+        self.assertNotIn(-1.0, self.cts)
+
+    def test_operators_inflate(self):
+        ts = self.cts + self.cts
+        self.assertIsInstance(ts, ArrayTimeSeries)
+        self.assertTrue(np.array_equal(ts.values(), 2 * self.values))
+        self.assertTrue(self.cts == ArrayTimeSeries(self.times, self.values, time_dtype=np.int64))
+
+    def test_empty(self):
+        cts = CompressedTimeSeries([], [])
+        self.assertEqual(len(cts), 0)
+        self.assertEqual(list(cts), [])
+        self.assertEqual(len(cts.decompress()), 0)
+
+
+class TestCompressedTimeSeriesQuantiles(unittest.TestCase):
+
+    def test_quantiles(self):
+        values = np.random.RandomState(0).uniform(size=3000)
+        cts = CompressedTimeSeries(range(3000), values, block_size=256)
+        self.assertEqual(cts.median(), np.median(values))
+        self.assertAlmostEqual(cts.quantile(0.9, approx=True), 0.9, places=1)
+        sketch = cts.sketch()
+        cts[0] = 5.0
+        self.assertIsNot(cts.sketch(), sketch)
+        self.assertEqual(cts.sketch().max, 5.0)
+
+
+class TestCompressedTimeSeriesChunks(unittest.TestCase):
+
+    def test_blocks_and_chunks(self):
+        cts = CompressedTimeSeries(range(10), range(10), block_size=3)
+        self.assertEqual([len(v) for t, v in cts.iterblocks()], [3, 3, 3, 1])
+        chunks = list(cts.iterchunks(4))
+        self.assertEqual([v.tolist() for t, v in chunks], [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]])
+        self.assertEqual([t.tolist() for t, v in chunks][-1], [8.0, 9.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
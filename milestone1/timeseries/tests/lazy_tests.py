@@ -0,0 +1,442 @@
+import operator
+import pickle
+import sys
+import threading
+import time
+import unittest
+import weakref
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import numpy as np
+from timeseries.ArrayTimeSeries import ArrayTimeSeries
+from timeseries.CompressedTimeSeries import CompressedTimeSeries
+from timeseries.RegularTimeSeries import RegularTimeSeries
+from timeseries.TimeSeries import TimeSeries
+from timeseries.fused import evaluate
+from timeseries.lazy import LazyOperation, lazy
+
+
+class TestLazyArithmetic(unittest.TestCase):
+
+    def setUp(self):
+        n = 10000
+        self.a = ArrayTimeSeries(np.arange(n), np.random.rand(n))
+        self.b = self.a._wrap(np.random.rand(n))
+        self.c = self.a._wrap(np.random.rand(n))
+        self.d = self.a._wrap(np.random.rand(n))
+
+    def test_builds_tree(self):
+        expr = (self.a.lazy * 2 + self.b - self.c) * self.d
+        self.assertIsInstance(expr, LazyOperation)
+        self.assertIsInstance(-expr, LazyOperation)
+        self.assertIsInstance(1 + expr, LazyOperation)
+
+    def test_fused_matches_eager(self):
+        a, b, c, d = self.a, self.b, self.c, self.d
+        result = ((a.lazy * 2 + b - c) * d).eval()
+        self.assertIsInstance(result, ArrayTimeSeries)
+        self.assertTrue(np.allclose(result.values(), ((a * 2 + b - c) * d).values()))
+        self.assertTrue(result._same_axis(a))
+        result = (-(a.lazy - 1) + (+b.lazy) + 3).eval()
+        self.assertTrue(np.allclose(result.values(), (3 + -(a - 1) + b).values()))
+
+    def test_reflected_operators(self):
+        a = self.a
+        self.assertIs((2 * a.lazy)._function, operator.mul)
+        result = (2 * a.lazy).eval()
+        self.assertTrue(np.allclose(result.values(), (a * 2).values()))
+        result = (1 - a.lazy).eval()
+        self.assertTrue(np.allclose(result.values(), 1 - a.values()))
+        result = (1 - 2 * a.lazy + 3).optimize().eval()
+        self.assertTrue(np.allclose(result.values(), 4 - 2 * a.values()))
+        self.assertEqual((10 - LazyOperation(lambda: 2) * 3).eval(), 4)
+
+    def test_other_series_classes(self):
+        for ts in [TimeSeries([1, 2, 3], [1.0, 2.0, 3.0]), RegularTimeSeries([1.0, 2.0, 3.0], start=1)]:
+            result = (ts.lazy * ts + 1).eval()
+            self.assertIs(type(result), type(ts))
+            self.assertEqual(list(result.values()), [2.0, 5.0, 10.0])
+
+    def test_repeated_leaves(self):
+        a = self.a
+        result = (a.lazy * a.lazy - a).eval()
+        self.assertTrue(np.allclose(result.values(), (a * a - a).values()))
+
+    def test_lazy_leaves(self):
+        @lazy
+        def shifted(ts, x):
+            return ts + x
+
+        result = (shifted(self.a, 1) * shifted(self.b, 2)).eval()
+        self.assertTrue(np.allclose(result.values(), ((self.a + 1) * (self.b + 2)).values()))
+
+    def test_dtype_preserved(self):
+        ts = ArrayTimeSeries([1, 2], [1.0, 2.0], dtype=np.float32)
+        self.assertEqual((ts.lazy * 2.5 + 1).eval().values().dtype, np.float32)
+
+    def test_not_fused(self):
+        # constants only, and series without fused evaluation, use their own operators
+        self.assertEqual((LazyOperation(lambda: 2) * 3 + 1).eval(), 7)
+        ts = CompressedTimeSeries([1, 2, 3], [1.0, 2.0, 3.0])
+        self.assertEqual(list((ts.lazy * 2).eval().values()), [2.0, 4.0, 6.0])
+
+    def test_errors(self):
+        other = ArrayTimeSeries([5, 6, 7], [1.0, 2.0, 3.0])
+        ts = ArrayTimeSeries([1, 2, 3], [1.0, 2.0, 3.0])
+        with self.assertRaises(ValueError):
+            (ts.lazy + other).eval()
+        with self.assertRaises(NotImplementedError):
+            (ts.lazy + [1, 2, 3]).eval()
+
+
+class TestLazyGraph(unittest.TestCase):
+
+    def setUp(self):
+        self.calls = []
+
+        @lazy
+        def normalize(ts):
+            self.calls.append(ts)
+            return (ts - ts.mean()) * (1 / ts.std())
+
+        self.normalize = normalize
+        self.ts = ArrayTimeSeries(np.arange(100), np.random.rand(100))
+
+    def test_shared_nodes_evaluated_once(self):
+        norm = self.normalize(self.ts)
+        graph = LazyOperation(lambda *xs: sum(x.mean() for x in xs), *[norm] * 10)
+        self.assertAlmostEqual(graph.eval(), 0.0)
+        self.assertEqual(len(self.calls), 1)
+        graph.eval()
+        self.assertEqual(len(self.calls), 2)
+
+    def test_shared_arithmetic(self):
+        shared = self.normalize(self.ts) * 2
+        graph = (shared + 1) * shared - LazyOperation(lambda x: x, shared)
+        x = self.normalize(self.ts).eval() * 2
+        self.assertTrue(np.allclose(graph.eval().values(), ((x + 1) * x - x).values()))
+        self.assertEqual(len(self.calls), 2)
+
+    def test_diamonds(self):
+        node = self.ts.lazy
+        for _ in range(40):
+            node = LazyOperation(lambda a, b: a, node, node)
+        self.assertIs(node.eval(cache=True), self.ts)
+        node.invalidate()
+        self.assertIs(node.eval(), self.ts)
+
+    def test_cache_and_invalidate(self):
+        norm = self.normalize(self.ts)
+        graph = norm + 1
+        first = graph.eval(cache=True)
+        self.assertIs(graph.eval(), first)
+        self.assertIs(norm.eval(), norm.eval(cache=True))
+        self.assertEqual(len(self.calls), 1)
+
+        self.ts[0] = 10.0
+        self.assertIs(graph.eval(), first)
+        graph.invalidate()
+        self.assertFalse(np.allclose(graph.eval().values(), first.values()))
+        self.assertEqual(len(self.calls), 2)
+
+
+class TestDeepGraphs(unittest.TestCase):
+
+    def setUp(self):
+        self.depth = 5 * sys.getrecursionlimit()
+        self.ts = ArrayTimeSeries([1, 2, 3], [0.0, 0.0, 0.0])
+
+    def test_deep_chain(self):
+        @lazy
+        def step(x):
+            return x + 1
+
+        node = self.ts.lazy
+        for _ in range(self.depth):
+            node = step(node)
+        self.assertEqual(list(node.eval(cache=True).values()), [self.depth] * 3)
+        node.invalidate()
+        self.assertEqual(node.eval()[1], self.depth)
+
+    def test_deep_arithmetic(self):
+        node = self.ts.lazy
+        for i in range(self.depth):
+            node = node + 1 if i % 2 else node * 1
+        self.assertEqual(node.eval()[0], self.depth // 2)
+
+    def test_intermediates_released(self):
+        results = []
+
+        @lazy
+        def step(x):
+            y = x + 1
+            results.append(weakref.ref(y))
+            return y
+
+        node = self.ts.lazy
+        for _ in range(10):
+            node = step(node)
+        result = node.eval()
+        self.assertEqual(sum(ref() is not None for ref in results), 1)
+        self.assertIs(results[-1](), result)
+
+
+@lazy
+def normalize(ts):
+    return (ts - ts.mean()) * (1 / ts.std())
+
+
+@lazy
+def correlate(a, b):
+    return (a * b).mean()
+
+
+@lazy
+def fail(x):
+    raise KeyError(x)
+
+
+def plain(x):
+    return x + 1
+
+
+lazy_plain = lazy(plain)
+
+
+class TestParallelEval(unittest.TestCase):
+
+    def setUp(self):
+        self.series = [ArrayTimeSeries(np.arange(1000), np.random.rand(1000)) for _ in range(8)]
+        norms = [normalize(ts) for ts in self.series]
+        self.graph = LazyOperation(lambda *xs: list(xs), *[correlate(a, b + 1) for a in norms for b in norms])
+
+    def test_thread_pool(self):
+        with ThreadPoolExecutor(4) as executor:
+            result = self.graph.eval(executor=executor)
+        self.assertTrue(np.allclose(result, self.graph.eval()))
+
+    def test_process_pool(self):
+        graph = correlate(normalize(self.series[0]), normalize(self.series[1]) * 2)
+        with ProcessPoolExecutor(2) as executor:
+            self.assertAlmostEqual(graph.eval(executor=executor), graph.eval())
+
+    def test_process_pool_lazy_property(self):
+        for ts in [self.series[0], TimeSeries([1, 2], [1.0, 2.0]), RegularTimeSeries([1.0, 2.0]),
+                   CompressedTimeSeries([1, 2], [1.0, 2.0])]:
+            graph = LazyOperation(len, ts.lazy * 2)
+            with ProcessPoolExecutor(2) as executor:
+                self.assertEqual(graph.eval(executor=executor), len(ts))
+        graph = self.series[0].lazy * 2 + self.series[0].lazy
+        with ProcessPoolExecutor(2) as executor:
+            self.assertTrue(np.allclose(graph.eval(executor=executor).values(), self.series[0].values() * 3))
+
+    def test_lazy_functions(self):
+        self.assertEqual(lazy(max)(1, 3).eval(), 3)
+        self.assertIs(pickle.loads(pickle.dumps(plain)), plain)
+        self.assertIs(pickle.loads(pickle.dumps(normalize)), normalize)
+        self.assertEqual(pickle.loads(pickle.dumps(lazy(max)))(1, 3).eval(), 3)
+        graph = LazyOperation(max, lazy_plain(1), lazy(max)(1, 2))
+        with ProcessPoolExecutor(2) as executor:
+            self.assertEqual(graph.eval(executor=executor), 2)
+
+    def test_max_pending(self):
+        lock = threading.Lock()
+        active = []
+        peak = []
+
+        @lazy
+        def work(i):
+            with lock:
+                active.append(i)
+                peak.append(len(active))
+            time.sleep(0.01)
+            with lock:
+                active.remove(i)
+            return i
+
+        graph = LazyOperation(lambda *xs: sum(xs), *[work(i) for i in range(20)])
+        with ThreadPoolExecutor(8) as executor:
+            self.assertEqual(graph.eval(executor=executor, max_pending=3), sum(range(20)))
+        self.assertEqual(max(peak), 3)
+
+    def test_max_pending_default(self):
+        class Recording(object):
+            def __init__(self, executor, max_workers=None):
+                self.executor = executor
+                self.futures = []
+                self.peak = 0
+                if max_workers is not None:
+                    self._max_workers = max_workers
+
+            def submit(self, function, *args, **kwargs):
+                self.futures.append(self.executor.submit(function, *args, **kwargs))
+                self.peak = max(self.peak, sum(not future.done() for future in self.futures))
+                return self.futures[-1]
+
+        def work(i):
+            time.sleep(0.02)
+            return i
+
+        with ThreadPoolExecutor(8) as pool:
+            # as many nodes in flight as the executor has workers
+            executor = Recording(pool, max_workers=2)
+            graph = LazyOperation(lambda *xs: sum(xs), *[LazyOperation(work, i) for i in range(20)])
+            self.assertEqual(graph.eval(executor=executor), sum(range(20)))
+            self.assertLessEqual(executor.peak, 2)
+            # executors of unknown size get every node ready
+            executor = Recording(pool)
+            self.assertEqual(graph.eval(executor=executor), sum(range(20)))
+            self.assertGreater(executor.peak, 8)
+
+    def test_dependencies(self):
+        order = []
+
+        @lazy
+        def record(name, *dependencies):
+            time.sleep(0.01 if name == 'slow' else 0)
+            order.append(name)
+            return name
+
+        slow = record('slow')
+        graph = record('last', record('after', slow), record('fast'))
+        with ThreadPoolExecutor(4) as executor:
+            self.assertEqual(graph.eval(executor=executor, cache=True), 'last')
+        self.assertLess(order.index('slow'), order.index('after'))
+        self.assertEqual(order[-1], 'last')
+        self.assertIs(slow.eval(), 'slow')
+
+    def test_exceptions(self):
+        graph = correlate(fail(1), normalize(self.series[0]))
+        with ThreadPoolExecutor(2) as executor:
+            with self.assertRaises(KeyError):
+                graph.eval(executor=executor)
+        with ProcessPoolExecutor(2) as executor:
+            with self.assertRaises(KeyError):
+                graph.eval(executor=executor)
+
+
+class TestOptimize(unittest.TestCase):
+
+    def setUp(self):
+        self.ts = ArrayTimeSeries(np.arange(10), np.random.rand(10))
+        self.calls = []
+
+        @lazy
+        def interpolate(ts, grid):
+            self.calls.append(grid)
+            return ts.interpolate(grid)
+
+        self.interpolate = interpolate
+
+    def assertSeriesEqual(self, a, b):
+        self.assertEqual(list(a.times()), list(b.times()))
+        self.assertTrue(np.allclose(a.values(), b.values()))
+
+    def test_constant_folding(self):
+        folded = ((LazyOperation(operator.neg, 3) * 2 - 1) * 2).optimize()
+        self.assertEqual(folded.eval(), -14)
+        self.assertEqual(folded._args, (-14,))
+        graph = LazyOperation(lambda x: x, 2) * 0 + (LazyOperation(operator.mul, 2, 3) - 1)
+        optimized = graph.optimize()
+        self.assertEqual(optimized._args[1], 5)
+        self.assertEqual(optimized.eval(), graph.eval())
+
+    def test_simplification(self):
+        x = self.ts.lazy
+        self.assertSeriesEqual((-(-x)).optimize().eval(), self.ts)
+        optimized = (-(-(x * 2))).optimize()
+        self.assertIs(optimized._function, operator.mul)
+        optimized = (x * 1 + 0).optimize()
+        self.assertIs(optimized._function, operator.pos)
+        self.assertIsNot(optimized.eval(), self.ts)
+
+        optimized = (x + 1 - 2 + 3.5).optimize()
+        self.assertEqual(optimized._args, (x, 2.5))
+        self.assertSeriesEqual(optimized.eval(), self.ts + 2.5)
+        optimized = (LazyOperation(operator.mul, 2, x * 3) * 0.5).optimize()
+        self.assertEqual(optimized._args, (x, 3.0))
+
+    def test_dtype_kept(self):
+        ts = ArrayTimeSeries([1, 2], [1, 2], dtype=int)
+        self.assertEqual((ts.lazy * 1.0).optimize().eval().values().dtype, float)
+        self.assertEqual((ts.lazy * 1).optimize().eval().values().dtype, int)
+
+    def test_common_subexpressions(self):
+        grid = [0.5, 1.5, 2.5]
+        graph = self.interpolate(self.ts, grid) * 2 - self.interpolate(self.ts, grid) * 2
+        self.assertTrue(np.allclose(graph.eval().values(), 0))
+        self.assertEqual(len(self.calls), 2)
+        # calls of other functions may have side effects and are only merged on request
+        optimized = graph.optimize()
+        self.assertIsNot(optimized._args[0], optimized._args[1])
+        optimized = graph.optimize(cse=True)
+        self.assertIs(optimized._args[0], optimized._args[1])
+        self.assertTrue(np.allclose(optimized.eval().values(), 0))
+        self.assertEqual(len(self.calls), 3)
+        # other arguments are other computations
+        graph = self.interpolate(self.ts, grid) - self.interpolate(self.ts, list(grid))
+        optimized = graph.optimize(cse=True)
+        self.assertIsNot(optimized._args[0], optimized._args[1])
+        x = self.ts.lazy
+        optimized = ((x + 1) * (x + 1) - x.between(2, 5) * x.between(2, 5)).optimize()
+        self.assertIs(optimized._args[0]._args[0], optimized._args[0]._args[1])
+
+    def test_impure_functions_not_merged(self):
+        graph = LazyOperation(np.random.rand, 5) - LazyOperation(np.random.rand, 5)
+        optimized = graph.optimize()
+        self.assertIsNot(optimized._args[0], optimized._args[1])
+        self.assertTrue(np.all(optimized.eval() != 0))
+
+    def test_range_pushdown(self):
+        other = self.ts._wrap(np.random.rand(10))
+        graph = ((self.ts.lazy * 2 + other) * self.ts).between(3, 6)
+        optimized = graph.optimize()
+        self.assertIs(optimized._function, operator.mul)
+        result = optimized.eval()
+        self.assertEqual(len(result), 4)
+        self.assertSeriesEqual(result, graph.eval())
+
+    def test_range_pushdown_scalar_operands(self):
+        @lazy
+        def mean(ts):
+            return ts.mean()
+
+        graph = (self.ts.lazy - mean(self.ts)).between(1, 2)
+        self.assertSeriesEqual(graph.optimize().eval(), graph.eval())
+
+    def test_range_on_shared_arithmetic(self):
+        shared = self.ts.lazy * 2
+        graph = LazyOperation(lambda a, b: len(a) + len(b), shared, shared.between(3, 6))
+        optimized = graph.optimize()
+        self.assertIs(optimized, graph)
+        self.assertEqual(optimized.eval(), 14)
+
+    def test_unchanged_graph_kept(self):
+        graph = self.interpolate(self.ts, [1.0]) * 2
+        self.assertIs(graph.optimize(), graph)
+        graph = (graph + 1) * 2
+        graph._args[0].eval(cache=True)
+        self.assertIs(graph.optimize(), graph)
+
+
+class TestFusedEvaluate(unittest.TestCase):
+
+    def test_blocks(self):
+        x = np.random.rand(1001)
+        y = np.random.rand(1001)
+        program = [(np.multiply, (0, 2)), (np.add, (3, 1)), (np.subtract, (4, 0)), (np.multiply, (5, 1))]
+        for block_size in [1, 7, 1000, 1001, 5000]:
+            result = evaluate(program, [x, y, 2.0], len(x), block_size=block_size)
+            self.assertTrue(np.allclose(result, (x * 2.0 + y - x) * y))
+
+    def test_empty(self):
+        result = evaluate([(np.negative, (0,))], [np.empty(0, dtype=np.float32)], 0)
+        self.assertEqual(len(result), 0)
+        self.assertEqual(result.dtype, np.float32)
+
+    def test_block_size(self):
+        with self.assertRaises(ValueError):
+            evaluate([(np.negative, (0,))], [np.zeros(3)], 3, block_size=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
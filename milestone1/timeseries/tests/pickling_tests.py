@@ -0,0 +1,66 @@
+import pickle
+import unittest
+import numpy as np
+from timeseries.ArrayTimeSeries import ArrayTimeSeries
+from timeseries.RegularTimeSeries import RegularTimeSeries
+from timeseries.TimeSeries import TimeSeries
+
+
+class TestPickling(unittest.TestCase):
+
+    def setUp(self):
+        self.ts = ArrayTimeSeries(np.arange(100), np.arange(100) / 10.0)
+
+    def test_roundtrip(self):
+        series = [self.ts, TimeSeries([3, 1, 2], [1.0, 2.0, 3.0]),
+                  RegularTimeSeries([1.0, 2.0, 3.0], start=5, step=0.5), ArrayTimeSeries([], [])]
+        for ts in series:
+            for protocol in (2, 4, 5):
+                loaded = pickle.loads(pickle.dumps(ts, protocol=protocol))
+                self.assertIs(type(loaded), type(ts))
+                self.assertEqual(loaded, ts)
+                self.assertEqual(list(loaded.times()), list(ts.times()))
+
+    def test_semantics_preserved(self):
+        loaded = pickle.loads(pickle.dumps(self.ts, protocol=5))
+        self.assertTrue(loaded.values().flags.writeable)
+        self.assertFalse(loaded._times.flags.writeable)
+        self.assertEqual(loaded.mean(), self.ts.mean())
+        loaded[0] = 100.0
+        self.assertEqual(self.ts[0], 0.0)
+        self.assertEqual(loaded.mean(), self.ts.mean() + 1.0)
+
+    def test_out_of_band(self):
+        buffers = []
+        data = pickle.dumps(self.ts, protocol=5, buffer_callback=buffers.append)
+        self.assertEqual(len(buffers), 2)
+        self.assertLess(len(data), self.ts.values().nbytes)
+        loaded = pickle.loads(data, buffers=buffers)
+        self.assertEqual(loaded, self.ts)
+        # the arrays are built on the buffers passed in, nothing is copied
+        self.assertTrue(np.shares_memory(loaded.values(), self.ts.values()))
+        self.assertTrue(np.shares_memory(loaded._times, self.ts._times))
+
+    def test_out_of_band_readonly(self):
+        buffers = []
+        data = pickle.dumps(self.ts, protocol=5, buffer_callback=buffers.append)
+        loaded = pickle.loads(data, buffers=[bytes(b.raw()) for b in buffers])
+        self.assertEqual(loaded, self.ts)
+        self.assertFalse(loaded.values().flags.writeable)
+
+    def test_datetime_axis(self):
+        times = np.arange('2020-01-01', '2020-01-04', dtype='datetime64[D]')
+        ts = ArrayTimeSeries(times, [1.0, 2.0, 3.0], time_dtype='datetime64[D]')
+        for protocol in (4, 5):
+            loaded = pickle.loads(pickle.dumps(ts, protocol=protocol))
+            self.assertEqual(loaded._times.dtype, times.dtype)
+            self.assertEqual(list(loaded.times()), list(ts.times()))
+
+    def test_noncontiguous_values(self):
+        ts = ArrayTimeSeries._from_arrays(np.arange(5.0), np.arange(10.0)[::2])
+        loaded = pickle.loads(pickle.dumps(ts, protocol=5))
+        self.assertEqual(list(loaded.values()), [0.0, 2.0, 4.0, 6.0, 8.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
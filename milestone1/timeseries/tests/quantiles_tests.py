@@ -0,0 +1,68 @@
+import unittest
+import numpy as np
+from timeseries.quantiles import QuantileSketch, quantiles
+
+
+class TestExactQuantiles(unittest.TestCase):
+
+    def test_matches_numpy(self):
+        x = np.random.RandomState(0).normal(size=1001)
+        qs = [0, 0.01, 0.25, 0.5, 0.75, 0.99, 1]
+        self.assertTrue(np.allclose(quantiles(x, qs), np.quantile(x, qs)))
+
+    def test_input_is_untouched(self):
+        x = np.array([3.0, 1.0, 2.0])
+        self.assertEqual(quantiles(x, [0.5])[0], 2.0)
+        self.assertEqual(x.tolist(), [3.0, 1.0, 2.0])
+
+    def test_nan_propagates(self):
+        self.assertTrue(np.isnan(quantiles(np.array([3.0, 1.0, 2.0, np.nan]), [0.5])[0]))
+        x = np.array([np.nan, 5.0, 6.0, 1.0, 2.0], dtype=np.float32)
+        result = quantiles(x, [0, 0.5])
+        self.assertTrue(np.all(np.isnan(result)))
+        self.assertEqual(result.dtype, np.float32)
+        self.assertEqual(quantiles(np.array([3, 1, 2]), [0, 1]).tolist(), [1, 3])
+
+    def test_invalid_quantiles(self):
+        for qs in ([1.5], [-0.1], [np.nan]):
+            with self.assertRaises(ValueError):
+                quantiles(np.arange(3.0), qs)
+        with self.assertRaises(ValueError):
+            quantiles(np.empty(0), [0.5])
+
+
+class TestQuantileSketch(unittest.TestCase):
+
+    def setUp(self):
+        self.x = np.random.RandomState(1).standard_normal(200000)
+        self.sorted = np.sort(self.x)
+        self.qs = np.array([0.001, 0.01, 0.1, 0.5, 0.9, 0.99, 0.999])
+
+    def rank_error(self, sketch):
+        estimates = sketch.quantiles(self.qs)
+        return np.max(np.abs(np.searchsorted(self.sorted, estimates) / len(self.x) - self.qs))
+
+    def test_accuracy(self):
+        sketch = QuantileSketch.from_values(self.x)
+        self.assertEqual(sketch.n, len(self.x))
+        self.assertLess(len(sketch), 100)
+        self.assertLess(self.rank_error(sketch), 0.005)
+        self.assertEqual(sketch.quantile(0), self.x.min())
+        self.assertEqual(sketch.quantile(1), self.x.max())
+
+    def test_merge(self):
+        left = QuantileSketch.from_values(self.x[:50000])
+        right = QuantileSketch.from_values(self.x[50000:])
+        merged = left + right
+        self.assertEqual(merged.n, len(self.x))
+        self.assertLess(self.rank_error(merged), 0.005)
+        self.assertEqual(left.n, 50000)
+
+    def test_small_and_empty(self):
+        self.assertEqual(QuantileSketch.from_values(np.array([3.0])).quantile(0.5), 3.0)
+        with self.assertRaises(ValueError):
+            QuantileSketch().quantile(0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
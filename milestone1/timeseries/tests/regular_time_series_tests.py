@@ -0,0 +1,76 @@
+import unittest
+import numpy as np
+from timeseries.ArrayTimeSeries import ArrayTimeSeries
+from timeseries.RegularTimeSeries import RegularTimeSeries
+
+
+class TestRegularTimeSeries(unittest.TestCase):
+
+    def setUp(self):
+        self.ts = RegularTimeSeries([1.0, 2.0, 3.0, 4.0], start=10, step=0.5)
+
+    def test_stores_only_grid_and_values(self):
+        self.assertEqual(self.ts.start, 10.0)
+        self.assertEqual(self.ts.step, 0.5)
+        self.assertFalse(hasattr(self.ts, '_times'))
+        self.assertTrue(np.array_equal(self.ts.times(), [10.0, 10.5, 11.0, 11.5]))
+        self.assertEqual(list(self.ts.itertimes()), [10.0, 10.5, 11.0, 11.5])
+
+    def test_invalid_grid(self):
+        with self.assertRaises(ValueError):
+            RegularTimeSeries([1, 2], step=0)
+        with self.assertRaises(TypeError):
+            RegularTimeSeries([1, 2], start=None)
+        with self.assertRaises(TypeError):
+            RegularTimeSeries([1, 2], step='fast')
+
+    def test_time_lookup(self):
+        self.assertEqual(self.ts.at(11.0), 3.0)
+        self.assertEqual(self.ts.at(11.0 + 1e-12), 3.0)
+        for t in (10.25, 9.5, 12.0, np.inf, -np.inf, np.nan):
+            with self.assertRaises(KeyError):
+                self.ts.at(t)
+
+    def test_between_is_a_view(self):
+        window = self.ts[10.2:11.0]
+        self.assertIsInstance(window, RegularTimeSeries)
+        self.assertEqual(window.start, 10.5)
+        self.assertEqual(window.values().tolist(), [2.0, 3.0])
+        self.assertTrue(np.shares_memory(window.values(), self.ts.values()))
+        self.assertEqual(len(self.ts.between(20, 30)), 0)
+        self.assertEqual(len(self.ts.between(None, None)), 4)
+
+    def test_interpolation_matches_array_series(self):
+        query = [9.0, 10.2, 10.75, 11.5, 13.0]
+        expected = self.ts.to_array().interpolate(query)
+        result = self.ts.interpolate(query)
+        self.assertTrue(np.allclose(result.values(), expected.values()))
+        self.assertTrue(np.array_equal(result.times(), expected.times()))
+
+    def test_operators_on_same_grid(self):
+        other = RegularTimeSeries([1.0, 1.0, 1.0, 1.0], start=10, step=0.5)
+        self.assertEqual((self.ts + other).values().tolist(), [2.0, 3.0, 4.0, 5.0])
+        self.assertEqual((self.ts * 2).values().tolist(), [2.0, 4.0, 6.0, 8.0])
+        self.assertEqual((self.ts - self.ts.to_array()).values().tolist(), [0.0] * 4)
+        with self.assertRaises(ValueError):
+            self.ts + RegularTimeSeries([1.0, 1.0, 1.0, 1.0], start=10, step=1)
+        with self.assertRaises(NotImplementedError):
+            self.ts + [1, 2, 3, 4]
+        self.assertEqual((self.ts * np.array([1.0, 0.0, 1.0, 0.0])).values().tolist(), [1.0, 0.0, 3.0, 0.0])
+        with self.assertRaises(ValueError):
+            self.ts + np.ones(3)
+
+    def test_in_place(self):
+        values = self.ts.values()
+        self.ts += 1
+        self.assertIs(self.ts.values(), values)
+        self.assertEqual(values.tolist(), [2.0, 3.0, 4.0, 5.0])
+
+    def test_to_array(self):
+        ats = self.ts.to_array()
+        self.assertIsInstance(ats, ArrayTimeSeries)
+        self.assertTrue(ats == ArrayTimeSeries([10, 10.5, 11, 11.5], [1, 2, 3, 4]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+import numpy as np
+from timeseries.ArrayTimeSeries import ArrayTimeSeries
+from timeseries.RegularTimeSeries import RegularTimeSeries
+from timeseries.TimeSeries import TimeSeries
+from timeseries.rolling import prefix_sums
+
+
+class TestRolling(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        self.times = np.sort(rng.uniform(0, 100, 500))
+        self.values = rng.normal(size=500)
+        self.ts = ArrayTimeSeries(self.times, self.values)
+
+    def check(self, rolling, starts):
+        for name, func in [('sum', np.sum), ('mean', np.mean), ('std', np.std), ('min', np.min), ('max', np.max)]:
+            expected = [func(self.values[s:i + 1]) for i, s in enumerate(starts)]
+            result = getattr(rolling, name)()
+            self.assertIs(result.times(), self.ts.times())
+            self.assertTrue(np.allclose(result.values(), expected), name)
+
+    def test_count_windows(self):
+        for window in (1, 2, 10, 1000):
+            self.check(self.ts.rolling(window), [max(i - window + 1, 0) for i in range(500)])
+
+    def test_time_windows(self):
+        for window in (0.5, 5.0, 1000.0):
+            starts = [np.searchsorted(self.times, t - window, side='right') for t in self.times]
+            self.check(self.ts.rolling(window, by='time'), starts)
+            self.assertEqual(self.ts.rolling(window, by='time').count().values().tolist(),
+                             [i + 1 - s for i, s in enumerate(starts)])
+
+    def test_compensated_prefix_sums(self):
+        hi, lo = prefix_sums(np.full(10 ** 6, 0.1))
+        self.assertEqual(hi[-1] + lo[-1], 10 ** 5)
+
+    def test_regular_and_list_series(self):
+        rts = RegularTimeSeries([1.0, 3.0, 2.0, 5.0], start=0, step=0.5)
+        self.assertEqual(rts.rolling(1.0, by='time').sum().values().tolist(), [1.0, 4.0, 5.0, 7.0])
+        self.assertIsInstance(rts.rolling(2).min(), RegularTimeSeries)
+        self.assertEqual(TimeSeries([1.0, 3.0, 2.0]).rolling(2).max().values(), [1.0, 3.0, 3.0])
+        with self.assertRaises(ValueError):
+            TimeSeries([2.0, 1.0], [1.0, 1.0]).rolling(1.0, by='time')
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            self.ts.rolling(0)
+        with self.assertRaises(ValueError):
+            self.ts.rolling(1.5)
+        with self.assertRaises(ValueError):
+            self.ts.rolling(1, by='rows')
+
+
+if __name__ == '__main__':
+    unittest.main()
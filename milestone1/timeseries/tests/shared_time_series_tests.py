@@ -0,0 +1,61 @@
+import pickle
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from timeseries.ArrayTimeSeries import ArrayTimeSeries
+from timeseries.shared import SharedTimeSeries
+
+
+def worker_mean(descriptor):
+    with SharedTimeSeries.attach(descriptor) as shared:
+        ts = shared.series
+        result = ts.mean(), ts.values().flags.writeable
+        del ts
+    return result
+
+
+class TestSharedTimeSeries(unittest.TestCase):
+
+    def setUp(self):
+        self.ts = ArrayTimeSeries(np.arange(1000), np.arange(1000) / 10.0)
+
+    def test_round_trip(self):
+        with SharedTimeSeries.create(self.ts) as shared:
+            self.assertTrue(np.array_equal(shared.series.times(), self.ts.times()))
+            self.assertTrue(np.array_equal(shared.series.values(), self.ts.values()))
+            self.assertFalse(np.shares_memory(shared.series.values(), self.ts.values()))
+
+    def test_descriptor_is_small(self):
+        with SharedTimeSeries.create(self.ts) as shared:
+            self.assertLess(len(pickle.dumps(shared.descriptor)), 200)
+
+    def test_attach_is_zero_copy_and_read_only(self):
+        with SharedTimeSeries.create(self.ts) as shared:
+            with SharedTimeSeries.attach(shared.descriptor) as attached:
+                with self.assertRaises(ValueError):
+                    attached.series[0] = 1.0
+                shared.series[0] = 5.0
+                self.assertEqual(attached.series[0], 5.0)
+                with self.assertRaises(PermissionError):
+                    attached.unlink()
+
+    def test_writable_attach(self):
+        with SharedTimeSeries.create(self.ts) as shared:
+            with SharedTimeSeries.attach(shared.descriptor, writable=True) as attached:
+                attached.series[1] = 7.0
+                self.assertFalse(attached.series.times().flags.writeable)
+            self.assertEqual(shared.series[1], 7.0)
+
+    def test_workers(self):
+        with SharedTimeSeries.create(self.ts) as shared:
+            with ProcessPoolExecutor(2) as pool:
+                results = list(pool.map(worker_mean, [shared.descriptor] * 4))
+            self.assertEqual(results, [(self.ts.mean(), False)] * 4)
+
+    def test_empty(self):
+        with SharedTimeSeries.create(ArrayTimeSeries([], [])) as shared:
+            self.assertEqual(len(shared.series), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
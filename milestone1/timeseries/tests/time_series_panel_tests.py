@@ -0,0 +1,68 @@
+import unittest
+import numpy as np
+from timeseries.ArrayTimeSeries import ArrayTimeSeries
+from timeseries.TimeSeriesPanel import TimeSeriesPanel
+
+
+class TestTimeSeriesPanel(unittest.TestCase):
+
+    def setUp(self):
+        self.times = [0.0, 1.0, 2.0]
+        self.values = np.array([[1.0, 2.0, 3.0], [4.0, 6.0, 8.0]])
+        self.panel = TimeSeriesPanel(self.times, self.values)
+
+    def test_construction(self):
+        self.assertEqual(self.panel.shape, (2, 3))
+        self.assertEqual(len(self.panel), 2)
+        self.assertTrue(self.panel.values().flags.c_contiguous)
+        with self.assertRaises(ValueError):
+            TimeSeriesPanel([0.0, 1.0], self.values)
+        unsorted = TimeSeriesPanel([2.0, 0.0, 1.0], self.values)
+        self.assertEqual(unsorted[0].values().tolist(), [2.0, 3.0, 1.0])
+
+    def test_from_series(self):
+        series = [ArrayTimeSeries(self.times, row) for row in self.values]
+        panel = TimeSeriesPanel.from_series(series)
+        self.assertTrue(np.array_equal(panel.values(), self.values))
+        with self.assertRaises(ValueError):
+            TimeSeriesPanel.from_series(series + [ArrayTimeSeries([0, 1, 3], [1, 1, 1])])
+
+    def test_rows_are_views(self):
+        row = self.panel[1]
+        self.assertIsInstance(row, ArrayTimeSeries)
+        self.assertEqual(row.mean(), 6.0)
+        self.assertIs(row.times(), self.panel.times())
+        row[0] = 10.0
+        self.assertEqual(self.panel.values()[1, 0], 10.0)
+        self.assertEqual(len(self.panel[:1]), 1)
+        self.assertEqual([ts.mean() for ts in self.panel], [2.0, 8.0])
+
+    def test_reductions(self):
+        self.assertEqual(self.panel.mean().tolist(), [2.0, 6.0])
+        self.assertTrue(np.allclose(self.panel.std(), self.values.std(axis=1)))
+        self.assertEqual(self.panel.median().tolist(), [2.0, 6.0])
+        self.assertTrue(np.allclose(abs(self.panel), np.linalg.norm(self.values, axis=1)))
+        cross = self.panel.mean(cross=True)
+        self.assertIsInstance(cross, ArrayTimeSeries)
+        self.assertEqual(cross.values().tolist(), [2.5, 4.0, 5.5])
+        self.assertEqual(self.panel.max(cross=True).values().tolist(), [4.0, 6.0, 8.0])
+
+    def test_broadcasting_arithmetic(self):
+        self.assertTrue(np.array_equal((self.panel + self.panel).values(), 2 * self.values))
+        ts = ArrayTimeSeries(self.times, [1.0, 1.0, 1.0])
+        self.assertTrue(np.array_equal((self.panel - ts).values(), self.values - 1))
+        self.assertTrue(np.array_equal((self.panel * np.array([1.0, 0.5])).values(), [[1, 2, 3], [2, 3, 4]]))
+        with self.assertRaises(ValueError):
+            self.panel + ArrayTimeSeries([0, 1, 5], [1, 1, 1])
+        with self.assertRaises(NotImplementedError):
+            self.panel + [1, 2]
+
+    def test_in_place(self):
+        values = self.panel.values()
+        self.panel *= 2
+        self.assertIs(self.panel.values(), values)
+        self.assertEqual(values[0].tolist(), [2.0, 4.0, 6.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
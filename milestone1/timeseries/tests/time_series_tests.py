@@ -0,0 +1,134 @@
+import unittest
+from unittest import mock
+import numpy as np
+from timeseries.TimeSeries import TimeSeries
+
+
+class TestTimeSeriesArrayStorage(unittest.TestCase):
+
+    def test_default_time_axis(self):
+        ts = TimeSeries([4, 5, 6])
+        self.assertEqual(ts.times(), [0, 1, 2])
+        self.assertEqual(ts.values(), [4.0, 5.0, 6.0])
+
+    def test_public_accessors_return_lists(self):
+        ts = TimeSeries([1, 2], [3, 4])
+        self.assertIsInstance(ts.values(), list)
+        self.assertIsInstance(ts.times(), list)
+        self.assertEqual(list(ts.items()), [(1, 3), (2, 4)])
+
+    def test_comparison_uses_arrays(self):
+        ta = TimeSeries([1, 2], [0.4, 0.5])
+        tb = TimeSeries([1, 2], [0.4, 0.5])
+        with mock.patch.object(TimeSeries, 'values', side_effect=AssertionError('list round trip')):
+            self.assertTrue(ta == tb)
+
+    def test_storage_is_contiguous_float(self):
+        ts = TimeSeries(range(3), range(3))
+        self.assertIsInstance(ts._values, np.ndarray)
+        self.assertEqual(ts._values.dtype, np.float64)
+        self.assertTrue(ts._values.flags.c_contiguous)
+
+    def test_vectorized_operators(self):
+        a = TimeSeries([1, 2, 3], [1.0, 2.0, 3.0])
+        b = TimeSeries([1, 2, 3], [2.0, 2.0, 2.0])
+        self.assertEqual((a + b).values(), [3.0, 4.0, 5.0])
+        self.assertEqual((a - b).values(), [-1.0, 0.0, 1.0])
+        self.assertEqual((a * b).values(), [2.0, 4.0, 6.0])
+        self.assertEqual((-a).values(), [-1.0, -2.0, -3.0])
+        self.assertEqual(abs(TimeSeries([3.0, 4.0])), 5.0)
+        self.assertIs((a * 2)._times, a._times)
+
+    def test_pos_does_not_alias_values(self):
+        a = TimeSeries([1.0, 2.0])
+        b = +a
+        b[0] = 5.0
+        self.assertEqual(a[0], 1.0)
+
+    def test_interpolation_keeps_query_order(self):
+        ts = TimeSeries([0, 5, 10], [1, 2, 3])
+        self.assertEqual(ts.interpolate([7.5, 2.5]).values(), [2.5, 1.5])
+
+    def test_invalid_input(self):
+        with self.assertRaises(TypeError):
+            TimeSeries(42)
+        with self.assertRaises(ValueError):
+            TimeSeries(['a', 'b'])
+        with self.assertRaises(ValueError):
+            TimeSeries([1, 2], [1])
+
+
+class TestTimeSeriesTimeIndexing(unittest.TestCase):
+
+    def test_at_and_between(self):
+        ts = TimeSeries([0.5, 0.7, 0.8, 1.0], [0.5, 1., 2., 4.])
+        self.assertEqual(ts.at(0.7), 1.0)
+        self.assertEqual(ts.between(0.7, 0.8).values(), [1.0, 2.0])
+        self.assertEqual(ts[:0.7].times(), [0.5, 0.7])
+        with self.assertRaises(KeyError):
+            ts.at(2.0)
+
+    def test_unsorted_times(self):
+        ts = TimeSeries([3, 1, 2, 0], [1.0, 2.0, 3.0, 4.0])
+        self.assertEqual(ts.at(1), 2.0)
+        self.assertEqual(ts.at(0), 4.0)
+        with self.assertRaises(KeyError):
+            ts.at(1.5)
+        with self.assertRaises(ValueError):
+            ts.between(1, 2)
+        with self.assertRaises(ValueError):
+            ts[1:2]
+
+    def test_window_is_a_view(self):
+        ts = TimeSeries([1.0, 2.0, 3.0])
+        self.assertTrue(np.shares_memory(ts[1:2]._values, ts._values))
+
+
+class TestTimeSeriesStatistics(unittest.TestCase):
+
+    def test_cached_until_setitem(self):
+        ts = TimeSeries([4.0, 1.0, 3.0])
+        self.assertEqual(ts.median(), 3.0)
+        self.assertIs(ts.std(), ts.std())
+        ts[0] = 0.0
+        self.assertEqual(ts.median(), 1.0)
+        ts.between(1, 2)[0] = 10.0
+        self.assertEqual(ts.median(), 3.0)
+
+
+class TestTimeSeriesResample(unittest.TestCase):
+
+    def test_unsorted_times(self):
+        ts = TimeSeries([3.9, 0.0, 1.2, 0.5], [4.0, 1.0, 3.0, 2.0])
+        result = ts.resample(1.0, how=['last', 'count'])
+        self.assertEqual(result['count'].values().tolist(), [2, 1, 0, 1])
+        self.assertTrue(np.array_equal(result['last'].values(), [2.0, 3.0, np.nan, 4.0], equal_nan=True))
+
+
+class TestTimeSeriesChunks(unittest.TestCase):
+
+    def test_chunks_keep_stored_order(self):
+        ts = TimeSeries([3, 1, 2], [30, 10, 20])
+        chunks = list(ts.iterchunks(2))
+        self.assertEqual([t.tolist() for t, v in chunks], [[3.0, 1.0], [2.0]])
+        self.assertTrue(np.shares_memory(chunks[0][1], ts._values))
+
+
+class TestTimeSeriesNumpyProtocols(unittest.TestCase):
+
+    def test_ufuncs_and_functions(self):
+        ts = TimeSeries([1.0, 4.0])
+        self.assertEqual(np.sqrt(ts).values(), [1.0, 2.0])
+        self.assertIs(np.sqrt(ts)._times, ts._times)
+        self.assertEqual(np.sum(ts), 5.0)
+
+    def test_operators_with_arrays(self):
+        ts = TimeSeries([1.0, 4.0])
+        self.assertEqual((ts - np.array([1.0, 2.0])).values(), [0.0, 2.0])
+        self.assertIs((ts + np.array([1.0, 2.0]))._times, ts._times)
+        with self.assertRaises(ValueError):
+            ts * np.array([1.0, 2.0, 3.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
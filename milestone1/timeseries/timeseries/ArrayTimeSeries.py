@@ -1,40 +1,142 @@
 import numbers
 import numpy as np
 from timeseries.lazy import *
+from timeseries.lazy import _identity
+from timeseries.cache import StatCache
+from timeseries.dispatch import array_function, array_ufunc
+from timeseries.pickling import reduce_series
+from timeseries.quantiles import QuantileSketch, check_quantiles, quantiles
+from timeseries.rolling import Rolling
+from timeseries.kernels import align, aligned, as_array, chunks, freeze, interpolate, is_sorted, locate, resample, window
 from timeseries.SizedContainerTimeSeriesInterface import SizedContainerTimeSeriesInterface
 
 # to avoid float problems, allow some tolerance!
 tolerance = 10 ** (-9)
 
 class ArrayTimeSeries(SizedContainerTimeSeriesInterface):
-    """ Doc taken from timeseries mostly """
-
-    def __init__(self, times, values):
+    """
+    Doc taken from timeseries mostly
+
+    A timeseries stored in two numpy arrays, sorted by time.
+
+    Dtypes:
+        Times and values default to float64, but can be chosen per series,
+        e.g. float32 or float16 values and int64 (epoch nanoseconds) or
+        datetime64 times. Interpolation, statistics and operators keep the
+        value dtype. Binary operators follow numpy promotion rules: two
+        series of different value dtypes promote to the larger one
+        (float16 + float32 -> float32), python ints and floats and numpy
+        scalars of the same or a smaller dtype keep the dtype of the series
+        (float32 series * 2.5 -> float32), larger numpy scalars promote it
+        (float32 series * np.float64(2.5) -> float64).
+
+    Statistics:
+        mean, median, std and abs are computed once and cached until the
+        values are mutated through __setitem__ or an in-place operator
+        (see cache.StatCache). Writes to the array returned by values()
+        bypass the series, call invalidate() after them.
+    """
+
+    def __init__(self, times, values, copy=True, dtype=float, time_dtype=float):
         """
         initializes TimeSeries object with data as values
         make sure they are of the same type
 
-        data should be a sequence object
+        data should be a sequence object, an ndarray or any object supporting
+        the buffer protocol (memoryview, array.array, ...)
 
         Parameters
         ----------
         times : the timepoints associated with the values
         values : the values of the timeseries
+        copy : if False, ndarrays and buffers of matching dtype are used as
+               storage directly instead of being copied. The timeseries then
+               shares memory with the given objects (and is read-only if they
+               are). Unsorted times still have to be reordered, which always copies.
+        dtype : dtype of the values, a float type (default float64)
+        time_dtype : dtype of the times, e.g. float64 (default), int64 or datetime64[ns]
 
         """
 
         # make sure they have the same length
         assert len(times) == len(values), 'times and values should have the same length'
 
-        # cast iterable object to list first to allow for numpy copying
-        # cast explicitly to float to avoid any cast problems
-        self._times = np.array(list(times), copy=True, dtype=float)
-        self._values = np.array(list(values), copy=True, dtype=float)
+        # cast explicitly to avoid any cast problems
+        times = as_array(times, dtype=time_dtype, copy=copy)
+        values = as_array(values, dtype=dtype, copy=copy)
+
+        # the times should be monotonically increasing, resort arrays only if they are not!
+        if not is_sorted(times):
+            sorted_idxs = np.argsort(times)
+            times = times[sorted_idxs]
+            values = values[sorted_idxs]
+
+        # the time axis is immutable, so it can be shared by all derived series
+        self._times = freeze(times)
+        self._values = values
+        self._stats = StatCache()
+
+    @classmethod
+    def _from_arrays(cls, times, values, stats=None):
+        """
+        builds a timeseries directly around sorted time and value arrays
+        without copying or reordering them. Passing the time axis of another
+        series shares it, so that both are aligned in O(1).
 
-        # the times should be monotonically increasing, resort arrays!
-        sorted_idxs = np.argsort(self._times)
-        self._times = self._times[sorted_idxs]
-        self._values = self._values[sorted_idxs]
+        Parameters
+        ----------
+        times : sorted array of time points
+        values : array of values associated with the time points
+        stats : statistics cache of a series whose values are viewed, see StatCache.share
+
+        Returns
+        -------
+        new timeseries object sharing the given arrays
+        """
+        ts = cls.__new__(cls)
+        ts._times = freeze(times)
+        ts._values = values
+        ts._stats = StatCache() if stats is None else stats
+        return ts
+
+    @classmethod
+    def from_memmap(cls, times_path, values_path, mode='r', dtype=float, time_dtype=float, offset=0):
+        """
+        opens a timeseries backed by two arrays on disk, without reading them.
+        Pages are read on demand, time lookups and slices (binary searches
+        and views) only touch the pages they need, statistics the whole series.
+
+        Parameters
+        ----------
+        times_path : file of the time points, which must be sorted already
+        values_path : file of the values
+        mode : 'r' read-only, 'r+' values written through to the file, 'c' copy-on-write
+        dtype : dtype of raw value files, .npy files bring their own
+        time_dtype : dtype of raw time files, .npy files bring their own
+        offset : length in bytes of the header of raw files, which is skipped
+
+        Files ending in .npy are opened with their header, all others are
+        read as raw arrays after offset bytes. The order of the time points
+        is not checked, as that would read the whole file.
+
+        Returns
+        -------
+        new timeseries object viewing the mapped files
+        """
+        def open_array(path, dtype):
+            if str(path).endswith('.npy'):
+                arr = np.load(path, mmap_mode=mode)
+            else:
+                arr = np.memmap(path, dtype=dtype, mode=mode, offset=offset)
+            if arr.ndim != 1:
+                raise ValueError('timeseries data must be one dimensional')
+            return arr
+
+        times = open_array(times_path, time_dtype)
+        values = open_array(values_path, dtype)
+        if len(times) != len(values):
+            raise ValueError('times and values should have the same length')
+        return cls._from_arrays(times, values)
 
     def __len__(self):
         """
@@ -51,25 +153,71 @@ class ArrayTimeSeries(SizedContainerTimeSeriesInterface):
     def __getitem__(self, index):
         """
         Gets the value of the timeseries at the position index.
-        This implementation does not search against times.
+        Integer indices do not search against times, slices are taken
+        over time points instead (see between).
 
         Parameters
         ----------
-        index : the position to query for
+        index : the position to query for, or a slice of time points
 
         Returns
         -------
-        timeseries value at position index
+        timeseries value at position index, or a timeseries view for slices
 
         >>> ts = ArrayTimeSeries([0.5, 0.7, 0.8, 1.0], [0.5, 1., 2., 4.])
         >>> ts[0]
         0.5
         >>> ts[3]
         4.0
+        >>> print(ts[0.6:0.8])
+        ArrayTimeSeries(t=[0.7, 0.8], v=[1.0, 2.0])
         """
+        if isinstance(index, slice):
+            if index.step is not None:
+                raise ValueError('time slices do not support a step')
+            return self.between(index.start, index.stop)
         assert (isinstance(index, int))
         return self._values[index]
 
+    def at(self, time):
+        """
+        Gets the value of the timeseries at a time point using binary search.
+
+        Parameters
+        ----------
+        time : the time point to query for
+
+        Returns
+        -------
+        timeseries value at time, raises KeyError if time is not contained
+
+        >>> ts = ArrayTimeSeries([0.5, 0.7, 0.8, 1.0], [0.5, 1., 2., 4.])
+        >>> float(ts.at(0.8))
+        2.0
+        """
+        return self._values[locate(self._times, time)]
+
+    def between(self, start=None, stop=None):
+        """
+        Gets all time points within [start, stop] using binary search.
+        The result is a view, it shares memory with this timeseries.
+
+        Parameters
+        ----------
+        start : first time point of the window, None for an open start
+        stop : last time point of the window, None for an open end
+
+        Returns
+        -------
+        new timeseries object viewing the time points in the window
+
+        >>> ts = ArrayTimeSeries([0.5, 0.7, 0.8, 1.0], [0.5, 1., 2., 4.])
+        >>> print(ts.between(0.6, 0.8))
+        ArrayTimeSeries(t=[0.7, 0.8], v=[1.0, 2.0])
+        """
+        lo, hi = window(self._times, start, stop)
+        return ArrayTimeSeries._from_arrays(self._times[lo:hi], self._values[lo:hi], self._stats.share())
+
     def __setitem__(self, index, value):
         """
         Updates the value of timeseries at position index.
@@ -92,8 +240,16 @@ class ArrayTimeSeries(SizedContainerTimeSeriesInterface):
         except Exception as e:
             raise Exception("setitem must be of the form `object[int] = Number`") from e
         self._values[index] = value
+        self._stats.bump()
         return self._values[index]
 
+    def invalidate(self):
+        """
+        drops cached statistics after the values were mutated from outside
+        the series, e.g. through the array returned by values()
+        """
+        self._stats.bump()
+
     def __contains__(self, value):
         """
         Checks whether value is contained within stored time points
@@ -132,8 +288,37 @@ class ArrayTimeSeries(SizedContainerTimeSeriesInterface):
         """
         iterate over (time, value) tuples
         """
-        for item in self.items():
-            yield item
+        return zip(self._times, self._values)
+
+    def iterchunks(self, size):
+        """
+        iterate over consecutive chunks of points as array views, for bulk
+        consumers which process whole arrays instead of single points
+
+        Parameters
+        ----------
+        size : number of points per chunk, the last chunk may be smaller
+
+        Returns
+        -------
+        generator of (times, values) array views
+
+        >>> ts = ArrayTimeSeries([0, 1, 2], [4.0, 5.0, 6.0])
+        >>> [v.tolist() for t, v in ts.iterchunks(2)]
+        [[4.0, 5.0], [6.0]]
+        """
+        return chunks(self._times, self._values, size)
+
+    def iterblocks(self):
+        """
+        iterate over the blocks the points are stored in, a single block of
+        the whole time and value arrays here
+
+        Returns
+        -------
+        generator of (times, values) array views
+        """
+        yield self._times, self._values
 
             # @property
 
@@ -173,31 +358,85 @@ class ArrayTimeSeries(SizedContainerTimeSeriesInterface):
         -------
         new timeseries object with time points times and interpolated values
         """
-        # interpolate for all given points
-        if len(times) > 0:
-            vals = []
-            for t in times:
-                # find nearest point using numpy binary search (right index, i.e. the larger one)
-                indR = np.searchsorted(self._times, t, side='right')
-
-                # handle special cases at boundaries
-                if indR == 0:
-                    vals.append(self._values[0])
-                elif indR == len(self):
-                    vals.append(self._values[-1])
-                else:
-                    # interpolate
-                    # p(x) = f(x_0) + (f(x_1) - f(x_0)) / (x_1 - x_0) (x - x_0)
-                    interp_val = self._values[indR - 1] + (self._values[indR] - self._values[indR - 1]) / \
-                                                          (self._times[indR] - self._times[indR - 1]) * (
-                                                              t - self._times[indR - 1])
-
-                    vals.append(interp_val)
-
-            return ArrayTimeSeries(times, vals)
-        # empty list submitted, return empty timeseries!
+        # time axes of other series are immutable and sorted, so they can be shared
+        # directly which keeps all series interpolated onto them aligned in O(1)
+        if isinstance(times, np.ndarray) and not times.flags.writeable \
+                and times.dtype == self._times.dtype and times.ndim == 1 and is_sorted(times):
+            query = times
         else:
-            return ArrayTimeSeries([], [])
+            # work on a copy of the whole query grid at once
+            query = as_array(times, dtype=self._times.dtype)
+        if len(query) == 0:
+            # empty list submitted, return empty timeseries!
+            return ArrayTimeSeries._from_arrays(query, self._values[:0].copy())
+
+        # the new series is ordered by time anyway, so an unsorted grid is sorted
+        # once up front and an already sorted one needs no reordering at all
+        if query is not times and not is_sorted(query):
+            query.sort()
+
+        vals = interpolate(self._times, self._values, query)
+        return ArrayTimeSeries._from_arrays(query, vals)
+
+    def resample(self, bucket_width, how='mean', origin=None):
+        """
+        downsamples the timeseries by aggregating all values within buckets
+        of equal width, instead of taking point samples like interpolate
+
+        Parameters
+        ----------
+        bucket_width : positive width of every bucket in units of the time
+                       points (a timedelta64 for datetime time points)
+        how : aggregation, one of 'mean', 'min', 'max', 'last', 'count' and
+              'sum', or a list of them which are all computed in one pass
+        origin : start of the first bucket, the first time point if None
+
+        Returns
+        -------
+        RegularTimeSeries with one value per bucket starting at origin, or a dict
+        of them by aggregation if how is a list. Empty buckets count 0, sum 0
+        and are nan otherwise. Datetime time points give ArrayTimeSeries on
+        the bucket starts instead, which all share one time axis.
+
+        >>> ts = ArrayTimeSeries([0, 0.5, 1.2, 3.9], [1.0, 2.0, 3.0, 4.0])
+        >>> print(ts.resample(1.0, how='max'))
+        RegularTimeSeries(start=0.0, step=1.0, v=[2.0, 3.0, nan, 4.0])
+        """
+        from timeseries.RegularTimeSeries import RegularTimeSeries
+
+        names = [how] if isinstance(how, str) else list(how)
+        edges, aggs = resample(self._times, self._values, bucket_width, names, origin)
+        if self._times.dtype.kind == 'M':
+            edges = freeze(edges)
+            result = {name: ArrayTimeSeries._from_arrays(edges, agg) for name, agg in aggs.items()}
+        else:
+            start = float(edges[0]) if len(edges) else float(origin or 0)
+            result = {name: RegularTimeSeries._from_grid(start, float(bucket_width), agg) for name, agg in aggs.items()}
+        return result[how] if isinstance(how, str) else result
+
+    def rolling(self, window, by='count'):
+        """
+        statistics over the trailing window ending at every time point, all
+        of them computed in O(n) for the whole series
+
+        Parameters
+        ----------
+        window : number of points (by='count') or span of time (by='time')
+                 of every window, a timedelta64 for datetime time points
+        by : 'count' for windows of the last window points, 'time' for
+             windows of the points within (t - window, t]
+
+        Returns
+        -------
+        Rolling object whose mean, sum, std, min, max and count methods return
+        timeseries on the same time points (see rolling.Rolling)
+
+        >>> ts = ArrayTimeSeries([0, 1, 2, 3], [1.0, 3.0, 2.0, 5.0])
+        >>> print(ts.rolling(2).max())
+        ArrayTimeSeries(t=[0.0, 1.0, 2.0, 3.0], v=[1.0, 3.0, 3.0, 5.0])
+        """
+        return Rolling(self._times, self._values, window, by,
+                       lambda values: ArrayTimeSeries._from_arrays(self._times, values))
 
     @property
     def lazy(self):
@@ -206,11 +445,7 @@ class ArrayTimeSeries(SizedContainerTimeSeriesInterface):
         -------
         returns lazified version of TimeSeries class
         """
-
-        def id_fun(*args, **kwargs):
-            return self
-
-        return LazyOperation(id_fun, self)
+        return LazyOperation(_identity, self)
 
     def mean(self):
         """
@@ -224,7 +459,7 @@ class ArrayTimeSeries(SizedContainerTimeSeriesInterface):
         """
         if len(self) == 0:
             raise ValueError
-        return self._values.mean()
+        return self._stats.get('mean', self._values.mean)
 
     def median(self):
         """
@@ -238,13 +473,66 @@ class ArrayTimeSeries(SizedContainerTimeSeriesInterface):
         """
         if len(self) == 0:
             raise ValueError
-        return np.median(self._values)
+        return self.quantile(0.5)
+
+    def quantile(self, q, approx=False):
+        """
+        Parameters
+        ----------
+        q : quantile within [0, 1]
+        approx : if True, estimate it from the sketch of the values (see sketch)
+
+        Returns
+        -------
+        q-th quantile of stored values, interpolated linearly between order statistics
+
+        >>> ts = ArrayTimeSeries([0, 1, 2, 3, 4], [5.0, 1.0, 4.0, 2.0, 3.0])
+        >>> float(ts.quantile(0.25))
+        2.0
+        """
+        return self.quantiles([q], approx)[0]
+
+    def quantiles(self, qs, approx=False):
+        """
+        computes several quantiles at once, exact ones with a single partition pass
+
+        Parameters
+        ----------
+        qs : sequence of quantiles within [0, 1]
+        approx : if True, estimate them from the sketch of the values (see sketch)
+
+        Returns
+        -------
+        array with one quantile per entry of qs
+        """
+        if len(self) == 0:
+            raise ValueError
+        if approx:
+            return self.sketch().quantiles(qs)
+        qs = tuple(check_quantiles(qs))
+        return self._stats.get(('quantiles', qs), lambda: quantiles(self._values, qs)).copy()
+
+    def sketch(self, compression=100):
+        """
+        summary of the values for approximate quantiles, built once and
+        cached until the values are mutated. Sketches of several series can
+        be merged to get quantiles over all of them.
+
+        Parameters
+        ----------
+        compression : accuracy parameter, see QuantileSketch
+
+        Returns
+        -------
+        QuantileSketch of stored values, shared between calls (merging does not modify it)
+        """
+        return self._stats.get(('sketch', compression), lambda: QuantileSketch.from_values(self._values, compression))
 
     def std(self):
         """
         :return: standard deviation of the stored values.
         """
-        return np.std(self._values)
+        return self._stats.get('std', lambda: np.std(self._values))
 
     def __eq__(self, rhs):
         """
@@ -275,6 +563,121 @@ class ArrayTimeSeries(SizedContainerTimeSeriesInterface):
 
         return np.allclose(self._values, rhs.values())
 
+    def _apply(self, ufunc, rhs, out=None, how='exact'):
+        """
+        applies a binary numpy ufunc elementwise with a timeseries or constant
+
+        Parameters
+        ----------
+        ufunc : numpy ufunc to apply, e.g. np.add
+        rhs : timeseries, array of values at the own time points, or constant
+        out : optional timeseries aligned with the result that receives it
+        how : alignment policy for timeseries on different time points,
+              'exact' requires the same time points (see kernels.align for the others)
+
+        Returns
+        -------
+        out, or a new timeseries object
+        """
+        times = self._times
+        lhs = self._values
+        if isinstance(rhs, (ArrayTimeSeries)):
+            if how == 'exact':
+                if not aligned(self._times, rhs._times):
+                    raise ValueError(str(self) + ' and ' + str(rhs) + 'must have the same time points')
+                rhs = rhs._values
+            else:
+                times, lhs, rhs = align(self._times, self._values, rhs._times, rhs._values, how)
+
+        elif isinstance(rhs, np.ndarray):
+            # an array holds values at the own time points, as in ufunc calls on the series
+            if rhs.shape != self._values.shape:
+                raise ValueError('{} and an array of shape {} must have the same length'.format(self, rhs.shape))
+        elif not isinstance(rhs, numbers.Real):
+            if isinstance(rhs, list):
+                raise NotImplementedError
+            else:
+                raise TypeError('can not compare time series to {}'.format(type(rhs)))
+
+        if out is None:
+            return ArrayTimeSeries._from_arrays(times, ufunc(lhs, rhs))
+
+        if not isinstance(out, ArrayTimeSeries):
+            raise TypeError('out must be a time series, not {}'.format(type(out)))
+        if not aligned(times, out._times):
+            raise ValueError(str(self) + ' and ' + str(out) + 'must have the same time points')
+        ufunc(lhs, rhs, out=out._values)
+        out._stats.bump()
+        return out
+
+    def add(self, rhs, out=None, how='exact'):
+        """
+        Parameters
+        ----------
+        rhs : timeseries or constant to add
+        out : timeseries aligned with the result whose value buffer receives
+              it instead of allocating a new one, may be self
+        how : alignment policy if rhs is a timeseries
+            'exact' : both need the same time points, else ValueError
+            'inner' : only the time points contained in both series
+            'outer' : the union of time points, missing values are interpolated
+            'asof' : the time points of self, using the last value of rhs at
+                     or before each of them (nan before rhs starts)
+
+        Returns
+        -------
+        out, or new timeseries object as result of the addition
+
+        >>> ta = ArrayTimeSeries([1, 2], [0.4, 0.5])
+        >>> tb = ArrayTimeSeries([1, 2], [0.0, 0.0])
+        >>> print(ta.add(1, out=tb))
+        ArrayTimeSeries(t=[1.0, 2.0], v=[1.4, 1.5])
+        >>> tc = ArrayTimeSeries([1.5, 2], [1.0, 2.0])
+        >>> print(ta.add(tc, how='inner'))
+        ArrayTimeSeries(t=[2.0], v=[2.5])
+        """
+        return self._apply(np.add, rhs, out, how)
+
+    def sub(self, rhs, out=None, how='exact'):
+        """
+        Parameters
+        ----------
+        rhs : timeseries or constant to substract
+        out : timeseries aligned with the result whose value buffer receives
+              it instead of allocating a new one, may be self
+        how : alignment policy if rhs is a timeseries
+            'exact' : both need the same time points, else ValueError
+            'inner' : only the time points contained in both series
+            'outer' : the union of time points, missing values are interpolated
+            'asof' : the time points of self, using the last value of rhs at
+                     or before each of them (nan before rhs starts)
+
+        Returns
+        -------
+        out, or new timeseries object as result of the substraction
+        """
+        return self._apply(np.subtract, rhs, out, how)
+
+    def mul(self, rhs, out=None, how='exact'):
+        """
+        Parameters
+        ----------
+        rhs : timeseries or constant to multiply with
+        out : timeseries aligned with the result whose value buffer receives
+              it instead of allocating a new one, may be self
+        how : alignment policy if rhs is a timeseries
+            'exact' : both need the same time points, else ValueError
+            'inner' : only the time points contained in both series
+            'outer' : the union of time points, missing values are interpolated
+            'asof' : the time points of self, using the last value of rhs at
+                     or before each of them (nan before rhs starts)
+
+        Returns
+        -------
+        out, or new timeseries object as result of the multiplication
+        """
+        return self._apply(np.multiply, rhs, out, how)
+
     def __radd__(self, lhs):
         return self + lhs
 
@@ -288,21 +691,7 @@ class ArrayTimeSeries(SizedContainerTimeSeriesInterface):
         -------
         new timeseries object as result of the addition
         """
-        if isinstance(rhs, (ArrayTimeSeries)):
-            if len(self) != len(rhs):
-                raise ValueError(str(self) + ' and ' + str(rhs) + 'must have the same time points')
-
-            if not np.allclose(self._times, rhs.times(), atol=tolerance):
-                raise ValueError(str(self) + ' and ' + str(rhs) + 'must have the same time points')
-            return ArrayTimeSeries(self._times, self._values + rhs.values())
-
-        elif isinstance(rhs, (int, float)):
-            return ArrayTimeSeries(self._times, self._values + rhs)
-        else:
-            if isinstance(rhs, (np.ndarray, list)):
-                raise NotImplementedError
-            else:
-                raise TypeError('can not compare time series to {}'.format(type(rhs)))
+        return self.add(rhs)
 
     def __sub__(self, rhs):
         """
@@ -314,18 +703,7 @@ class ArrayTimeSeries(SizedContainerTimeSeriesInterface):
         -------
         new timeseries object as result of the substraction
         """
-        if isinstance(rhs, (ArrayTimeSeries)):
-            if len(self) != len(rhs):
-                raise ValueError(str(self) + ' and ' + str(rhs) + 'must have the same time points')
-            return ArrayTimeSeries(self._times, self._values - rhs.values())
-
-        elif isinstance(rhs, (int, float)):
-            return ArrayTimeSeries(self._times, self._values - rhs)
-        else:
-            if isinstance(rhs, (np.ndarray, list)):
-                raise NotImplementedError
-            else:
-                raise TypeError('can not compare time series to {}'.format(type(rhs)))
+        return self.sub(rhs)
 
     def __mul__(self, rhs):
         """
@@ -337,18 +715,49 @@ class ArrayTimeSeries(SizedContainerTimeSeriesInterface):
         -------
         new timeseries object as result of the multiplication
         """
-        if isinstance(rhs, (ArrayTimeSeries)):
-            if len(self) != len(rhs):
-                raise ValueError(str(self) + ' and ' + str(rhs) + 'must have the same time points')
-            return ArrayTimeSeries(self._times, self._values * rhs.values())
+        return self.mul(rhs)
 
-        elif isinstance(rhs, (int, float)):
-            return ArrayTimeSeries(self._times, self._values * rhs)
-        else:
-            if isinstance(rhs, (np.ndarray, list)):
-                raise NotImplementedError
-            else:
-                raise TypeError('can not compare time series to {}'.format(type(rhs)))
+    def __iadd__(self, rhs):
+        """
+        in-place addition, reuses the value buffer of this timeseries
+
+        Parameters
+        ----------
+        rhs : timeseries or constant to add
+
+        Returns
+        -------
+        this timeseries object with updated values
+        """
+        return self.add(rhs, out=self)
+
+    def __isub__(self, rhs):
+        """
+        in-place substraction, reuses the value buffer of this timeseries
+
+        Parameters
+        ----------
+        rhs : timeseries or constant to substract
+
+        Returns
+        -------
+        this timeseries object with updated values
+        """
+        return self.sub(rhs, out=self)
+
+    def __imul__(self, rhs):
+        """
+        in-place multiplication, reuses the value buffer of this timeseries
+
+        Parameters
+        ----------
+        rhs : timeseries or constant to multiply with
+
+        Returns
+        -------
+        this timeseries object with updated values
+        """
+        return self.mul(rhs, out=self)
 
     def __abs__(self):
         """
@@ -358,7 +767,7 @@ class ArrayTimeSeries(SizedContainerTimeSeriesInterface):
         """
         assert (len(self) > 0)
 
-        return np.sqrt(np.sum(self._values * self._values))
+        return self._stats.get('abs', lambda: np.sqrt(np.sum(self._values * self._values)))
 
     def __bool__(self):
         """
@@ -374,7 +783,7 @@ class ArrayTimeSeries(SizedContainerTimeSeriesInterface):
         -------
         returns series with negated values
         """
-        return ArrayTimeSeries(self._times, -self._values)
+        return ArrayTimeSeries._from_arrays(self._times, -self._values)
 
     def __pos__(self):
         """
@@ -382,7 +791,49 @@ class ArrayTimeSeries(SizedContainerTimeSeriesInterface):
         -------
         returns identity (unary +)
         """
-        return ArrayTimeSeries(self._times, self._values)
+        return ArrayTimeSeries._from_arrays(self._times, self._values.copy())
+
+    def _same_axis(self, other):
+        """
+        checks whether another series has the same time points, in O(1) for shared axes
+        """
+        return aligned(self._times, other._times)
+
+    def _wrap(self, values):
+        """
+        builds a series on the time points of this one around an array of values
+        """
+        return ArrayTimeSeries._from_arrays(self._times, values)
+
+    def __reduce_ex__(self, protocol):
+        """
+        pickles the arrays of the series, with protocol 5 as PickleBuffer so
+        they can be passed out-of-band without copies (see pickling.py).
+        Cached statistics are not pickled.
+        """
+        return reduce_series(ArrayTimeSeries._from_arrays, (self._times, self._values), protocol)
+
+    def __array__(self, dtype=None, copy=None):
+        """
+        the values as ndarray, without copying unless a copy or another dtype is requested
+        """
+        if copy:
+            return np.array(self._values, dtype=dtype)
+        return np.asarray(self._values, dtype=dtype)
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        """
+        numpy ufuncs (np.log(ts), np.maximum(ts1, ts2), ...) run on the value
+        buffers and return series on the same time points, see dispatch.py
+        """
+        return array_ufunc(self, ufunc, method, inputs, kwargs)
+
+    def __array_function__(self, func, types, args, kwargs):
+        """
+        numpy functions (np.sum(ts), np.clip(ts, 0, 1), ...) run on the value
+        buffers, see dispatch.py
+        """
+        return array_function(self, func, types, args, kwargs)
 
     def __repr__(self):
         """
@@ -409,7 +860,7 @@ class ArrayTimeSeries(SizedContainerTimeSeriesInterface):
 
         # print out all values if less or equal than 5 values
         if len(self) <= 5:
-            return 'ArrayTimeSeries(t={}, v={})'.format(str(list(self._times)), str(list(self._values)))
+            return 'ArrayTimeSeries(t={}, v={})'.format(str(self._times.tolist()), str(self._values.tolist()))
         else:
             return 'ArrayTimeSeries(t=[{}, {}, ..., {}, {}], v=[{}, {}, ..., {}, {}])'.format( \
                 self._times[0], self._times[1], self._times[-2], self._times[-1], \
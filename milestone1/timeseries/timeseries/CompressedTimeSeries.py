@@ -0,0 +1,534 @@
+import numbers
+import numpy as np
+from timeseries.lazy import *
+from timeseries.lazy import _identity
+from timeseries.cache import StatCache
+from timeseries.quantiles import QuantileSketch, quantiles
+from timeseries.gorilla import decode_times, decode_values, encode_block, nbytes
+from timeseries.kernels import locate, rechunk
+from timeseries.ArrayTimeSeries import ArrayTimeSeries
+from timeseries.SizedContainerTimeSeriesInterface import SizedContainerTimeSeriesInterface
+
+# to avoid float problems, allow some tolerance!
+tolerance = 10 ** (-9)
+
+
+class CompressedTimeSeries(SizedContainerTimeSeriesInterface):
+    """
+    A timeseries kept in Gorilla style compressed blocks (see gorilla.py),
+    meant for series that mostly sit idle in memory.
+
+    Iteration decodes one block at a time, mean, std and abs are computed
+    from per block summaries without decoding anything. Positional access
+    decodes only the block holding the position. Everything needing the
+    full arrays (values, times, operators, interpolation, median) inflates
+    the series transparently and works on an uncompressed ArrayTimeSeries.
+
+    Attributes:
+        _blocks: list of encoded blocks
+        _summaries: count, mean, sum of squared deviations, min and max of every block
+        _offsets: position of the first point of every block
+        _block_starts: first time point of every block
+    """
+
+    def __init__(self, times, values, block_size=1024, **kwargs):
+        """
+        initializes a compressed timeseries from times and values
+
+        Parameters
+        ----------
+        times : the timepoints associated with the values
+        values : the values of the timeseries
+        block_size : number of points encoded together
+        kwargs : further arguments to the ArrayTimeSeries constructor (dtype, time_dtype)
+        """
+        self._encode(ArrayTimeSeries(times, values, copy=False, **kwargs), block_size)
+
+    @classmethod
+    def from_series(cls, ts, block_size=1024):
+        """
+        compresses an ArrayTimeSeries
+
+        Parameters
+        ----------
+        ts : the ArrayTimeSeries to compress
+        block_size : number of points encoded together
+
+        Returns
+        -------
+        new compressed timeseries object
+        """
+        cts = cls.__new__(cls)
+        cts._encode(ts, block_size)
+        return cts
+
+    def _encode(self, ts, block_size):
+        """
+        encodes all points of an ArrayTimeSeries block by block
+        """
+        assert block_size > 0, 'block_size must be positive'
+        times = ts.times()
+        values = ts.values()
+        self._block_size = block_size
+        self._time_dtype = times.dtype
+        self._dtype = values.dtype
+        self._blocks = []
+        summaries = []
+        for start in range(0, len(times), block_size):
+            block, summary = encode_block(times[start:start + block_size], values[start:start + block_size])
+            self._blocks.append(block)
+            summaries.append(summary)
+        self._summaries = np.array(summaries, dtype=float).reshape(len(summaries), 5)
+        self._offsets = np.arange(0, len(times), block_size)
+        self._block_starts = times[::block_size].copy()
+        self._len = len(times)
+        # the most recently decoded block, for positional access
+        self._cached = (None, None)
+        self._stats = StatCache()
+
+    def decompress(self):
+        """
+        Returns
+        -------
+        new uncompressed ArrayTimeSeries with all points
+        """
+        if len(self) == 0:
+            return ArrayTimeSeries([], [], dtype=self._dtype, time_dtype=self._time_dtype)
+        times = np.concatenate([decode_times(b, self._time_dtype) for b in self._blocks])
+        values = np.concatenate([decode_values(b, self._dtype) for b in self._blocks])
+        return ArrayTimeSeries._from_arrays(times, values)
+
+    @property
+    def nbytes(self):
+        """
+        Returns
+        -------
+        approximate memory used by the compressed points, in bytes
+        """
+        return sum(nbytes(b) for b in self._blocks) + self._summaries.nbytes \
+            + self._offsets.nbytes + self._block_starts.nbytes
+
+    def _block_values(self, i):
+        """
+        decodes the values of block i, keeping the last decoded block around
+        """
+        if self._cached[0] != i:
+            self._cached = (i, decode_values(self._blocks[i], self._dtype))
+        return self._cached[1]
+
+    def __len__(self):
+        """
+        returns length of TimeSeries
+        """
+        return self._len
+
+    def __getitem__(self, index):
+        """
+        Gets the value of the timeseries at the position index.
+        Only the block holding the position is decoded.
+
+        Parameters
+        ----------
+        index : the position to query for
+
+        Returns
+        -------
+        timeseries value at position index
+        """
+        assert (isinstance(index, int))
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('index out of range')
+        block = index // self._block_size
+        return self._block_values(block)[index - self._offsets[block]]
+
+    def __setitem__(self, index, value):
+        """
+        Updates the value of timeseries at position index.
+        Only the block holding the position is decoded and encoded again.
+
+        Parameters
+        ----------
+        index : position to update
+        val : new value to update timeseries at position index with
+        """
+        try:
+            assert (isinstance(index, int))
+            assert (isinstance(value, numbers.Number))
+        except Exception as e:
+            raise Exception("setitem must be of the form `object[int] = Number`") from e
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('index out of range')
+
+        i = index // self._block_size
+        block = self._blocks[i]
+        values = decode_values(block, self._dtype)
+        values[index - self._offsets[i]] = value
+        self._blocks[i], summary = encode_block(decode_times(block, self._time_dtype), values)
+        self._summaries[i] = summary
+        self._cached = (None, None)
+        self._stats.bump()
+        return values[index - self._offsets[i]]
+
+    def at(self, time):
+        """
+        Gets the value of the timeseries at a time point.
+        Only the block(s) around the time point are decoded.
+
+        Parameters
+        ----------
+        time : the time point to query for
+
+        Returns
+        -------
+        timeseries value at time, raises KeyError if time is not contained
+        """
+        if len(self) == 0:
+            raise KeyError(time)
+        i = max(int(np.searchsorted(self._block_starts, time, side='right')) - 1, 0)
+        # within tolerance a float time point may lie just before the next block
+        for j in (i, i + 1):
+            if j < len(self._blocks):
+                try:
+                    pos = locate(decode_times(self._blocks[j], self._time_dtype), time, tolerance)
+                except KeyError:
+                    continue
+                return self._block_values(j)[pos]
+        raise KeyError(time)
+
+    def __contains__(self, value):
+        """
+        Checks whether value is contained within stored values,
+        only blocks whose value range covers value are decoded
+
+        Parameters
+        ----------
+        value: value point to check for whether it is contained
+
+        Returns
+        -------
+        true if value point is contained else false
+        """
+        if not isinstance(value, numbers.Number):
+            return False
+        candidates = np.nonzero((self._summaries[:, 3] <= value) & (value <= self._summaries[:, 4]))[0]
+        return any(value in decode_values(self._blocks[i], self._dtype) for i in candidates)
+
+    def __iter__(self):
+        """
+        iterates over values, decoding one block at a time
+        """
+        for block in self._blocks:
+            yield from decode_values(block, self._dtype)
+
+    def itertimes(self):
+        """
+        iterate over time points, decoding one block at a time
+        """
+        for block in self._blocks:
+            yield from decode_times(block, self._time_dtype)
+
+    def itervalues(self):
+        """
+        iterate over values
+        """
+        return self.__iter__()
+
+    def iteritems(self):
+        """
+        iterate over (time, value) tuples, decoding one block at a time
+        """
+        for block in self._blocks:
+            yield from zip(decode_times(block, self._time_dtype), decode_values(block, self._dtype))
+
+    def iterchunks(self, size):
+        """
+        iterate over consecutive chunks of points, decoding one block at a time
+
+        Parameters
+        ----------
+        size : number of points per chunk, the last chunk may be smaller
+
+        Returns
+        -------
+        generator of (times, values) arrays
+        """
+        return rechunk(self.iterblocks(), size)
+
+    def iterblocks(self):
+        """
+        iterate over the compressed blocks, decoding one at a time
+
+        Returns
+        -------
+        generator of (times, values) arrays of block_size points each, the last block may be smaller
+        """
+        for block in self._blocks:
+            yield decode_times(block, self._time_dtype), decode_values(block, self._dtype)
+
+    def values(self):
+        """
+        returns stored values, inflated into a new array
+        """
+        return self.decompress().values()
+
+    def times(self):
+        """
+        returns stored time points, inflated into a new array
+        """
+        return self.decompress().times()
+
+    def items(self):
+        """
+        Returns
+        -------
+        returns sequence of (time, value) tuples
+        """
+        return self.iteritems()
+
+    def interpolate(self, times):
+        """
+        interpolates a new time sequence from the old one
+
+        Parameters
+        ----------
+        times : time points for which the new timeseries shall be interpolated
+
+        Returns
+        -------
+        new uncompressed timeseries object with time points times and interpolated values
+        """
+        return self.decompress().interpolate(times)
+
+    def rolling(self, window, by='count'):
+        """
+        statistics over the trailing window ending at every time point
+
+        Parameters
+        ----------
+        window : number of points (by='count') or span of time (by='time') of every window
+        by : 'count' for windows of the last window points, 'time' for
+             windows of the points within (t - window, t]
+
+        Returns
+        -------
+        Rolling object over the inflated series, see ArrayTimeSeries.rolling
+        """
+        return self.decompress().rolling(window, by)
+
+    @property
+    def lazy(self):
+        """
+        Returns
+        -------
+        returns lazified version of TimeSeries class
+        """
+        return LazyOperation(_identity, self)
+
+    def mean(self):
+        """
+        Returns
+        -------
+        mean of stored values, computed from the block summaries
+        """
+        if len(self) == 0:
+            raise ValueError
+        counts, means = self._summaries[:, 0], self._summaries[:, 1]
+        return self._dtype.type(np.dot(counts, means) / len(self))
+
+    def median(self):
+        """
+        Returns
+        -------
+        median of stored values
+        """
+        if len(self) == 0:
+            raise ValueError
+        return self.quantile(0.5)
+
+    def quantile(self, q, approx=False):
+        """
+        Parameters
+        ----------
+        q : quantile within [0, 1]
+        approx : if True, estimate it from the sketch of the values (see sketch)
+
+        Returns
+        -------
+        q-th quantile of stored values
+        """
+        return self.quantiles([q], approx)[0]
+
+    def quantiles(self, qs, approx=False):
+        """
+        computes several quantiles at once. Exact ones inflate the values,
+        approximate ones only need the cached sketch.
+
+        Parameters
+        ----------
+        qs : sequence of quantiles within [0, 1]
+        approx : if True, estimate them from the sketch of the values (see sketch)
+
+        Returns
+        -------
+        array with one quantile per entry of qs
+        """
+        if len(self) == 0:
+            raise ValueError
+        if approx:
+            return self.sketch().quantiles(qs)
+        return quantiles(self.values(), qs)
+
+    def sketch(self, compression=100):
+        """
+        summary of the values for approximate quantiles, built decoding one
+        block at a time and cached until the values are mutated
+
+        Parameters
+        ----------
+        compression : accuracy parameter, see QuantileSketch
+
+        Returns
+        -------
+        QuantileSketch of stored values, shared between calls (merging does not modify it)
+        """
+        def build():
+            sketch = QuantileSketch(compression)
+            for block in self._blocks:
+                sketch.update(decode_values(block, self._dtype))
+            return sketch
+
+        return self._stats.get(('sketch', compression), build)
+
+    def std(self):
+        """
+        :return: standard deviation of the stored values, merged from the block summaries.
+        """
+        if len(self) == 0:
+            return self._dtype.type(np.nan)
+        counts, means, m2s = self._summaries[:, 0], self._summaries[:, 1], self._summaries[:, 2]
+        mean = np.dot(counts, means) / len(self)
+        # parallel variance: squared deviations within and between the blocks
+        m2 = np.sum(m2s) + np.dot(counts, (means - mean) ** 2)
+        return self._dtype.type(np.sqrt(m2 / len(self)))
+
+    def __eq__(self, rhs):
+        """
+        Parameters
+        ----------
+        rhs : timeseries to compare to
+
+        Returns
+        -------
+        true if values of timeseries match and time domain is equal, false else
+        """
+        if isinstance(rhs, CompressedTimeSeries):
+            rhs = rhs.decompress()
+        return self.decompress() == rhs
+
+    def __radd__(self, lhs):
+        return self + lhs
+
+    def __add__(self, rhs):
+        """
+        Parameters
+        ----------
+        rhs : timeseries or constant to add
+
+        Returns
+        -------
+        new uncompressed timeseries object as result of the addition
+        """
+        if isinstance(rhs, CompressedTimeSeries):
+            rhs = rhs.decompress()
+        return self.decompress() + rhs
+
+    def __sub__(self, rhs):
+        """
+        Parameters
+        ----------
+        rhs : timeseries or constant to substract
+
+        Returns
+        -------
+        new uncompressed timeseries object as result of the substraction
+        """
+        if isinstance(rhs, CompressedTimeSeries):
+            rhs = rhs.decompress()
+        return self.decompress() - rhs
+
+    def __mul__(self, rhs):
+        """
+        Parameters
+        ----------
+        rhs : timeseries or constant to multiply with
+
+        Returns
+        -------
+        new uncompressed timeseries object as result of the multiplication
+        """
+        if isinstance(rhs, CompressedTimeSeries):
+            rhs = rhs.decompress()
+        return self.decompress() * rhs
+
+    def __abs__(self):
+        """
+        Returns
+        -------
+        returns l2 norm of the series values, computed from the block summaries
+        """
+        assert (len(self) > 0)
+        counts, means, m2s = self._summaries[:, 0], self._summaries[:, 1], self._summaries[:, 2]
+        return self._dtype.type(np.sqrt(np.sum(m2s) + np.dot(counts, means ** 2)))
+
+    def __bool__(self):
+        """
+        Returns
+        -------
+        returns whether l2 norm of the series values is positive
+        """
+        return bool(abs(self) > tolerance)
+
+    def __neg__(self):
+        """
+        Returns
+        -------
+        returns uncompressed series with negated values
+        """
+        return -self.decompress()
+
+    def __pos__(self):
+        """
+        Returns
+        -------
+        returns uncompressed identity (unary +)
+        """
+        return self.decompress()
+
+    def __repr__(self):
+        """
+        returns formal string representation
+
+        Returns
+        -------
+        formal string representation of timeseries class
+        """
+        if len(self) > 0:
+            return '<{},{}-CompressedTimeSeries>'.format(self._time_dtype.type, self._dtype.type)
+        else:
+            return '<empty-CompressedTimeSeries'
+
+    def __str__(self):
+        """
+        informal string representation in a descriptive manner
+        outputs the size of the compressed and uncompressed points
+
+        Returns
+        -------
+        informal string representation
+        """
+        raw = len(self) * (self._time_dtype.itemsize + self._dtype.itemsize)
+        return 'CompressedTimeSeries(n={}, {} bytes compressed from {} bytes)'.format(len(self), self.nbytes, raw)
@@ -0,0 +1,716 @@
+import numbers
+import numpy as np
+from timeseries.lazy import *
+from timeseries.lazy import _identity
+from timeseries.kernels import aligned, as_array, freeze
+from timeseries.dispatch import array_function, array_ufunc
+from timeseries.pickling import reduce_series
+from timeseries.quantiles import QuantileSketch, quantiles
+from timeseries.rolling import Rolling
+from timeseries.ArrayTimeSeries import ArrayTimeSeries
+from timeseries.SizedContainerTimeSeriesInterface import SizedContainerTimeSeriesInterface
+
+# to avoid float problems, allow some tolerance!
+tolerance = 10 ** (-9)
+
+
+class RegularTimeSeries(SizedContainerTimeSeriesInterface):
+    """
+    A timeseries sampled at a fixed rate. Only the values are stored, the
+    time point of value i is start + i * step.
+
+    Looking up time points and interpolating are closed-form arithmetic on
+    the grid instead of binary searches, and two regular series are aligned
+    if their grids match, which is checked in O(1).
+
+    Attributes:
+        _start: time point of the first value
+        _step: distance between two consecutive time points, positive
+        _values: array of values
+    """
+
+    def __init__(self, values, start=0.0, step=1.0, copy=True, dtype=float):
+        """
+        initializes a regular timeseries
+
+        Parameters
+        ----------
+        values : the values of the timeseries, a sequence, ndarray or buffer
+        start : time point of the first value
+        step : distance between two consecutive time points, must be positive
+        copy : if False, ndarrays and buffers of matching dtype are used as storage directly
+        dtype : dtype of the values, a float type (default float64)
+        """
+        try:
+            start = float(start)
+            step = float(step)
+        except (TypeError, ValueError) as e:
+            raise TypeError('start and step must be real numbers') from e
+        if not step > 0:
+            raise ValueError('step must be positive')
+
+        self._start = start
+        self._step = step
+        self._values = as_array(values, dtype=dtype, copy=copy)
+
+    @classmethod
+    def _from_grid(cls, start, step, values):
+        """
+        builds a regular timeseries directly around a values array without copying it
+
+        Parameters
+        ----------
+        start : time point of the first value
+        step : distance between two consecutive time points
+        values : array of values
+
+        Returns
+        -------
+        new timeseries object sharing the given array
+        """
+        ts = cls.__new__(cls)
+        ts._start = start
+        ts._step = step
+        ts._values = values
+        return ts
+
+    @property
+    def start(self):
+        """
+        time point of the first value
+        """
+        return self._start
+
+    @property
+    def step(self):
+        """
+        distance between two consecutive time points
+        """
+        return self._step
+
+    def same_grid(self, other):
+        """
+        checks in O(1) whether another regular timeseries has the same time points
+
+        Parameters
+        ----------
+        other : regular timeseries
+
+        Returns
+        -------
+        true if start, step and length of both series match
+        """
+        return len(self) == len(other) and (len(self) == 0 or (
+            abs(self._start - other._start) <= tolerance
+            and abs(self._step - other._step) * max(len(self) - 1, 1) <= tolerance))
+
+    def to_array(self):
+        """
+        Returns
+        -------
+        ArrayTimeSeries with explicit time points, sharing the values
+        """
+        return ArrayTimeSeries._from_arrays(self.times(), self._values)
+
+    def __len__(self):
+        """
+        returns length of TimeSeries
+
+        >>> len(RegularTimeSeries([1, 2, 3], start=10, step=0.5))
+        3
+        """
+        return len(self._values)
+
+    def __getitem__(self, index):
+        """
+        Gets the value of the timeseries at the position index.
+        Slices are taken over time points instead (see between).
+
+        Parameters
+        ----------
+        index : the position to query for, or a slice of time points
+
+        Returns
+        -------
+        timeseries value at position index, or a timeseries view for slices
+
+        >>> ts = RegularTimeSeries([1, 2, 3, 4], start=10, step=0.5)
+        >>> float(ts[1])
+        2.0
+        >>> print(ts[10.5:11])
+        RegularTimeSeries(start=10.5, step=0.5, v=[2.0, 3.0])
+        """
+        if isinstance(index, slice):
+            if index.step is not None:
+                raise ValueError('time slices do not support a step')
+            return self.between(index.start, index.stop)
+        assert (isinstance(index, int))
+        return self._values[index]
+
+    def _position(self, time):
+        """
+        fractional position of a time point (or array of them) on the grid
+        """
+        return (np.asarray(time, dtype=float) - self._start) / self._step
+
+    def at(self, time):
+        """
+        Gets the value of the timeseries at a time point, computed from the grid.
+
+        Parameters
+        ----------
+        time : the time point to query for
+
+        Returns
+        -------
+        timeseries value at time, raises KeyError if time is not on the grid
+
+        >>> ts = RegularTimeSeries([1, 2, 3, 4], start=10, step=0.5)
+        >>> float(ts.at(11.0))
+        3.0
+        """
+        if not isinstance(time, numbers.Real):
+            raise KeyError(time)
+        position = self._position(time)
+        if not np.isfinite(position):
+            raise KeyError(time)
+        i = int(np.rint(position))
+        if 0 <= i < len(self) and abs(self._start + i * self._step - time) <= tolerance:
+            return self._values[i]
+        raise KeyError(time)
+
+    def between(self, start=None, stop=None):
+        """
+        Gets all time points within [start, stop], computed from the grid.
+        The result is a view, it shares memory with this timeseries.
+
+        Parameters
+        ----------
+        start : first time point of the window, None for an open start
+        stop : last time point of the window, None for an open end
+
+        Returns
+        -------
+        new regular timeseries object viewing the time points in the window
+        """
+        n = len(self)
+        lo = 0 if start is None else int(np.ceil(self._position(start) - tolerance / self._step))
+        hi = n if stop is None else int(np.floor(self._position(stop) + tolerance / self._step)) + 1
+        lo = min(max(lo, 0), n)
+        hi = min(max(hi, lo), n)
+        return RegularTimeSeries._from_grid(self._start + lo * self._step, self._step, self._values[lo:hi])
+
+    def __setitem__(self, index, value):
+        """
+        Updates the value of timeseries at position index.
+
+        Parameters
+        ----------
+        index : position to update
+        val : new value to update timeseries at position index with
+        """
+        try:
+            assert (isinstance(index, int))
+            assert (isinstance(value, numbers.Number))
+        except Exception as e:
+            raise Exception("setitem must be of the form `object[int] = Number`") from e
+        self._values[index] = value
+        return self._values[index]
+
+    def __contains__(self, value):
+        """
+        Checks whether value is contained within stored values
+
+        Parameters
+        ----------
+        value: value point to check for whether it is contained
+
+        Returns
+        -------
+        true if value point is contained else false
+        """
+        return value in self._values
+
+    def __iter__(self):
+        """
+        iterates over values
+        """
+        for v in self._values:
+            yield v
+
+    def itertimes(self):
+        """
+        iterate over time points
+        """
+        for i in range(len(self)):
+            yield self._start + i * self._step
+
+    def itervalues(self):
+        """
+        iterate over values
+        """
+        return self.__iter__()
+
+    def iteritems(self):
+        """
+        iterate over (time, value) tuples
+        """
+        return self.items()
+
+    def iterchunks(self, size):
+        """
+        iterate over consecutive chunks of points, for bulk consumers which
+        process whole arrays instead of single points
+
+        Parameters
+        ----------
+        size : number of points per chunk, the last chunk may be smaller
+
+        Returns
+        -------
+        generator of (times, values), the values are views, the time points
+        of every chunk are computed from the grid
+        """
+        if size < 1:
+            raise ValueError('chunks must hold a positive number of points')
+        for start in range(0, len(self), size):
+            values = self._values[start:start + size]
+            yield self._start + self._step * np.arange(start, start + len(values), dtype=float), values
+
+    def iterblocks(self):
+        """
+        iterate over the blocks the points are stored in, a single block here
+
+        Returns
+        -------
+        generator of (times, values), the values are a view
+        """
+        yield self.times(), self._values
+
+    def values(self):
+        """
+        returns stored values
+        """
+        return self._values
+
+    def times(self):
+        """
+        returns the time points, computed from the grid into a new read-only array
+        """
+        return freeze(self._start + self._step * np.arange(len(self), dtype=float))
+
+    def items(self):
+        """
+        Returns
+        -------
+        returns sequence of (time, value) tuples
+        """
+        return zip(self.itertimes(), self._values)
+
+    def interpolate(self, times):
+        """
+        interpolates a new time sequence from the old one. Neighbouring
+        grid points are computed directly from each time point.
+
+        Parameters
+        ----------
+        times : time points for which the new timeseries shall be interpolated
+
+        Returns
+        -------
+        new ArrayTimeSeries object with time points times and interpolated values,
+        values outside of the grid are clamped to the first/last value
+
+        >>> ts = RegularTimeSeries([0, 10, 20], start=0, step=2)
+        >>> print(ts.interpolate([1, 5, 9]))
+        ArrayTimeSeries(t=[1.0, 5.0, 9.0], v=[5.0, 20.0, 20.0])
+        """
+        query = as_array(times, dtype=float)
+        query.sort()
+        n = len(self)
+        if len(query) == 0:
+            return ArrayTimeSeries._from_arrays(query, self._values[:0].copy())
+        if n == 0:
+            raise ValueError('can not interpolate an empty timeseries')
+        if n == 1:
+            return ArrayTimeSeries._from_arrays(query, np.full(len(query), self._values[0], dtype=self._values.dtype))
+
+        # p(x) = f(x_lo) + (f(x_lo + 1) - f(x_lo)) (k - lo) for k the position of x on the grid
+        k = np.clip(self._position(query), 0, n - 1)
+        lo = np.minimum(k.astype(np.intp), n - 2)
+        v0 = self._values[lo]
+        vals = (v0 + (self._values[lo + 1] - v0) * (k - lo)).astype(self._values.dtype, copy=False)
+        return ArrayTimeSeries._from_arrays(query, vals)
+
+    def rolling(self, window, by='count'):
+        """
+        statistics over the trailing window ending at every time point, all
+        of them computed in O(n) for the whole series
+
+        Parameters
+        ----------
+        window : number of points (by='count') or span of time (by='time') of every window
+        by : 'count' for windows of the last window points, 'time' for
+             windows of the points within (t - window, t]
+
+        Returns
+        -------
+        Rolling object whose mean, sum, std, min, max and count methods return
+        regular timeseries on the same grid (see rolling.Rolling)
+        """
+        return Rolling(self.times(), self._values, window, by,
+                       lambda values: RegularTimeSeries._from_grid(self._start, self._step, values))
+
+    @property
+    def lazy(self):
+        """
+        Returns
+        -------
+        returns lazified version of TimeSeries class
+        """
+        return LazyOperation(_identity, self)
+
+    def mean(self):
+        """
+        Returns
+        -------
+        mean of stored values
+        """
+        if len(self) == 0:
+            raise ValueError
+        return self._values.mean()
+
+    def median(self):
+        """
+        Returns
+        -------
+        median of stored values
+        """
+        if len(self) == 0:
+            raise ValueError
+        return self.quantile(0.5)
+
+    def quantile(self, q, approx=False):
+        """
+        Parameters
+        ----------
+        q : quantile within [0, 1]
+        approx : if True, estimate it from a sketch of the values (see sketch)
+
+        Returns
+        -------
+        q-th quantile of stored values
+        """
+        return self.quantiles([q], approx)[0]
+
+    def quantiles(self, qs, approx=False):
+        """
+        computes several quantiles at once, exact ones with a single partition pass
+
+        Parameters
+        ----------
+        qs : sequence of quantiles within [0, 1]
+        approx : if True, estimate them from a sketch of the values (see sketch)
+
+        Returns
+        -------
+        array with one quantile per entry of qs
+        """
+        if len(self) == 0:
+            raise ValueError
+        if approx:
+            return self.sketch().quantiles(qs)
+        return quantiles(self._values, qs)
+
+    def sketch(self, compression=100):
+        """
+        Parameters
+        ----------
+        compression : accuracy parameter, see QuantileSketch
+
+        Returns
+        -------
+        new QuantileSketch of stored values
+        """
+        return QuantileSketch.from_values(self._values, compression)
+
+    def std(self):
+        """
+        :return: standard deviation of the stored values.
+        """
+        return np.std(self._values)
+
+    def _check_aligned(self, rhs):
+        """
+        raises ValueError unless rhs has the same time points, grids are compared
+        in O(1), explicit time axes of ArrayTimeSeries are compared point by point
+        """
+        if isinstance(rhs, RegularTimeSeries):
+            ok = self.same_grid(rhs)
+        else:
+            ok = aligned(self.times(), rhs._times)
+        if not ok:
+            raise ValueError(str(self) + ' and ' + str(rhs) + 'must have the same time points')
+
+    def __eq__(self, rhs):
+        """
+        Parameters
+        ----------
+        rhs : timeseries to compare to
+
+        Returns
+        -------
+        true if values of timeseries match and time domain is equal, false else
+        """
+        if not isinstance(rhs, (RegularTimeSeries, ArrayTimeSeries)):
+            if isinstance(rhs, (np.ndarray, list)):
+                raise NotImplementedError
+            else:
+                raise TypeError('can not compare time series to {}'.format(type(rhs)))
+
+        # this could be seen also as return false
+        if len(self) != len(rhs):
+            raise ValueError(str(self) + ' and ' + str(rhs) + 'must have the same time points')
+
+        return np.allclose(self._values, rhs.values())
+
+    def _apply(self, ufunc, rhs, out=None):
+        """
+        applies a binary numpy ufunc elementwise with a timeseries or constant
+
+        Parameters
+        ----------
+        ufunc : numpy ufunc to apply, e.g. np.add
+        rhs : timeseries on the same time points, array of values at those points, or constant
+        out : optional regular timeseries on the same grid that receives the result
+
+        Returns
+        -------
+        out, or a new regular timeseries object
+        """
+        if isinstance(rhs, (RegularTimeSeries, ArrayTimeSeries)):
+            self._check_aligned(rhs)
+            rhs = rhs.values()
+        elif isinstance(rhs, np.ndarray):
+            # an array holds values at the own time points, as in ufunc calls on the series
+            if rhs.shape != self._values.shape:
+                raise ValueError('{} and an array of shape {} must have the same length'.format(self, rhs.shape))
+        elif not isinstance(rhs, numbers.Real):
+            if isinstance(rhs, list):
+                raise NotImplementedError
+            else:
+                raise TypeError('can not compare time series to {}'.format(type(rhs)))
+
+        if out is None:
+            return RegularTimeSeries._from_grid(self._start, self._step, ufunc(self._values, rhs))
+
+        if not isinstance(out, RegularTimeSeries):
+            raise TypeError('out must be a regular time series, not {}'.format(type(out)))
+        self._check_aligned(out)
+        ufunc(self._values, rhs, out=out._values)
+        return out
+
+    def add(self, rhs, out=None):
+        """
+        Parameters
+        ----------
+        rhs : timeseries on the same time points or constant to add
+        out : regular timeseries on the same grid whose value buffer receives
+              the result instead of allocating a new one, may be self
+
+        Returns
+        -------
+        out, or new regular timeseries object as result of the addition
+        """
+        return self._apply(np.add, rhs, out)
+
+    def sub(self, rhs, out=None):
+        """
+        Parameters
+        ----------
+        rhs : timeseries on the same time points or constant to substract
+        out : regular timeseries on the same grid whose value buffer receives
+              the result instead of allocating a new one, may be self
+
+        Returns
+        -------
+        out, or new regular timeseries object as result of the substraction
+        """
+        return self._apply(np.subtract, rhs, out)
+
+    def mul(self, rhs, out=None):
+        """
+        Parameters
+        ----------
+        rhs : timeseries on the same time points or constant to multiply with
+        out : regular timeseries on the same grid whose value buffer receives
+              the result instead of allocating a new one, may be self
+
+        Returns
+        -------
+        out, or new regular timeseries object as result of the multiplication
+        """
+        return self._apply(np.multiply, rhs, out)
+
+    def __radd__(self, lhs):
+        return self + lhs
+
+    def __add__(self, rhs):
+        """
+        Parameters
+        ----------
+        rhs : timeseries or constant to add
+
+        Returns
+        -------
+        new timeseries object as result of the addition
+        """
+        return self.add(rhs)
+
+    def __sub__(self, rhs):
+        """
+        Parameters
+        ----------
+        rhs : timeseries or constant to substract
+
+        Returns
+        -------
+        new timeseries object as result of the substraction
+        """
+        return self.sub(rhs)
+
+    def __mul__(self, rhs):
+        """
+        Parameters
+        ----------
+        rhs : timeseries or constant to multiply with
+
+        Returns
+        -------
+        new timeseries object as result of the multiplication
+        """
+        return self.mul(rhs)
+
+    def __iadd__(self, rhs):
+        """
+        in-place addition, reuses the value buffer of this timeseries
+        """
+        return self.add(rhs, out=self)
+
+    def __isub__(self, rhs):
+        """
+        in-place substraction, reuses the value buffer of this timeseries
+        """
+        return self.sub(rhs, out=self)
+
+    def __imul__(self, rhs):
+        """
+        in-place multiplication, reuses the value buffer of this timeseries
+        """
+        return self.mul(rhs, out=self)
+
+    def __abs__(self):
+        """
+        Returns
+        -------
+        returns l2 norm of the series values
+        """
+        assert (len(self) > 0)
+
+        return np.sqrt(np.sum(self._values * self._values))
+
+    def __bool__(self):
+        """
+        Returns
+        -------
+        returns whether l2 norm of the series values is positive
+        """
+        return bool(abs(self) > tolerance)
+
+    def __neg__(self):
+        """
+        Returns
+        -------
+        returns series with negated values
+        """
+        return RegularTimeSeries._from_grid(self._start, self._step, -self._values)
+
+    def __pos__(self):
+        """
+        Returns
+        -------
+        returns identity (unary +)
+        """
+        return RegularTimeSeries._from_grid(self._start, self._step, self._values.copy())
+
+    def _same_axis(self, other):
+        """
+        checks whether another series has the same time points, in O(1)
+        """
+        return self.same_grid(other)
+
+    def _wrap(self, values):
+        """
+        builds a series on the time points of this one around an array of values
+        """
+        return RegularTimeSeries._from_grid(self._start, self._step, values)
+
+    def __reduce_ex__(self, protocol):
+        """
+        pickles the arrays of the series, with protocol 5 as PickleBuffer so
+        they can be passed out-of-band without copies (see pickling.py).
+        Cached statistics are not pickled.
+        """
+        return reduce_series(RegularTimeSeries._from_grid, (self._start, self._step, self._values), protocol)
+
+    def __array__(self, dtype=None, copy=None):
+        """
+        the values as ndarray, without copying unless a copy or another dtype is requested
+        """
+        if copy:
+            return np.array(self._values, dtype=dtype)
+        return np.asarray(self._values, dtype=dtype)
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        """
+        numpy ufuncs (np.log(ts), np.maximum(ts1, ts2), ...) run on the value
+        buffers and return series on the same time points, see dispatch.py
+        """
+        return array_ufunc(self, ufunc, method, inputs, kwargs)
+
+    def __array_function__(self, func, types, args, kwargs):
+        """
+        numpy functions (np.sum(ts), np.clip(ts, 0, 1), ...) run on the value
+        buffers, see dispatch.py
+        """
+        return array_function(self, func, types, args, kwargs)
+
+    def __repr__(self):
+        """
+        returns formal string representation
+
+        Returns
+        -------
+        formal string representation of timeseries class
+        """
+        if len(self) > 0:
+            return '<{},{}-RegularTimeSeries>'.format(type(self._start), type(self._values[0]))
+        else:
+            return '<empty-RegularTimeSeries'
+
+    def __str__(self):
+        """
+        informal string representation in a descriptive manner
+        outputs elements at the start and end of the timeseries
+
+        Returns
+        -------
+        informal string representation
+        """
+
+        # print out all values if less or equal than 5 values
+        if len(self) <= 5:
+            return 'RegularTimeSeries(start={}, step={}, v={})'.format(self._start, self._step, str(self._values.tolist()))
+        else:
+            return 'RegularTimeSeries(start={}, step={}, v=[{}, {}, ..., {}, {}])'.format( \
+                self._start, self._step, self._values[0], self._values[1], self._values[-2], self._values[-1])
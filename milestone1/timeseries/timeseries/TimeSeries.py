@@ -5,6 +5,14 @@ Reference Implementation for the TimeSeries class and Further Assignments.
 import numpy as np
 import numbers
 from timeseries.lazy import *
+from timeseries.lazy import _identity
+from timeseries.cache import StatCache
+from timeseries.dispatch import array_function, array_ufunc
+from timeseries.pickling import reduce_series
+from timeseries.quantiles import QuantileSketch, check_quantiles, quantiles
+from timeseries.rolling import Rolling
+from timeseries.kernels import aligned, as_array, chunks, freeze, interpolate, is_sorted, locate, resample, window
+from timeseries.RegularTimeSeries import RegularTimeSeries
 from timeseries.SizedContainerTimeSeriesInterface import SizedContainerTimeSeriesInterface
 
 
@@ -16,9 +24,15 @@ class TimeSeries(SizedContainerTimeSeriesInterface):
     """
 	A class to store a non-uniform timeseries
 
+	Times and values are kept in contiguous float arrays, so that all
+	operators and statistics run as vectorized numpy kernels. The public
+	accessors still hand out lists. Statistics are cached until the values
+	are mutated through __setitem__ (see cache.StatCache).
+
 	Attributes:
-		_times: the time points of the given time series
-		_values: the values of the given time series
+		_times: the time points of the given time series (read-only array)
+		_values: the values of the given time series (array)
+		_stats: cache of statistics over the values
 
 	Methods:
 
@@ -64,27 +78,48 @@ class TimeSeries(SizedContainerTimeSeriesInterface):
 		"""
         try:
             if values is not None:
-                times = list(times_or_values)
-                values = list(values)
+                times = as_array(times_or_values)
+                values = as_array(values)
             else:
-                values = list(times_or_values)
-                times = list(range(len(values)))
-        except:
-            raise TypeError('times and values must be coercible to internal storage type (list)')
-
-        assert isinstance(times, list), 'times should be a list'
-        assert isinstance(values, list), 'values should be a list'
+                values = as_array(times_or_values)
+                times = np.arange(len(values), dtype=float)
+        except TypeError as e:
+            raise TypeError('times and values must be coercible to internal storage type (float array)') from e
+        except ValueError as e:
+            raise ValueError('times and values must be numeric type') from e
 
         if len(times) != len(values):
             raise ValueError('times and values should have the same length')
-        if len(values):
-            # XXX: Make this better
-            print(not isinstance(times[0], (int, float, complex)))
-            if not isinstance(times[0], (int, float, complex)):
-                raise ValueError('times and values must be numeric type')
 
-        self._times = list(times)
-        self._values = list(values)
+        # the time axis is immutable, so it can be shared by all derived series
+        self._times = freeze(times)
+        self._values = values
+        self._stats = StatCache()
+        self._times_sorted = None
+
+    @classmethod
+    def _from_arrays(cls, times, values, stats=None):
+        """
+        builds a timeseries directly around existing time and value arrays
+        without copying them. Passing the time axis of another series shares it,
+        so that both are aligned in O(1).
+
+        Parameters
+        ----------
+        times : array of time points
+        values : array of values associated with the time points
+        stats : statistics cache of a series whose values are viewed, see StatCache.share
+
+        Returns
+        -------
+        new timeseries object sharing the given storage
+        """
+        ts = cls.__new__(cls)
+        ts._times = freeze(times)
+        ts._values = values
+        ts._stats = StatCache() if stats is None else stats
+        ts._times_sorted = None
+        return ts
 
     def __len__(self):
         """
@@ -101,25 +136,94 @@ class TimeSeries(SizedContainerTimeSeriesInterface):
     def __getitem__(self, index):
         """
 		Gets the value of the timeseries at the position index.
-		This implementation does not search against times.
+		Integer indices do not search against times, slices are taken
+		over time points instead (see between).
 
 		Parameters
 		----------
-		index : the position to query for 
+		index : the position to query for, or a slice of time points
 
 		Returns
 		-------
-		timeseries value at position index
+		timeseries value at position index, or a timeseries view for slices
 
 		>>> ts = TimeSeries([0.5, 0.7, 0.8, 1.0], [0.5, 1., 2., 4.])
 		>>> ts[0]
 		0.5
 		>>> ts[3]
 		4.0
+		>>> print(ts[0.6:0.8])
+		TimeSeries(t=[0.7, 0.8], v=[1.0, 2.0])
 		"""
+        if isinstance(index, slice):
+            if index.step is not None:
+                raise ValueError('time slices do not support a step')
+            return self.between(index.start, index.stop)
         assert(isinstance(index, int))
         return self._values[index]
 
+    def at(self, time):
+        """
+		Gets the value of the timeseries at a time point, using binary search
+		if the time points are in increasing order and a linear scan else.
+
+		Parameters
+		----------
+		time : the time point to query for
+
+		Returns
+		-------
+		timeseries value at time (the first one for repeated time points),
+		raises KeyError if time is not contained
+
+		>>> ts = TimeSeries([0.5, 0.7, 0.8, 1.0], [0.5, 1., 2., 4.])
+		>>> float(ts.at(0.8))
+		2.0
+		>>> float(TimeSeries([3, 1, 2], [1., 2., 3.]).at(1))
+		2.0
+		"""
+        if self._sorted():
+            return self._values[locate(self._times, time)]
+        if self._times.dtype.kind == 'f':
+            matches = np.flatnonzero(np.abs(self._times - time) <= tolerance)
+        else:
+            matches = np.flatnonzero(self._times == time)
+        if len(matches) == 0:
+            raise KeyError(time)
+        return self._values[matches[0]]
+
+    def between(self, start=None, stop=None):
+        """
+		Gets all time points within [start, stop] using binary search.
+		The result is a view, it shares memory with this timeseries.
+		The time points need to be in increasing order, else ValueError.
+
+		Parameters
+		----------
+		start : first time point of the window, None for an open start
+		stop : last time point of the window, None for an open end
+
+		Returns
+		-------
+		new timeseries object viewing the time points in the window
+
+		>>> ts = TimeSeries([0.5, 0.7, 0.8, 1.0], [0.5, 1., 2., 4.])
+		>>> print(ts.between(0.6, 0.8))
+		TimeSeries(t=[0.7, 0.8], v=[1.0, 2.0])
+		"""
+        if not self._sorted():
+            raise ValueError('time windows need the time points in increasing order')
+        lo, hi = window(self._times, start, stop)
+        return TimeSeries._from_arrays(self._times[lo:hi], self._values[lo:hi], self._stats.share())
+
+    def _sorted(self):
+        """
+		whether the time points are in increasing order, checked once as they are immutable
+		"""
+        if self._times_sorted is None:
+            self._times_sorted = is_sorted(self._times)
+        return self._times_sorted
+
     def __setitem__(self, index, value):
         """
         Updates the value of timeseries at position index.
@@ -142,6 +246,7 @@ class TimeSeries(SizedContainerTimeSeriesInterface):
         except Exception as e:
             raise Exception("setitem must be of the form `object[int] = Number`") from e
         self._values[index] = value
+        self._stats.bump()
         return self._values[index]
 
     def __contains__(self, value):
@@ -182,22 +287,47 @@ class TimeSeries(SizedContainerTimeSeriesInterface):
         """
 		iterate over (time, value) tuples
 		"""
-        for item in self.items():
-            yield item
+        return zip(self._times, self._values)
+
+    def iterchunks(self, size):
+        """
+		iterate over consecutive chunks of points as array views, for bulk
+		consumers which process whole arrays instead of single points
+
+		Parameters
+		----------
+		size : number of points per chunk, the last chunk may be smaller
+
+		Returns
+		-------
+		generator of (times, values) array views, in the stored order
+		"""
+        return chunks(self._times, self._values, size)
+
+    def iterblocks(self):
+        """
+		iterate over the blocks the points are stored in, a single block of
+		the whole time and value arrays here
+
+		Returns
+		-------
+		generator of (times, values) array views
+		"""
+        yield self._times, self._values
 
     # @property
     def values(self):
         """
-		returns stored values
+		returns stored values as list
 		"""
-        return self._values
+        return self._values.tolist()
 
     # @property
     def times(self):
         """
-		returns stored time points
+		returns stored time points as list
 		"""
-        return self._times
+        return self._times.tolist()
 
     # @property
     def items(self):
@@ -220,32 +350,80 @@ class TimeSeries(SizedContainerTimeSeriesInterface):
 		-------
 		new timeseries object with time points times and interpolated values
 		"""
-        # interpolate for all given points
-        if len(times) > 0:
-            vals = []
-            for t in times:
-                # find nearest point using numpy binary search (right index, i.e. the larger one)
-                indR = np.searchsorted(self._times, t, side='right')
-
-                # handle special cases at boundaries
-                if indR == 0:
-                    vals.append(self._values[0])
-                elif indR == len(self):
-                    vals.append(self._values[-1])
-                else:
-                    # interpolate
-                    # p(x) = f(x_0) + (f(x_1) - f(x_0)) / (x_1 - x_0) (x - x_0)
-                    interp_val = self._values[indR - 1] + (self._values[indR] - self._values[indR - 1]) / \
-                                                          (self._times[indR] - self._times[indR - 1]) * (
-                                                          t - self._times[indR - 1])
-
-                    vals.append(interp_val)
-
-            return TimeSeries(times, vals)
-        # empty list submitted, return empty timeseries!
+        # time axes of other series are immutable, so they can be shared directly
+        # which keeps all series interpolated onto them aligned in O(1)
+        if isinstance(times, np.ndarray) and not times.flags.writeable \
+                and times.dtype == float and times.ndim == 1:
+            query = times
         else:
+            # work on a copy of the whole query grid at once
+            query = np.array(times, copy=True, dtype=float)
+        if len(query) == 0:
+            # empty list submitted, return empty timeseries!
             return TimeSeries([], [])
 
+        return TimeSeries._from_arrays(query, interpolate(self._times, self._values, query))
+
+    def resample(self, bucket_width, how='mean', origin=None):
+        """
+		downsamples the timeseries by aggregating all values within buckets
+		of equal width, instead of taking point samples like interpolate
+
+		Parameters
+		----------
+		bucket_width : positive width of every bucket
+		how : aggregation, one of 'mean', 'min', 'max', 'last', 'count' and
+		      'sum', or a list of them which are all computed in one pass
+		origin : start of the first bucket, the first time point if None
+
+		Returns
+		-------
+		RegularTimeSeries with one value per bucket starting at origin, or a dict
+		of them by aggregation if how is a list. Empty buckets count 0, sum 0
+		and are nan otherwise.
+
+		>>> ts = TimeSeries([0, 0.5, 1.2, 3.9], [1.0, 2.0, 3.0, 4.0])
+		>>> print(ts.resample(1.0, how='count'))
+		RegularTimeSeries(start=0.0, step=1.0, v=[2, 1, 0, 1])
+		"""
+        times, values = self._times, self._values
+        # the time points are kept in the given order, buckets need them sorted
+        if not is_sorted(times):
+            order = np.argsort(times, kind='stable')
+            times, values = times[order], values[order]
+
+        names = [how] if isinstance(how, str) else list(how)
+        edges, aggs = resample(times, values, bucket_width, names, origin)
+        start = float(edges[0]) if len(edges) else float(origin or 0)
+        result = {name: RegularTimeSeries._from_grid(start, float(bucket_width), agg) for name, agg in aggs.items()}
+        return result[how] if isinstance(how, str) else result
+
+    def rolling(self, window, by='count'):
+        """
+		statistics over the trailing window ending at every time point, all
+		of them computed in O(n) for the whole series
+
+		Parameters
+		----------
+		window : number of points (by='count') or span of time (by='time') of every window
+		by : 'count' for windows of the last window points (in the stored order),
+		     'time' for windows of the points within (t - window, t], which
+		     needs the time points in increasing order
+
+		Returns
+		-------
+		Rolling object whose mean, sum, std, min, max and count methods return
+		timeseries on the same time points (see rolling.Rolling)
+
+		>>> ts = TimeSeries([1.0, 3.0, 2.0, 5.0])
+		>>> print(ts.rolling(2).mean())
+		TimeSeries(t=[0.0, 1.0, 2.0, 3.0], v=[1.0, 2.0, 2.5, 3.5])
+		"""
+        if by == 'time' and not self._sorted():
+            raise ValueError('time windows need the time points in increasing order')
+        return Rolling(self._times, self._values, window, by,
+                       lambda values: TimeSeries._from_arrays(self._times, values))
+
     @property
     def lazy(self):
         """
@@ -253,11 +431,7 @@ class TimeSeries(SizedContainerTimeSeriesInterface):
 		-------
 		returns lazified version of TimeSeries class 
 		"""
-
-        def id_fun(*args, **kwargs):
-            return self
-
-        return LazyOperation(id_fun, self)
+        return LazyOperation(_identity, self)
 
     def mean(self):
         """
@@ -271,7 +445,7 @@ class TimeSeries(SizedContainerTimeSeriesInterface):
 		"""
         if len(self) == 0:
             raise ValueError
-        return np.array(self._values).mean()
+        return self._stats.get('mean', self._values.mean)
 
     def median(self):
         """
@@ -285,13 +459,65 @@ class TimeSeries(SizedContainerTimeSeriesInterface):
 		"""
         if len(self) == 0:
             raise ValueError
-        return np.median(self._values)
+        return self.quantile(0.5)
+
+    def quantile(self, q, approx=False):
+        """
+		Parameters
+		----------
+		q : quantile within [0, 1]
+		approx : if True, estimate it from the sketch of the values (see sketch)
+
+		Returns
+		-------
+		q-th quantile of stored values, interpolated linearly between order statistics
+
+		>>> ts = TimeSeries([5.0, 1.0, 4.0, 2.0, 3.0])
+		>>> float(ts.quantile(0.25))
+		2.0
+		"""
+        return self.quantiles([q], approx)[0]
+
+    def quantiles(self, qs, approx=False):
+        """
+		computes several quantiles at once, exact ones with a single partition pass
+
+		Parameters
+		----------
+		qs : sequence of quantiles within [0, 1]
+		approx : if True, estimate them from the sketch of the values (see sketch)
+
+		Returns
+		-------
+		array with one quantile per entry of qs
+		"""
+        if len(self) == 0:
+            raise ValueError
+        if approx:
+            return self.sketch().quantiles(qs)
+        qs = tuple(check_quantiles(qs))
+        return self._stats.get(('quantiles', qs), lambda: quantiles(self._values, qs)).copy()
+
+    def sketch(self, compression=100):
+        """
+		summary of the values for approximate quantiles, built once and
+		cached until the values are mutated
+
+		Parameters
+		----------
+		compression : accuracy parameter, see QuantileSketch
+
+		Returns
+		-------
+		QuantileSketch of stored values, shared between calls (merging does not modify it)
+		"""
+        return self._stats.get(('sketch', compression), lambda: QuantileSketch.from_values(self._values, compression))
 
     def std(self):
         """
         :return: standard deviation of the stored values.
         """
-        return np.std(self._values)
+        return self._stats.get('std', lambda: np.std(self._values))
 
     def __eq__(self, rhs):
         """
@@ -310,8 +536,6 @@ class TimeSeries(SizedContainerTimeSeriesInterface):
 		>>> ta == tb
 		False
 		"""
-        print(rhs)
-        print(self)
         if not isinstance(rhs, TimeSeries):
             if isinstance(rhs, (np.ndarray, list)):
                 raise NotImplementedError
@@ -319,13 +543,10 @@ class TimeSeries(SizedContainerTimeSeriesInterface):
                 raise TypeError('can not compare TimeSeries to {}'.format(type(rhs)))
 
         # this could be seen also as return false
-        if len(self) != len(rhs):
-            raise ValueError(str(self) + ' and ' + str(rhs) + 'must have the same time points')
-
-        if not np.allclose(self._times, rhs.times(), atol=tolerance):
+        if not aligned(self._times, rhs._times):
             raise ValueError(str(self) + ' and ' + str(rhs) + 'must have the same time points')
 
-        return np.allclose(self._values, rhs.values(), atol=tolerance)
+        return np.allclose(self._values, rhs._values, atol=tolerance)
 
     def __radd__(self, lhs):
         return self + lhs
@@ -334,25 +555,25 @@ class TimeSeries(SizedContainerTimeSeriesInterface):
         """
 		Parameters
 		----------
-		rhs : timeseries or constant to add
+		rhs : timeseries, array of values at the own time points, or constant to add
 
 		Returns
 		-------
 		new timeseries object as result of the addition
 		"""
-        print(type(rhs))
         if isinstance(rhs, (TimeSeries)):
-            if len(self) != len(rhs):
-                raise ValueError(str(self) + ' and ' + str(rhs) + 'must have the same time points')
-
-            if not np.allclose(self._times, rhs.times(), atol=tolerance):
+            if not aligned(self._times, rhs._times):
                 raise ValueError(str(self) + ' and ' + str(rhs) + 'must have the same time points')
-            return TimeSeries(self._times, [self._values[i] + rhs.values()[i] for i in range(len(self._values))])
+            return TimeSeries._from_arrays(self._times, self._values + rhs._values)
 
         elif isinstance(rhs, (int, float)):
-            return TimeSeries(self._times, [v + rhs for v in self._values])
+            return TimeSeries._from_arrays(self._times, self._values + rhs)
+        elif isinstance(rhs, np.ndarray):
+            if rhs.shape != self._values.shape:
+                raise ValueError('{} and an array of shape {} must have the same length'.format(self, rhs.shape))
+            return np.add(self, rhs)
         else:
-            if isinstance(rhs, (np.ndarray, list)):
+            if isinstance(rhs, list):
                 raise NotImplementedError
             else:
                 raise TypeError('can not compare time series to {}'.format(type(rhs)))
@@ -361,27 +582,25 @@ class TimeSeries(SizedContainerTimeSeriesInterface):
         """
 		Parameters
 		----------
-		rhs : timeseries or constant to substract
+		rhs : timeseries, array of values at the own time points, or constant to substract
 
 		Returns
 		-------
 		new timeseries object as result of the substraction
 		"""
         if isinstance(rhs, (TimeSeries)):
-            if len(self) != len(rhs):
+            if not aligned(self._times, rhs._times):
                 raise ValueError(str(self) + ' and ' + str(rhs) + 'must have the same time points')
-
-            if not np.allclose(self._times, rhs.times(), atol=tolerance):
-                raise ValueError(str(self) + ' and ' + str(rhs) + 'must have the same time points')
-            updated_values = [
-                self._values[i] - rhs.values()[i] for i in range(len(self._values))
-            ]
-            return TimeSeries(self._times, updated_values)
+            return TimeSeries._from_arrays(self._times, self._values - rhs._values)
 
         elif isinstance(rhs, (int, float)):
-            return TimeSeries(self._times, [t - rhs for t in self._values])
+            return TimeSeries._from_arrays(self._times, self._values - rhs)
+        elif isinstance(rhs, np.ndarray):
+            if rhs.shape != self._values.shape:
+                raise ValueError('{} and an array of shape {} must have the same length'.format(self, rhs.shape))
+            return np.subtract(self, rhs)
         else:
-            if isinstance(rhs, (np.ndarray, list)):
+            if isinstance(rhs, list):
                 raise NotImplementedError
             else:
                 raise TypeError('can not compare time series to {}'.format(type(rhs)))
@@ -390,28 +609,26 @@ class TimeSeries(SizedContainerTimeSeriesInterface):
         """
 		Parameters
 		----------
-		rhs : timeseries or constant to multiply with
+		rhs : timeseries, array of values at the own time points, or constant to multiply with
 
 		Returns
 		-------
 		new timeseries object as result of the multiplication
 		"""
         if isinstance(rhs, (TimeSeries)):
-            if len(self) != len(rhs):
-                raise ValueError(str(self) + ' and ' + str(rhs) + 'must have the same time points')
-
-            if not np.allclose(self._times, rhs.times(), atol=tolerance):
+            if not aligned(self._times, rhs._times):
                 raise ValueError(str(self) + ' and ' + str(rhs) + 'must have the same time points')
 
-            rhs_values = rhs.values()
-            updated_values = [ self._values[i] * rhs_values[i] for i in range(len(rhs_values)) ]
-            return TimeSeries(self._times, updated_values)
+            return TimeSeries._from_arrays(self._times, self._values * rhs._values)
 
         elif isinstance(rhs, (int, float)):
-            updated_values = list(map(lambda x: x*rhs, self._values))
-            return TimeSeries(self._times, updated_values)
+            return TimeSeries._from_arrays(self._times, self._values * rhs)
+        elif isinstance(rhs, np.ndarray):
+            if rhs.shape != self._values.shape:
+                raise ValueError('{} and an array of shape {} must have the same length'.format(self, rhs.shape))
+            return np.multiply(self, rhs)
         else:
-            if isinstance(rhs, (np.ndarray, list)):
+            if isinstance(rhs, list):
                 raise NotImplementedError
             else:
                 raise TypeError('can not compare time series to {}'.format(type(rhs)))
@@ -423,8 +640,7 @@ class TimeSeries(SizedContainerTimeSeriesInterface):
 		returns l2 norm of the series values
 		"""
         assert (len(self) > 0)
-        updated_values = [self._values[i]**2 for i in range(len(self._values))]
-        return np.sqrt(np.sum(updated_values))
+        return self._stats.get('abs', lambda: np.sqrt(np.sum(self._values * self._values)))
 
     def __bool__(self):
         """
@@ -440,8 +656,7 @@ class TimeSeries(SizedContainerTimeSeriesInterface):
 		-------
 		returns series with negated values
 		"""
-        updated_values = [-1*self._values[i] for i in range(len(self._values))]
-        return TimeSeries(self._times, updated_values)
+        return TimeSeries._from_arrays(self._times, -self._values)
 
     def __pos__(self):
         """
@@ -449,7 +664,49 @@ class TimeSeries(SizedContainerTimeSeriesInterface):
 		-------
 		returns identity (unary +)
 		"""
-        return TimeSeries(self._times, self._values)
+        return TimeSeries._from_arrays(self._times, self._values.copy())
+
+    def _same_axis(self, other):
+        """
+		checks whether another series has the same time points, in O(1) for shared axes
+		"""
+        return aligned(self._times, other._times)
+
+    def _wrap(self, values):
+        """
+		builds a series on the time points of this one around an array of values
+		"""
+        return TimeSeries._from_arrays(self._times, values)
+
+    def __reduce_ex__(self, protocol):
+        """
+		pickles the arrays of the series, with protocol 5 as PickleBuffer so
+		they can be passed out-of-band without copies (see pickling.py).
+		Cached statistics are not pickled.
+		"""
+        return reduce_series(TimeSeries._from_arrays, (self._times, self._values), protocol)
+
+    def __array__(self, dtype=None, copy=None):
+        """
+		the values as ndarray, without copying unless a copy or another dtype is requested
+		"""
+        if copy:
+            return np.array(self._values, dtype=dtype)
+        return np.asarray(self._values, dtype=dtype)
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        """
+		numpy ufuncs (np.log(ts), np.maximum(ts1, ts2), ...) run on the value
+		buffers and return series on the same time points, see dispatch.py
+		"""
+        return array_ufunc(self, ufunc, method, inputs, kwargs)
+
+    def __array_function__(self, func, types, args, kwargs):
+        """
+		numpy functions (np.sum(ts), np.clip(ts, 0, 1), ...) run on the value
+		buffers, see dispatch.py
+		"""
+        return array_function(self, func, types, args, kwargs)
 
     def __repr__(self):
         """
@@ -476,7 +733,7 @@ class TimeSeries(SizedContainerTimeSeriesInterface):
 
         # print out all values if less or equal than 5 values
         if len(self) <= 5:
-            return 'TimeSeries(t={}, v={})'.format(str(list(self._times)), str(list(self._values)))
+            return 'TimeSeries(t={}, v={})'.format(str(self._times.tolist()), str(self._values.tolist()))
         else:
             return 'TimeSeries(t=[{}, {}, ..., {}, {}], v=[{}, {}, ..., {}, {}])'.format( \
                 self._times[0], self._times[1], self._times[-2], self._times[-1], \
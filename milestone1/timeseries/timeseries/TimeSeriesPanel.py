@@ -0,0 +1,368 @@
+import numbers
+import numpy as np
+from timeseries.cache import StatCache
+from timeseries.kernels import aligned, as_array, freeze, is_sorted
+from timeseries.ArrayTimeSeries import ArrayTimeSeries
+
+
+class TimeSeriesPanel(object):
+    """
+    A collection of timeseries sharing one time axis, stored as a single
+    contiguous 2-D array with one row per series.
+
+    Reductions and arithmetic run as one numpy kernel over all series
+    instead of once per series object. Rows are ArrayTimeSeries views on
+    the panel, so writing to a row writes to the panel.
+
+    Attributes:
+        _times: shared, read-only array of time points
+        _values: array of shape (number of series, number of time points)
+        _stats: mutation counter shared with the cached statistics of row views
+    """
+
+    def __init__(self, times, values, copy=True, dtype=float, time_dtype=float):
+        """
+        initializes a panel from a time axis and a 2-D array of values
+
+        Parameters
+        ----------
+        times : the timepoints shared by all series
+        values : 2-D array-like, row i holds the values of series i
+        copy : if False, an ndarray of matching dtype is used as storage directly
+        dtype : dtype of the values (default float64)
+        time_dtype : dtype of the times (default float64)
+        """
+        times = as_array(times, dtype=time_dtype, copy=copy)
+        values = np.array(values, dtype=dtype, copy=True if copy else None, order='C', ndmin=2)
+        if values.ndim != 2:
+            raise ValueError('panel values must be two dimensional')
+        if values.shape[1] != len(times):
+            raise ValueError('every series must have one value per time point')
+
+        # the time points should be monotonically increasing, resort columns only if they are not!
+        if not is_sorted(times):
+            sorted_idxs = np.argsort(times)
+            times = times[sorted_idxs]
+            values = values[:, sorted_idxs]
+
+        self._times = freeze(times)
+        self._values = values
+        self._stats = StatCache()
+
+    @classmethod
+    def _from_arrays(cls, times, values, stats=None):
+        """
+        builds a panel directly around a sorted time axis and a 2-D values
+        array without copying or reordering them
+
+        Parameters
+        ----------
+        times : sorted array of time points
+        values : 2-D array of values, one row per series
+        stats : statistics cache of a panel whose values are viewed
+
+        Returns
+        -------
+        new panel object sharing the given arrays
+        """
+        panel = cls.__new__(cls)
+        panel._times = freeze(times)
+        panel._values = values
+        panel._stats = StatCache() if stats is None else stats
+        return panel
+
+    @classmethod
+    def from_series(cls, series):
+        """
+        stacks timeseries on the same time points into a panel
+
+        Parameters
+        ----------
+        series : non-empty sequence of ArrayTimeSeries with the same time points
+
+        Returns
+        -------
+        new panel object holding a copy of the values of all series
+        """
+        series = list(series)
+        if len(series) == 0:
+            raise ValueError('can not build a panel from no series')
+        times = series[0].times()
+        for ts in series[1:]:
+            if not aligned(times, ts.times()):
+                raise ValueError(str(series[0]) + ' and ' + str(ts) + 'must have the same time points')
+        return cls._from_arrays(times, np.stack([ts.values() for ts in series]))
+
+    @property
+    def shape(self):
+        """
+        (number of series, number of time points)
+        """
+        return self._values.shape
+
+    def __len__(self):
+        """
+        returns the number of series
+        """
+        return self._values.shape[0]
+
+    def __getitem__(self, index):
+        """
+        Gets series of the panel by position
+
+        Parameters
+        ----------
+        index : position of a series, or a slice of positions
+
+        Returns
+        -------
+        ArrayTimeSeries view on a row for integers, a panel view for slices
+        """
+        if isinstance(index, slice):
+            return TimeSeriesPanel._from_arrays(self._times, self._values[index], self._stats.share())
+        assert (isinstance(index, int))
+        return ArrayTimeSeries._from_arrays(self._times, self._values[index], self._stats.share())
+
+    def __iter__(self):
+        """
+        iterates over the series as ArrayTimeSeries views
+        """
+        for row in self._values:
+            yield ArrayTimeSeries._from_arrays(self._times, row, self._stats.share())
+
+    def times(self):
+        """
+        returns the shared time points
+        """
+        return self._times
+
+    def values(self):
+        """
+        returns the 2-D array of values
+        """
+        return self._values
+
+    def _reduce(self, func, cross):
+        """
+        applies a numpy reduction per series or across series
+
+        Parameters
+        ----------
+        func : reduction taking an axis argument, e.g. np.mean
+        cross : if True reduce across series at every time point, else over the time points of every series
+
+        Returns
+        -------
+        ArrayTimeSeries on the shared time axis if cross, else array with one entry per series
+        """
+        if self._values.size == 0:
+            raise ValueError
+        if cross:
+            return ArrayTimeSeries._from_arrays(self._times, func(self._values, axis=0))
+        return func(self._values, axis=1)
+
+    def mean(self, cross=False):
+        """
+        Parameters
+        ----------
+        cross : if True, mean across all series at every time point
+
+        Returns
+        -------
+        array with the mean of every series, or ArrayTimeSeries of cross-series means
+        """
+        return self._reduce(np.mean, cross)
+
+    def median(self, cross=False):
+        """
+        Parameters
+        ----------
+        cross : if True, median across all series at every time point
+
+        Returns
+        -------
+        array with the median of every series, or ArrayTimeSeries of cross-series medians
+        """
+        return self._reduce(np.median, cross)
+
+    def std(self, cross=False):
+        """
+        Parameters
+        ----------
+        cross : if True, standard deviation across all series at every time point
+
+        Returns
+        -------
+        array with the standard deviation of every series, or ArrayTimeSeries of cross-series ones
+        """
+        return self._reduce(np.std, cross)
+
+    def min(self, cross=False):
+        """
+        Parameters
+        ----------
+        cross : if True, minimum across all series at every time point
+
+        Returns
+        -------
+        array with the minimum of every series, or ArrayTimeSeries of cross-series minima
+        """
+        return self._reduce(np.min, cross)
+
+    def max(self, cross=False):
+        """
+        Parameters
+        ----------
+        cross : if True, maximum across all series at every time point
+
+        Returns
+        -------
+        array with the maximum of every series, or ArrayTimeSeries of cross-series maxima
+        """
+        return self._reduce(np.max, cross)
+
+    def __abs__(self):
+        """
+        Returns
+        -------
+        array with the l2 norm of the values of every series
+        """
+        assert (self._values.size > 0)
+        return np.sqrt(np.einsum('ij,ij->i', self._values, self._values))
+
+    def _apply(self, ufunc, rhs, out=None):
+        """
+        applies a binary numpy ufunc elementwise, broadcasting rhs over the panel
+
+        Parameters
+        ----------
+        ufunc : numpy ufunc to apply, e.g. np.add
+        rhs : panel of the same shape, timeseries (applied to every series),
+              array with one constant per series, or constant
+        out : optional panel of the same shape that receives the result
+
+        Returns
+        -------
+        out, or a new panel object
+        """
+        if isinstance(rhs, TimeSeriesPanel):
+            if rhs.shape != self.shape or not aligned(self._times, rhs._times):
+                raise ValueError(str(self) + ' and ' + str(rhs) + 'must have the same shape and time points')
+            rhs = rhs._values
+        elif isinstance(rhs, ArrayTimeSeries):
+            if not aligned(self._times, rhs.times()):
+                raise ValueError(str(self) + ' and ' + str(rhs) + 'must have the same time points')
+            rhs = rhs.values()[None, :]
+        elif isinstance(rhs, np.ndarray):
+            if rhs.shape != (len(self),):
+                raise ValueError('arrays must hold one constant per series')
+            rhs = rhs[:, None]
+        elif not isinstance(rhs, numbers.Real):
+            if isinstance(rhs, list):
+                raise NotImplementedError
+            else:
+                raise TypeError('can not compare time series panel to {}'.format(type(rhs)))
+
+        if out is None:
+            return TimeSeriesPanel._from_arrays(self._times, ufunc(self._values, rhs))
+
+        if not isinstance(out, TimeSeriesPanel):
+            raise TypeError('out must be a time series panel, not {}'.format(type(out)))
+        if out.shape != self.shape or not aligned(self._times, out._times):
+            raise ValueError(str(self) + ' and ' + str(out) + 'must have the same shape and time points')
+        ufunc(self._values, rhs, out=out._values)
+        out._stats.bump()
+        return out
+
+    def add(self, rhs, out=None):
+        """
+        Parameters
+        ----------
+        rhs : panel, timeseries, array of per series constants or constant to add
+        out : panel of the same shape receiving the result, may be self
+
+        Returns
+        -------
+        out, or new panel object as result of the addition
+        """
+        return self._apply(np.add, rhs, out)
+
+    def sub(self, rhs, out=None):
+        """
+        Parameters
+        ----------
+        rhs : panel, timeseries, array of per series constants or constant to substract
+        out : panel of the same shape receiving the result, may be self
+
+        Returns
+        -------
+        out, or new panel object as result of the substraction
+        """
+        return self._apply(np.subtract, rhs, out)
+
+    def mul(self, rhs, out=None):
+        """
+        Parameters
+        ----------
+        rhs : panel, timeseries, array of per series constants or constant to multiply with
+        out : panel of the same shape receiving the result, may be self
+
+        Returns
+        -------
+        out, or new panel object as result of the multiplication
+        """
+        return self._apply(np.multiply, rhs, out)
+
+    def __add__(self, rhs):
+        return self.add(rhs)
+
+    def __radd__(self, lhs):
+        return self + lhs
+
+    def __sub__(self, rhs):
+        return self.sub(rhs)
+
+    def __mul__(self, rhs):
+        return self.mul(rhs)
+
+    def __rmul__(self, lhs):
+        return self * lhs
+
+    def __iadd__(self, rhs):
+        return self.add(rhs, out=self)
+
+    def __isub__(self, rhs):
+        return self.sub(rhs, out=self)
+
+    def __imul__(self, rhs):
+        return self.mul(rhs, out=self)
+
+    def __neg__(self):
+        """
+        Returns
+        -------
+        returns panel with negated values
+        """
+        return TimeSeriesPanel._from_arrays(self._times, -self._values)
+
+    def __pos__(self):
+        """
+        Returns
+        -------
+        returns identity (unary +)
+        """
+        return TimeSeriesPanel._from_arrays(self._times, self._values.copy())
+
+    def __repr__(self):
+        """
+        returns formal string representation
+        """
+        return '<{}x{}-TimeSeriesPanel>'.format(*self.shape)
+
+    def __str__(self):
+        """
+        informal string representation, outputs the shape and the time span
+        """
+        if len(self._times) == 0:
+            return 'TimeSeriesPanel(series={}, t=[])'.format(len(self))
+        return 'TimeSeriesPanel(series={}, t=[{}, ..., {}])'.format(len(self), self._times[0], self._times[-1])
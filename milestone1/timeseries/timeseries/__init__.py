@@ -3,6 +3,11 @@ import pkg_resources
 from timeseries.lazy import *
 from timeseries.TimeSeries import *
 from timeseries.ArrayTimeSeries import *
+from timeseries.RegularTimeSeries import *
+from timeseries.TimeSeriesPanel import *
+from timeseries.CompressedTimeSeries import *
+from timeseries.quantiles import QuantileSketch
+from timeseries.shared import SharedTimeSeries
 from timeseries.SimulatedTimeSeries import *
 from timeseries.StreamTimeSeriesInterface import *
 from timeseries.SizedContainerTimeSeriesInterface import *
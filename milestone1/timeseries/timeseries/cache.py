@@ -0,0 +1,71 @@
+"""
+Memoization of summary statistics for mutable value arrays.
+"""
+
+
+class StatCache(object):
+    """
+    Remembers statistics computed from a value array until it is mutated.
+
+    Every mutation bumps a version counter. Series viewing the same value
+    memory share that counter (see share), so a write through any of them
+    invalidates the statistics of all of them, while each keeps its own
+    results since their windows differ.
+
+    Writes that bypass the owning series, e.g. through the array returned
+    by values() or to a buffer passed in with copy=False, are not seen and
+    need an explicit bump.
+    """
+
+    def __init__(self, version=None):
+        """
+        Parameters
+        ----------
+        version : counter shared with other caches, a one element list (new counter if None)
+        """
+        self._version = [0] if version is None else version
+        self._seen = 0
+        self._stats = {}
+
+    def share(self):
+        """
+        Returns
+        -------
+        new empty cache for a view on the same memory, sharing the version counter
+        """
+        return StatCache(self._version)
+
+    def bump(self):
+        """
+        marks the values as mutated, invalidating all caches sharing the counter
+        """
+        self._version[0] += 1
+
+    @property
+    def version(self):
+        """
+        number of mutations seen by the shared counter
+        """
+        return self._version[0]
+
+    def get(self, name, compute):
+        """
+        returns a statistic, computing it only if the values changed since it was stored
+
+        Parameters
+        ----------
+        name : name of the statistic
+        compute : function without arguments computing the statistic
+
+        Returns
+        -------
+        the stored or freshly computed statistic
+        """
+        if self._seen != self._version[0]:
+            self._stats.clear()
+            self._seen = self._version[0]
+        try:
+            return self._stats[name]
+        except KeyError:
+            result = self._stats[name] = compute()
+            return result
@@ -0,0 +1,149 @@
+"""
+NumPy dispatch protocols (__array_ufunc__, __array_function__) for the array backed timeseries classes.
+
+Series taking part in a numpy call are replaced by their value arrays, the
+call runs directly on those buffers, and array results of the length of the
+series are wrapped into a new series on the shared time axis. A series class
+provides two hooks:
+
+    _same_axis(other) : whether another series of the class has the same time points
+    _wrap(values) : new series on the own time axis around an array of values
+"""
+
+import numbers
+import numpy as np
+
+# numpy functions whose result lines up with the time points of their first argument
+WRAPPED_FUNCTIONS = {np.clip, np.where, np.cumsum, np.cumprod, np.nancumsum, np.nancumprod,
+                     np.round, np.around, np.fix, np.nan_to_num, np.copy, np.real, np.imag,
+                     np.zeros_like, np.ones_like, np.full_like, np.empty_like}
+
+# numpy functions writing into their first argument, by the name of that argument
+INPLACE_FUNCTIONS = {np.copyto: 'dst', np.put: 'a', np.place: 'arr', np.putmask: 'a',
+                     np.put_along_axis: 'arr', np.fill_diagonal: 'a'}
+
+
+class _Foreign(Exception):
+    """
+    raised while unwrapping arguments numpy has to dispatch elsewhere
+    """
+
+
+def _unwrap(series, x):
+    """
+    replaces series of the class of series (also within lists and tuples) by their value arrays
+    """
+    if isinstance(x, type(series)):
+        if not series._same_axis(x):
+            raise ValueError(str(series) + ' and ' + str(x) + 'must have the same time points')
+        return x._values
+    if isinstance(x, (list, tuple)):
+        return type(x)(_unwrap(series, item) for item in x)
+    if isinstance(x, (numbers.Number, np.ndarray, np.generic)) or x is None:
+        return x
+    if hasattr(x, '__array_ufunc__') or hasattr(x, '__array_function__'):
+        raise _Foreign
+    return x
+
+
+def _wrap_result(series, result):
+    """
+    wraps arrays of the length of series into a series on its time axis
+    """
+    if isinstance(result, tuple):
+        return tuple(_wrap_result(series, r) for r in result)
+    if isinstance(result, np.ndarray) and result.ndim == 1 and len(result) == len(series):
+        return series._wrap(result)
+    return result
+
+
+def array_ufunc(series, ufunc, method, inputs, kwargs):
+    """
+    runs a ufunc on the value arrays of all series involved
+
+    Parameters
+    ----------
+    series : the series numpy dispatched to
+    ufunc : the numpy ufunc
+    method : ufunc method, '__call__', 'reduce', 'accumulate', 'at', ...
+    inputs : arguments of the ufunc call
+    kwargs : keyword arguments of the ufunc call
+
+    Returns
+    -------
+    result of the ufunc, arrays of the length of the series wrapped into
+    series on the same time axis, series passed as out themselves, or
+    NotImplemented for arguments of unknown array types
+    """
+    try:
+        args = [_unwrap(series, x) for x in inputs]
+        out = kwargs.get('out')
+        if out is not None:
+            kwargs['out'] = tuple(_unwrap(series, o) for o in out)
+    except _Foreign:
+        return NotImplemented
+
+    result = getattr(ufunc, method)(*args, **kwargs)
+
+    # series written to in place must drop their cached statistics
+    touched = list(out or ())
+    if method == 'at':
+        touched.append(inputs[0])
+    for o in touched:
+        if isinstance(o, type(series)) and hasattr(o, '_stats'):
+            o._stats.bump()
+
+    if out is not None:
+        return out[0] if len(out) == 1 else out
+    if method in ('__call__', 'accumulate'):
+        return _wrap_result(series, result)
+    return result
+
+
+def array_function(series, func, types, args, kwargs):
+    """
+    runs a numpy function on the value arrays of all series involved
+
+    Parameters
+    ----------
+    series : the series numpy dispatched to
+    func : the numpy function
+    types : types of all arguments implementing __array_function__
+    args : positional arguments of the call
+    kwargs : keyword arguments of the call
+
+    Returns
+    -------
+    result of the function, wrapped into a series on the same time axis for
+    functions keeping the positions of all points (see WRAPPED_FUNCTIONS),
+    the series passed as out itself, None for functions writing into a
+    series (see INPLACE_FUNCTIONS), or NotImplemented for arguments of
+    unknown array types. Series written to drop their cached statistics.
+    """
+    if not all(issubclass(t, (type(series), np.ndarray)) for t in types):
+        return NotImplemented
+    target = args[0] if args else kwargs.get(INPLACE_FUNCTIONS.get(func))
+    out = kwargs.get('out')
+    try:
+        args = _unwrap(series, tuple(args))
+        kwargs = {key: _unwrap(series, value) for key, value in kwargs.items()}
+    except _Foreign:
+        return NotImplemented
+
+    result = func(*args, **kwargs)
+    # series written to in place must drop their cached statistics
+    touched = [out] if func in WRAPPED_FUNCTIONS else []
+    if func in INPLACE_FUNCTIONS:
+        touched.append(target)
+    for o in touched:
+        if isinstance(o, type(series)) and hasattr(o, '_stats'):
+            o._stats.bump()
+
+    if isinstance(out, type(series)):
+        return out
+    # np.where of a condition alone gives the indices of its nonzero elements
+    if func is np.where and len(args) + len(kwargs) == 1:
+        return result
+    if func in WRAPPED_FUNCTIONS:
+        return _wrap_result(series, result)
+    return result
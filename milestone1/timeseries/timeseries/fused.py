@@ -0,0 +1,84 @@
+"""
+Fused blockwise evaluation of elementwise expressions, in the style of numexpr.
+
+An expression over full length arrays is given as a program, a list of
+ufunc instructions in evaluation order. Instead of running every
+instruction over the full arrays, which allocates a full length temporary
+per instruction and streams all of them through memory, the program runs
+block by block: every instruction works on a block of cache size, its
+result stays in a small buffer that the next instructions read while it is
+still in cache. The only full length allocation is the result.
+"""
+
+import numpy as np
+
+# elements per block, at 128KB per float64 operand a few operands and buffers stay in L2
+BLOCK_SIZE = 16384
+
+
+def _registers(program, n_inputs, dtypes, size):
+    """
+    block buffers receiving the results of the instructions
+
+    A buffer is reused as soon as the temporary it holds was read for the
+    last time, also as output of the instruction reading it, which is safe
+    for elementwise ufuncs. Programs thus need as many buffers as
+    temporaries are alive at once, not one per instruction.
+    """
+    last_use = {}
+    for k, (_, operands) in enumerate(program):
+        for slot in operands:
+            last_use[slot] = k
+    buffers = []
+    free = []
+    for k, (_, operands) in enumerate(program):
+        for slot in set(operands):
+            if slot >= n_inputs and last_use[slot] == k:
+                free.append(buffers[slot - n_inputs])
+        for i, buf in enumerate(free):
+            if buf.dtype == dtypes[k]:
+                buffers.append(free.pop(i))
+                break
+        else:
+            buffers.append(np.empty(size, dtype=dtypes[k]))
+    return buffers
+
+
+def evaluate(program, inputs, n, block_size=BLOCK_SIZE):
+    """
+    runs a program of elementwise ufuncs block by block
+
+    Parameters
+    ----------
+    program : list of (ufunc, operand slots), slots below len(inputs) refer to
+              the inputs, instruction k fills slot len(inputs) + k
+    inputs : arrays of length n and scalars
+    n : length of the arrays
+    block_size : number of elements per block
+
+    Returns
+    -------
+    array of length n with the result of the last instruction
+
+    >>> evaluate([(np.multiply, (0, 1)), (np.add, (2, 0))], [np.arange(5.0), 2], 5, block_size=2)
+    array([ 0.,  3.,  6.,  9., 12.])
+    """
+    if block_size < 1:
+        raise ValueError('blocks must hold at least one element')
+    # a dry run on empty blocks gives the dtype of every result as numpy promotes it
+    slots = [x[:0] if isinstance(x, np.ndarray) else x for x in inputs]
+    for ufunc, operands in program:
+        slots.append(ufunc(*[slots[slot] for slot in operands]))
+    dtypes = [result.dtype for result in slots[len(inputs):]]
+
+    out = np.empty(n, dtype=dtypes[-1])
+    buffers = _registers(program, len(inputs), dtypes, min(n, block_size))
+    last = len(program) - 1
+    for start in range(0, n, block_size):
+        stop = min(start + block_size, n)
+        slots = [x[start:stop] if isinstance(x, np.ndarray) else x for x in inputs]
+        for k, (ufunc, operands) in enumerate(program):
+            target = out[start:stop] if k == last else buffers[k][:stop - start]
+            ufunc(*[slots[slot] for slot in operands], out=target)
+            slots.append(target)
+    return out
@@ -0,0 +1,204 @@
+"""
+Gorilla style compression for blocks of timeseries points.
+
+Integer and datetime time points are delta-of-delta encoded, float time
+points and all values are XOR encoded against their predecessor, as in
+Facebook's Gorilla. Instead of Gorilla's per point control bits, all
+points of a block share one trailing zero count and one bit width, which
+lets numpy encode and decode a whole block at once.
+"""
+
+from collections import namedtuple
+import numpy as np
+
+# unsigned integer type with the same size as a time or value dtype
+_UINT = {1: np.uint8, 2: np.uint16, 4: np.uint32, 8: np.uint64}
+
+Block = namedtuple('Block', ['n', 'times', 'values'])
+Block.__doc__ = """ An encoded block of n points, times and values hold the codes of both arrays """
+
+Summary = namedtuple('Summary', ['n', 'mean', 'm2', 'min', 'max'])
+Summary.__doc__ = """ Statistics of the values of a block, m2 is the sum of squared deviations from mean """
+
+
+def _pack(x, width):
+    """
+    packs unsigned integers into width bits each
+
+    Parameters
+    ----------
+    x : uint64 array
+    width : number of bits kept of every integer
+
+    Returns
+    -------
+    uint8 array of the packed bits
+    """
+    if width == 0 or len(x) == 0:
+        return np.empty(0, dtype=np.uint8)
+    shifts = np.arange(width - 1, -1, -1, dtype=np.uint64)
+    bits = ((x[:, None] >> shifts) & np.uint64(1)).astype(np.uint8)
+    return np.packbits(bits)
+
+
+def _unpack(packed, n, width):
+    """
+    unpacks n unsigned integers of width bits each
+
+    Parameters
+    ----------
+    packed : uint8 array as returned by _pack
+    n : number of packed integers
+    width : number of bits of every integer
+
+    Returns
+    -------
+    uint64 array
+    """
+    if width == 0 or n == 0:
+        return np.zeros(n, dtype=np.uint64)
+    shifts = np.arange(width - 1, -1, -1, dtype=np.uint64)
+    bits = np.unpackbits(packed, count=n * width).reshape(n, width).astype(np.uint64)
+    return (bits << shifts).sum(axis=1, dtype=np.uint64)
+
+
+def _bit_width(x):
+    """
+    number of bits needed for the largest of the unsigned integers x
+    """
+    return int(x.max()).bit_length() if len(x) else 0
+
+
+def _trailing_zeros(x):
+    """
+    number of trailing zero bits shared by all non-zero unsigned integers x
+    """
+    x = x[x != 0]
+    if len(x) == 0:
+        return 0
+    # x & -x isolates the lowest set bit, the smallest of them is shared by all
+    lowest = x & (~x + np.uint64(1))
+    return int(lowest.min()).bit_length() - 1
+
+
+def _encode_xor(bits):
+    """
+    XOR encodes unsigned integer bit patterns against their predecessor
+    """
+    xor = bits[1:] ^ bits[:-1]
+    tz = _trailing_zeros(xor)
+    xor >>= np.uint64(tz)
+    width = _bit_width(xor)
+    return ('xor', int(bits[0]), tz, width, _pack(xor, width))
+
+
+def _decode_xor(code, n):
+    """
+    inverts _encode_xor, returns the uint64 bit patterns
+    """
+    _, head, tz, width, packed = code
+    xor = _unpack(packed, n - 1, width) << np.uint64(tz)
+    return np.bitwise_xor.accumulate(np.concatenate((np.array([head], dtype=np.uint64), xor)))
+
+
+def _encode_dod(ints):
+    """
+    delta-of-delta encodes int64 time points with zigzag encoded residuals
+    """
+    delta = int(ints[1] - ints[0]) if len(ints) > 1 else 0
+    dod = np.diff(ints, n=2)
+    zigzag = ((dod << 1) ^ (dod >> 63)).view(np.uint64)
+    width = _bit_width(zigzag)
+    return ('dod', int(ints[0]), delta, width, _pack(zigzag, width))
+
+
+def _decode_dod(code, n):
+    """
+    inverts _encode_dod, returns the int64 time points
+    """
+    _, head, delta, width, packed = code
+    zigzag = _unpack(packed, max(n - 2, 0), width)
+    dod = (zigzag >> np.uint64(1)).view(np.int64) ^ -(zigzag & np.uint64(1)).view(np.int64)
+    deltas = np.cumsum(np.concatenate((np.array([delta], dtype=np.int64), dod)))[:n - 1]
+    return np.concatenate((np.array([0], dtype=np.int64), np.cumsum(deltas))) + np.int64(head)
+
+
+def _to_bits(a):
+    """
+    reinterprets an array as unsigned integers of the same size
+    """
+    return a.view(_UINT[a.dtype.itemsize]).astype(np.uint64)
+
+
+def _from_bits(bits, dtype):
+    """
+    inverts _to_bits
+    """
+    return bits.astype(_UINT[dtype.itemsize]).view(dtype)
+
+
+def encode_block(times, values):
+    """
+    encodes a non-empty block of points
+
+    Parameters
+    ----------
+    times : sorted time points of the block (float, integer or datetime)
+    values : float values of the block
+
+    Returns
+    -------
+    (Block, Summary) of the encoded points
+    """
+    if times.dtype.kind in 'iuM':
+        time_code = _encode_dod(times.view(np.int64) if times.dtype.kind == 'M' else times.astype(np.int64))
+    else:
+        time_code = _encode_xor(_to_bits(times))
+
+    stats = values.astype(np.float64)
+    mean = stats.mean()
+    summary = Summary(len(stats), mean, float(np.sum((stats - mean) ** 2)), stats.min(), stats.max())
+    return Block(len(values), time_code, _encode_xor(_to_bits(values))), summary
+
+
+def decode_times(block, dtype):
+    """
+    decodes the time points of a block
+
+    Parameters
+    ----------
+    block : encoded Block
+    dtype : dtype of the time points
+
+    Returns
+    -------
+    array of time points
+    """
+    if block.times[0] == 'dod':
+        return _decode_dod(block.times, block.n).astype(dtype) if dtype.kind != 'M' \
+            else _decode_dod(block.times, block.n).view(dtype)
+    return _from_bits(_decode_xor(block.times, block.n), dtype)
+
+
+def decode_values(block, dtype):
+    """
+    decodes the values of a block
+
+    Parameters
+    ----------
+    block : encoded Block
+    dtype : dtype of the values
+
+    Returns
+    -------
+    array of values
+    """
+    return _from_bits(_decode_xor(block.values, block.n), dtype)
+
+
+def nbytes(block):
+    """
+    approximate memory used by an encoded block, in bytes
+    """
+    # every code has four integers next to its packed bits
+    return 8 + 2 * 4 * 8 + len(block.times[-1]) + len(block.values[-1])
@@ -0,0 +1,374 @@
+"""
+Vectorized array kernels shared by the array backed timeseries classes.
+"""
+
+import numpy as np
+
+# to avoid float problems, allow some tolerance!
+tolerance = 10 ** (-9)
+
+
+def is_sorted(a):
+    """
+    checks whether an array is monotonically non-decreasing
+
+    Parameters
+    ----------
+    a : one dimensional array
+
+    Returns
+    -------
+    true if every element is larger or equal than its predecessor
+    """
+    return len(a) < 2 or bool(np.all(a[1:] >= a[:-1]))
+
+
+def freeze(a):
+    """
+    makes an array usable as immutable time axis
+
+    Parameters
+    ----------
+    a : array of time points
+
+    Returns
+    -------
+    the array itself if it is read-only already, else a read-only view on it
+    """
+    if a.flags.writeable:
+        a = a.view()
+        a.flags.writeable = False
+    return a
+
+
+def aligned(a, b, atol=tolerance):
+    """
+    checks whether two time axes hold the same time points
+
+    Axes shared between series derived from each other are the same object
+    (or views on the very same memory), which is detected in O(1). Only
+    unrelated axes fall back to comparing all time points.
+
+    Parameters
+    ----------
+    a : time points of the first timeseries
+    b : time points of the second timeseries
+    atol : absolute tolerance for comparing float time points
+
+    Returns
+    -------
+    true if both axes hold the same time points, false else
+    """
+    if a is b:
+        return True
+    if len(a) != len(b):
+        return False
+    if a.dtype == b.dtype and a.strides == b.strides \
+            and a.__array_interface__['data'][0] == b.__array_interface__['data'][0]:
+        return True
+    if (a.dtype.kind == 'M') != (b.dtype.kind == 'M'):
+        # datetimes are never aligned with plain numbers
+        return False
+    if a.dtype.kind == 'f' or b.dtype.kind == 'f':
+        return bool(np.allclose(a, b, atol=atol))
+    # integer and datetime time points are exact
+    return bool(np.array_equal(a, b))
+
+
+def interpolate(times, values, query):
+    """
+    piecewise linear interpolation for all query points at once
+
+    Parameters
+    ----------
+    times : sorted time points of the timeseries
+    values : values of the timeseries
+    query : time points for which values shall be interpolated
+
+    Returns
+    -------
+    array of interpolated values with the dtype of values, clamped to the
+    first/last value outside of times
+    """
+    n = len(times)
+    if n == 0:
+        raise ValueError('can not interpolate an empty timeseries')
+    if n == 1:
+        return np.full(len(query), values[0], dtype=values.dtype)
+
+    # find nearest points using a single binary search (right index, i.e. the larger one)
+    ind_r = np.searchsorted(times, query, side='right')
+    hi = np.clip(ind_r, 1, n - 1)
+    lo = hi - 1
+
+    # p(x) = f(x_0) + (f(x_1) - f(x_0)) / (x_1 - x_0) (x - x_0)
+    t0 = times[lo]
+    v0 = values[lo]
+    span = times[hi] - t0
+    offset = query - t0
+    if span.dtype.kind == 'm':
+        # datetime axes, interpolate on the elapsed time in units of the axis
+        span = span.astype(np.float64)
+        offset = offset.astype(np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out = v0 + (values[hi] - v0) / span * offset
+    out = out.astype(values.dtype, copy=False)
+
+    # handle special cases at boundaries
+    out[ind_r == 0] = values[0]
+    out[ind_r == n] = values[-1]
+    return out
+
+
+def as_array(data, dtype=float, copy=True):
+    """
+    converts a sequence, ndarray or buffer-protocol object to a one dimensional array
+
+    Parameters
+    ----------
+    data : list, tuple, range, ndarray, memoryview or any other object exposing
+           the buffer protocol; other iterables are materialized as list first
+    dtype : dtype of the resulting array
+    copy : if False, ndarrays and buffers that already have the requested dtype
+           are referenced instead of copied
+
+    Returns
+    -------
+    one dimensional array
+    """
+    if not isinstance(data, (np.ndarray, list, tuple, range)):
+        try:
+            data = memoryview(data)
+        except TypeError:
+            data = list(data)
+
+    if copy:
+        arr = np.array(data, dtype=dtype)
+    else:
+        arr = np.asarray(data, dtype=dtype)
+
+    if arr.ndim != 1:
+        raise ValueError('timeseries data must be one dimensional')
+    return arr
+
+
+def locate(times, t, atol=tolerance):
+    """
+    binary search for the position of a time point
+
+    Parameters
+    ----------
+    times : sorted time points of the timeseries
+    t : time point to look for
+    atol : absolute tolerance for matching float time points
+
+    Returns
+    -------
+    position of t within times, raises KeyError if t is not contained
+    """
+    n = len(times)
+    ind = np.searchsorted(times, t, side='left')
+    # the closest time points are on either side of the insertion point,
+    # only float time points need the tolerance
+    for i in (ind, ind - 1):
+        if 0 <= i < n and (times[i] == t or (times.dtype.kind == 'f' and abs(times[i] - t) <= atol)):
+            return int(i)
+    raise KeyError(t)
+
+
+def window(times, t0, t1):
+    """
+    binary search for the positions of all time points in [t0, t1]
+
+    Parameters
+    ----------
+    times : sorted time points of the timeseries
+    t0 : first time point of the window, None for an open start
+    t1 : last time point of the window, None for an open end
+
+    Returns
+    -------
+    (start, stop) positions, such that times[start:stop] lies within the window
+    """
+    start = 0 if t0 is None else int(np.searchsorted(times, t0, side='left'))
+    stop = len(times) if t1 is None else int(np.searchsorted(times, t1, side='right'))
+    return start, max(start, stop)
+
+
+def align(times_a, values_a, times_b, values_b, how):
+    """
+    aligns two timeseries onto a common time axis in a single vectorized merge
+
+    Parameters
+    ----------
+    times_a, values_a : sorted time points and values of the left timeseries
+    times_b, values_b : sorted time points and values of the right timeseries
+    how : alignment policy
+        'inner' : keep only the time points contained in both series
+        'outer' : keep the union of time points, missing values are
+                  interpolated (and clamped at the boundaries, see interpolate)
+        'asof' : keep the time points of the left series, the right series
+                 contributes its last value at or before each of them (nan
+                 before its first time point)
+
+    Returns
+    -------
+    (times, left values, right values) on the common time axis
+    """
+    if how == 'inner':
+        n = len(times_b)
+        pos = np.searchsorted(times_b, times_a, side='left')
+        hit = pos < n
+        hit[hit] = times_b[pos[hit]] == times_a[hit]
+        return times_a[hit], values_a[hit], values_b[pos[hit]]
+
+    if how == 'outer':
+        # both axes are sorted runs, which a stable sort merges in linear time
+        times = np.concatenate((times_a, times_b))
+        times.sort(kind='stable')
+        if len(times) > 1:
+            times = times[np.concatenate(([True], times[1:] != times[:-1]))]
+        if len(times) == 0:
+            return times, values_a[:0], values_b[:0]
+        return times, interpolate(times_a, values_a, times), interpolate(times_b, values_b, times)
+
+    if how == 'asof':
+        pos = np.searchsorted(times_b, times_a, side='right') - 1
+        # integer values can not hold the nan before the first time point
+        dtype = values_b.dtype if np.issubdtype(values_b.dtype, np.inexact) else np.result_type(values_b.dtype, float)
+        values = np.full(len(times_a), np.nan, dtype=dtype)
+        found = pos >= 0
+        values[found] = values_b[pos[found]]
+        return times_a, values_a, values
+
+    raise ValueError("how must be one of 'exact', 'inner', 'outer' or 'asof', not {!r}".format(how))
+
+
+# aggregations supported by resample
+AGGREGATIONS = ('mean', 'min', 'max', 'last', 'count', 'sum')
+
+
+def resample(times, values, width, how, origin=None):
+    """
+    aggregates values into consecutive buckets of equal width in a single pass
+
+    Bucket i covers [origin + i * width, origin + (i + 1) * width). All bucket
+    boundaries are located with one binary search, every aggregation is one
+    reduceat over the buckets.
+
+    Parameters
+    ----------
+    times : sorted time points of the timeseries
+    values : values of the timeseries
+    width : positive bucket width in units of the time points
+    how : sequence of aggregations, see AGGREGATIONS
+    origin : start of the first bucket, the first time point if None
+
+    Returns
+    -------
+    (bucket starts, {aggregation: array with one entry per bucket}), empty
+    buckets count 0, sum 0 and are nan otherwise
+    """
+    for name in how:
+        if name not in AGGREGATIONS:
+            raise ValueError('how must be one of {}, not {!r}'.format(', '.join(AGGREGATIONS), name))
+    if not width > width * 0:
+        raise ValueError('bucket width must be positive')
+
+    n = len(times)
+    if origin is None:
+        origin = times[0] if n else times.dtype.type(0)
+    if n and times[0] < origin:
+        raise ValueError('origin must not be later than the first time point')
+    buckets = int((times[-1] - origin) // width) + 1 if n else 0
+    edges = origin + np.arange(buckets) * width
+
+    starts = np.searchsorted(times, edges, side='left')
+    counts = np.diff(np.append(starts, n))
+    full = counts > 0
+    # reduceat needs strictly valid start indices, so empty buckets are skipped
+    idx = starts[full]
+
+    out = {}
+    for name in how:
+        if name == 'count':
+            out[name] = counts
+            continue
+        if name == 'sum':
+            agg = np.zeros(buckets, dtype=values.dtype)
+        else:
+            agg = np.full(buckets, np.nan, dtype=values.dtype)
+        if len(idx):
+            if name in ('sum', 'mean'):
+                agg[full] = np.add.reduceat(values, idx)
+                if name == 'mean':
+                    agg[full] /= counts[full]
+            elif name == 'min':
+                agg[full] = np.minimum.reduceat(values, idx)
+            elif name == 'max':
+                agg[full] = np.maximum.reduceat(values, idx)
+            else:
+                agg[full] = values[idx + counts[full] - 1]
+        out[name] = agg
+    return edges, out
+
+
+def chunks(times, values, size):
+    """
+    iterates over consecutive chunks of a timeseries without copying
+
+    Parameters
+    ----------
+    times : time points of the timeseries
+    values : values of the timeseries
+    size : positive number of points per chunk, the last chunk may be smaller
+
+    Returns
+    -------
+    generator of (times, values) views of size points each
+    """
+    if size < 1:
+        raise ValueError('chunks must hold a positive number of points')
+    for start in range(0, len(values), size):
+        yield times[start:start + size], values[start:start + size]
+
+
+def rechunk(blocks, size):
+    """
+    regroups consecutive (times, values) blocks of any size into chunks of size points
+
+    Parameters
+    ----------
+    blocks : iterable of (times, values) arrays
+    size : positive number of points per chunk, the last chunk may be smaller
+
+    Returns
+    -------
+    generator of (times, values) arrays of size points each, views on a
+    block where a chunk lies within one, copies where it spans several
+    """
+    if size < 1:
+        raise ValueError('chunks must hold a positive number of points')
+    pending = []
+    have = 0
+    for times, values in blocks:
+        while len(values):
+            take = min(size - have, len(values))
+            pending.append((times[:take], values[:take]))
+            have += take
+            times, values = times[take:], values[take:]
+            if have == size:
+                yield _join(pending)
+                pending = []
+                have = 0
+    if have:
+        yield _join(pending)
+
+
+def _join(pieces):
+    """
+    concatenates (times, values) pieces, a single piece is returned as it is
+    """
+    if len(pieces) == 1:
+        return pieces[0]
+    return np.concatenate([t for t, _ in pieces]), np.concatenate([v for _, v in pieces])
@@ -1,6 +1,22 @@
 # Lab15 Reference Implementation
 # CS207 - Spring 2016
 
+import functools
+import numbers
+import operator
+import sys
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, wait
+import numpy as np
+from timeseries import fused
+
+# operators of lazy timeseries and the ufuncs evaluating them blockwise
+_UFUNCS = {operator.add: np.add, operator.sub: np.subtract, operator.mul: np.multiply,
+           operator.neg: np.negative, operator.pos: np.positive}
+
+# result of a LazyOperation that was not cached
+_MISSING = object()
+
 class LazyOperation:
 	"""
 	A custom implementation of a future
@@ -13,6 +29,23 @@ class LazyOperation:
 	Methods:
 	__init__ : initializes a new LazyOperation around a given function
 	eval : evaluates the function stored with its arguments
+	invalidate : drops cached results
+	between : lazily restricts the series evaluated to a range of time
+	optimize : rewrites the graph to do less work, see optimizer.py
+
+	LazyOperations passed as arguments to several others form a DAG, eval
+	evaluates every node of it once, however often it is referenced, and
+	without recursion, however deep it is.
+
+	Arithmetic with +, - and * on LazyOperations builds an expression tree
+	instead of computing anything. eval runs such a tree over aligned
+	array backed timeseries and constants as one fused blockwise pass (see
+	fused.py), without full length temporaries for the intermediate results:
+
+	>>> from timeseries.ArrayTimeSeries import ArrayTimeSeries
+	>>> a = ArrayTimeSeries([1, 2, 3], [1.0, 2.0, 3.0])
+	>>> print(((a.lazy * 2 + a - 1) * a.lazy).eval())
+	ArrayTimeSeries(t=[1.0, 2.0, 3.0], v=[2.0, 10.0, 24.0])
 
 	"""
 
@@ -30,38 +63,433 @@ class LazyOperation:
 		self._function = function
 		self._args = args
 		self._kwargs = kwargs
+		self._result = _MISSING
+
+	def __add__(self, rhs):
+		return LazyOperation(operator.add, self, rhs)
+
+	def __radd__(self, lhs):
+		return LazyOperation(operator.add, self, lhs)
+
+	def __sub__(self, rhs):
+		return LazyOperation(operator.sub, self, rhs)
+
+	def __rsub__(self, lhs):
+		return LazyOperation(operator.sub, lhs, self)
+
+	def __mul__(self, rhs):
+		return LazyOperation(operator.mul, self, rhs)
+
+	def __rmul__(self, lhs):
+		return LazyOperation(operator.mul, lhs, self)
+
+	def __neg__(self):
+		return LazyOperation(operator.neg, self)
 
-	def eval(self):
+	def __pos__(self):
+		return LazyOperation(operator.pos, self)
+
+	def between(self, start=None, stop=None):
 		"""
-		evaluates the stored function 
+		lazy version of between of the series this evaluates to
+
+		Parameters
+		----------
+		start : first time point of the window, None for an open start
+		stop : last time point of the window, None for an open end
+
+		Returns
+		-------
+		LazyOperation evaluating to the time points in the window, optimize
+		restricts arithmetic below it to the window
+		"""
+		return LazyOperation(_between, self, start, stop)
+
+	def optimize(self, cse=False):
+		"""
+		rewrites the graph below this node into an equivalent one doing less
+		work, with constant folding, algebraic simplification, merged common
+		subexpressions and ranges pushed below arithmetic (see optimizer.py).
+		The graph itself is left as it is, unchanged parts are shared.
+
+		Parameters
+		----------
+		cse : also merge calls of other functions than the arithmetic and
+		      between with the same arguments, which assumes that these
+		      functions are pure: no side effects, equal results on equal arguments
+
+		Returns
+		-------
+		LazyOperation evaluating to the same result
+
+		>>> from timeseries.ArrayTimeSeries import ArrayTimeSeries
+		>>> ts = ArrayTimeSeries([1, 2, 3], [1.0, 2.0, 3.0])
+		>>> graph = (-(-ts.lazy) * 1 + 1 + 2).between(2, 3)
+		>>> print(graph.optimize().eval())
+		ArrayTimeSeries(t=[2.0, 3.0], v=[5.0, 6.0])
+		"""
+		# the optimizer builds on this module
+		from timeseries.optimizer import optimize
+		return optimize(self, cse)
+
+	def _children(self):
+		"""
+		Returns
+		-------
+		LazyOperations among the arguments, once per reference
+		"""
+		return [arg for arg in self._args + tuple(self._kwargs.values()) if isinstance(arg, LazyOperation)]
+
+	def _topological(self):
+		"""
+		sorts the graph below this node with an explicit stack, so that
+		neither its depth nor its size is limited by the recursion limit
+
+		Nodes with cached results are leaves, the graph below them is not
+		needed.
+
+		Returns
+		-------
+		(order, references), the nodes in an order evaluating every node
+		after all nodes it depends on, and the number of references to
+		every node by id
+		"""
+		order = []
+		references = {}
+		visited = set()
+		stack = [(self, False)]
+		while stack:
+			node, expanded = stack.pop()
+			if expanded:
+				order.append(node)
+				continue
+			if id(node) in visited:
+				continue
+			visited.add(id(node))
+			stack.append((node, True))
+			if node._result is not _MISSING:
+				continue
+			for child in node._children():
+				references[id(child)] = references.get(id(child), 0) + 1
+				if id(child) not in visited:
+					stack.append((child, False))
+		return order, references
+
+	def _compile(self, inline):
+		"""
+		flattens the arithmetic of an expression tree into a program
+
+		The arithmetic nodes to inline are computed as part of the program,
+		all other arguments are its inputs. Inputs occurring several times
+		are only listed once.
+
+		Parameters
+		----------
+		inline : ids of the arithmetic nodes to inline
+
+		Returns
+		-------
+		(program, inputs, consumed), program lists (operator, operand slots)
+		in evaluation order, slots below len(inputs) refer to the inputs,
+		instruction k fills slot len(inputs) + k. LazyOperations among the
+		inputs stand for their results, consumed lists them once per reference.
+		"""
+		program = []
+		inputs = []
+		consumed = []
+		instructions = {}
+		input_slots = {}
+		stack = [(self, False)]
+		while stack:
+			node, expanded = stack.pop()
+			if not expanded:
+				stack.append((node, True))
+				stack.extend((arg, False) for arg in reversed(node._args)
+							 if isinstance(arg, LazyOperation) and id(arg) in inline)
+				continue
+
+			operands = []
+			for arg in node._args:
+				if isinstance(arg, LazyOperation) and id(arg) in inline:
+					operands.append(instructions[id(arg)])
+					continue
+				if isinstance(arg, LazyOperation):
+					consumed.append(arg)
+				if id(arg) not in input_slots:
+					inputs.append(arg)
+					input_slots[id(arg)] = len(inputs) - 1
+				operands.append(input_slots[id(arg)])
+			program.append((node._function, tuple(operands)))
+			instructions[id(node)] = -len(program)
+
+		# instructions were numbered from the back while the number of inputs was open
+		n = len(inputs)
+		program = [(function, tuple(s if s >= 0 else n - 1 - s for s in operands))
+				   for function, operands in program]
+		return program, inputs, consumed
+
+	def _plan(self):
+		"""
+		splits the graph below this node into the steps evaluating it
+
+		Returns
+		-------
+		(steps, references), steps lists (node, function, args, kwargs,
+		consumed) in an order running every step after the steps it depends
+		on, function is None for nodes with cached results. LazyOperations
+		among args and kwargs stand for their results, consumed lists them
+		once per reference. references counts the references to every node
+		by id.
+		"""
+		order, references = self._topological()
+		# arithmetic only read by one other arithmetic node is fused into it,
+		# shared arithmetic is evaluated once on its own
+		inline = set()
+		for node in order:
+			if node._function in _UFUNCS and node._result is _MISSING:
+				inline.update(id(arg) for arg in node._args
+							  if isinstance(arg, LazyOperation) and arg._function in _UFUNCS and
+							  arg._result is _MISSING and references[id(arg)] == 1)
+
+		steps = []
+		for node in order:
+			if id(node) in inline:
+				continue
+			if node._result is not _MISSING:
+				steps.append((node, None, (), {}, []))
+			elif node._function in _UFUNCS:
+				program, inputs, consumed = node._compile(inline)
+				steps.append((node, _run, (program,) + tuple(inputs), {}, consumed))
+			else:
+				steps.append((node, node._function, node._args, node._kwargs, node._children()))
+		return steps, references
+
+	def eval(self, cache=False, executor=None, max_pending=None):
+		"""
+		evaluates the stored function, every node of the graph at most once
+
+		The graph is sorted once and its nodes are run in that order from
+		an explicit stack, graphs of any depth are evaluated without
+		recursion. Results are released as soon as all nodes reading them
+		ran, unless they are cached.
+
+		Parameters
+		----------
+		cache : whether to keep the results of all nodes evaluated, later
+				evaluations reuse them instead of evaluating anything below
+				until invalidate is called. Cached results are returned
+				as they are, modifying them modifies the cache.
+		executor : optional concurrent.futures executor running the nodes,
+				   all nodes whose arguments are evaluated run concurrently.
+				   A ThreadPoolExecutor suits numpy work releasing the GIL,
+				   a ProcessPoolExecutor needs picklable functions, arguments
+				   and results. The first exception raised by a node cancels
+				   the nodes not started yet and is raised here.
+		max_pending : maximum number of nodes submitted to the executor at
+					  once, by default the number of workers of the executor
+					  (_max_workers of the concurrent.futures pools), None if
+					  it has no such attribute leaves the nodes submitted unlimited
 
 		Returns
 		-------
 		returns result of stored function evaluated with stored arguments
+
+		>>> calls = []
+		>>> @lazy
+		... def normalize(x):
+		...     calls.append(x)
+		...     return x / 10
+		>>> norm = normalize(5)
+		>>> graph = LazyOperation(max, norm, LazyOperation(min, norm, 1))
+		>>> graph.eval(cache=True), len(calls)
+		(0.5, 1)
+		>>> graph.eval(), len(calls)
+		(0.5, 1)
+		>>> graph.invalidate()
+		>>> graph.eval(), len(calls)
+		(0.5, 2)
+		"""
+		steps, references = self._plan()
+		memo = {}
+
+		def resolve(arg):
+			return memo[id(arg)] if isinstance(arg, LazyOperation) else arg
+
+		def call(step):
+			node, function, args, kwargs, consumed = step
+			return function, [resolve(arg) for arg in args], {name: resolve(arg) for name, arg in kwargs.items()}
+
+		def finish(step, result):
+			node, function, args, kwargs, consumed = step
+			memo[id(node)] = result
+			if cache:
+				node._result = result
+			for arg in consumed:
+				references[id(arg)] -= 1
+				if references[id(arg)] == 0:
+					del memo[id(arg)]
+
+		if executor is None:
+			for step in steps:
+				if step[1] is None:
+					finish(step, step[0]._result)
+				else:
+					function, args, kwargs = call(step)
+					finish(step, function(*args, **kwargs))
+		else:
+			if max_pending is None:
+				max_pending = getattr(executor, '_max_workers', None)
+			self._schedule(steps, executor, max_pending, call, finish)
+		return memo[id(self)]
+
+	@staticmethod
+	def _schedule(steps, executor, max_pending, call, finish):
+		"""
+		runs steps on an executor as soon as the steps they depend on finished
+
+		Parameters
+		----------
+		steps : steps of the graph in a valid order, see _plan
+		executor : concurrent.futures executor
+		max_pending : maximum number of steps submitted at once, None for no limit
+		call : function of a step giving the function, args and kwargs to run
+		finish : function of a step and its result recording the result
+		"""
+		waiting = {}
+		dependents = {}
+		ready = deque()
+		for step in steps:
+			dependencies = {id(arg) for arg in step[4]}
+			waiting[id(step[0])] = len(dependencies)
+			for dependency in dependencies:
+				dependents.setdefault(dependency, []).append(step)
+			if not dependencies:
+				ready.append(step)
+
+		running = {}
+		try:
+			while ready or running:
+				done = []
+				while ready and (max_pending is None or len(running) < max_pending):
+					step = ready.popleft()
+					if step[1] is None:
+						done.append((step, step[0]._result))
+					else:
+						function, args, kwargs = call(step)
+						running[executor.submit(function, *args, **kwargs)] = step
+				if not done:
+					finished, _ = wait(running, return_when=FIRST_COMPLETED)
+					done = [(running.pop(future), future.result()) for future in finished]
+
+				for step, result in done:
+					finish(step, result)
+					for dependent in dependents.pop(id(step[0]), ()):
+						waiting[id(dependent[0])] -= 1
+						if waiting[id(dependent[0])] == 0:
+							ready.append(dependent)
+		finally:
+			for future in running:
+				future.cancel()
+
+	def invalidate(self):
 		"""
+		drops the cached results of this node and of all nodes it depends on,
+		e.g. after the data of a series in the graph was modified
+		"""
+		visited = {id(self)}
+		stack = [self]
+		while stack:
+			node = stack.pop()
+			node._result = _MISSING
+			for child in node._children():
+				if id(child) not in visited:
+					visited.add(id(child))
+					stack.append(child)
+
+
+def _identity(ts):
+    """
+    function of the nodes created by the lazy property of the series classes
+    """
+    return ts
+
+
+def _between(ts, start, stop):
+    """
+    function of the nodes created by LazyOperation.between, constants are
+    kept as they are, the optimizer pushes windows into all operands of
+    arithmetic not knowing which of them evaluate to series
+    """
+    if isinstance(ts, numbers.Real):
+        return ts
+    return ts.between(start, stop)
+
+
+def _run(program, *inputs):
+    """
+    evaluates a program of arithmetic operators, see LazyOperation._compile
+
+    Programs combining only aligned series of one array backed class and
+    real constants are evaluated fused, as one blockwise pass (see fused.py),
+    anything else with the operators of its operands.
+
+    Parameters
+    ----------
+    program : list of (operator, operand slots)
+    inputs : values of the input slots
+
+    Returns
+    -------
+    result of the last operator
+    """
+    series = [x for x in inputs if not isinstance(x, numbers.Real)]
+    if series and hasattr(series[0], '_wrap') and \
+            all(type(x) is type(series[0]) and series[0]._same_axis(x) for x in series):
+        values = [x if isinstance(x, numbers.Real) else x._values for x in inputs]
+        program = [(_UFUNCS[function], operands) for function, operands in program]
+        return series[0]._wrap(fused.evaluate(program, values, len(series[0])))
+
+    slots = list(inputs)
+    for function, operands in program:
+        slots.append(function(*[slots[slot] for slot in operands]))
+    return slots[-1]
+
+
+class _LazyFunction(object):
+    '''
+    lazy version of a function, see lazy
+
+    Calls build LazyOperations running the function, through a method of
+    this object so that they can be pickled for process pools: by the name
+    of the decorated function if that refers to this object, else together
+    with the wrapped function.
+    '''
+
+    def __init__(self, f):
+        functools.update_wrapper(self, f)
+        # one bound method for all calls, it identifies them for the optimizer
+        self._run = self.run
+
+    def run(self, *args, **kwargs):
+        '''
+        runs the wrapped function right away
+        '''
+        return self.__wrapped__(*args, **kwargs)
 
-		# to avoid tuple assignment error, cast to list!
-		c_args = list(self._args)
-		# evaluation needs to be done recursively, first evaluate positional arguments
-		for pos, arg in enumerate(c_args):
-			if isinstance(arg, LazyOperation):
-				c_args[pos] = arg.eval()
-		# then named arguments
-		for name, arg in self._kwargs.items():
-			if isinstance(arg, LazyOperation):
-				self._kwargs[name] = arg.eval()
+    def __call__(self, *args, **kwargs):
+        return LazyOperation(self._run, *args, **kwargs)
 
-		# update with copies
-		self._args = tuple(c_args)
-		# with updated dictionaries, eval fun itself
-		return self._function(*self._args, **self._kwargs)
+    def __reduce__(self):
+        obj = sys.modules.get(getattr(self, '__module__', None))
+        for name in getattr(self, '__qualname__', '<lambda>').split('.'):
+            obj = getattr(obj, name, None)
+        if obj is self:
+            return self.__qualname__
+        return _LazyFunction, (self.__wrapped__,)
 
 
 def lazy(f):
     '''
     decorator for function to turn them into a lazy version
     '''
-    def inner_fun(*args, **kwargs):
-        out_fun = LazyOperation(f, *args, **kwargs)
-        return out_fun
-    return inner_fun
\ No newline at end of file
+    return _LazyFunction(f)
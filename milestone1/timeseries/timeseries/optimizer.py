@@ -0,0 +1,221 @@
+"""
+Optimizer pass for graphs of LazyOperations, see LazyOperation.optimize.
+
+The graph is rewritten into an equivalent one doing less work:
+
+    constant folding : arithmetic on constants only is computed right away
+    simplification : -(-x), +x, x * 1 and x + 0 become x, constant
+                     subtraction becomes addition, and chains of constant
+                     additions or multiplications are combined, e.g.
+                     x + c1 + c2 becomes x + (c1 + c2)
+    common subexpressions : nodes calling the same function with the same
+                     arguments, by identity and constants by value, are merged.
+                     This assumes the function is pure: merging two calls of
+                     np.random.rand would change the result. By default only
+                     the arithmetic, .lazy and between are merged, see _PURE,
+                     optimize(cse=True) merges calls of all functions
+    range pushdown : between applied to arithmetic read nowhere else is
+                     applied to its operands instead, so that only the time
+                     points in the range are computed
+
+Nodes whose arguments did not change are kept as they are, with their
+cached results. Nodes with cached results are not optimized.
+"""
+
+import numbers
+import operator
+from timeseries.lazy import LazyOperation, _MISSING, _UFUNCS, _between
+from timeseries.lazy import _identity as _lazy_identity
+
+# functions without side effects giving equal results on equal arguments
+_PURE = set(_UFUNCS) | {_lazy_identity, _between}
+
+
+def _value(x):
+    """
+    function of the node standing for a graph folded into the constant x
+    """
+    return x
+
+
+def _constant(x):
+    return isinstance(x, numbers.Real) and not isinstance(x, LazyOperation)
+
+
+def _arithmetic(x, function=None):
+    """
+    whether x is an arithmetic node without cached result, applying function if given
+    """
+    return isinstance(x, LazyOperation) and x._function in _UFUNCS and x._result is _MISSING and \
+        (function is None or x._function is function)
+
+
+def _rebuild(node, args, kwargs):
+    """
+    node itself if its arguments did not change, else a new node on the new arguments
+    """
+    if all(a is b for a, b in zip(args, node._args)) and \
+            all(kwargs[name] is arg for name, arg in node._kwargs.items()):
+        return node
+    return LazyOperation(node._function, *args, **kwargs)
+
+
+def _signature(function, args, kwargs):
+    """
+    key of a call for finding common subexpressions, arguments by identity and constants by value
+    """
+    def key(x):
+        return (type(x), x) if _constant(x) else id(x)
+
+    return id(function), tuple(key(arg) for arg in args), tuple(sorted((name, key(arg)) for name, arg in kwargs.items()))
+
+
+def _identity(x):
+    """
+    node evaluating to x. Results of arithmetic nodes are new objects
+    anyway, other values are copied by unary + like the operators would.
+    """
+    if _arithmetic(x):
+        return x
+    return LazyOperation(operator.pos, x)
+
+
+def _simplify(node, args):
+    """
+    applies constant folding and the algebraic simplifications to an
+    arithmetic node on optimized arguments
+
+    Returns
+    -------
+    an equivalent node, or a constant
+    """
+    function = node._function
+    if all(_constant(arg) for arg in args):
+        return function(*args)
+
+    if function is operator.sub and _constant(args[1]):
+        function, args = operator.add, (args[0], -args[1])
+    if function in (operator.add, operator.mul) and _constant(args[0]):
+        args = (args[1], args[0])
+
+    if function in (operator.add, operator.mul):
+        x, c = args
+        if _constant(c):
+            # x + c1 + c2 = x + (c1 + c2), x * c1 * c2 = x * (c1 * c2)
+            if _arithmetic(x, function) and _constant(x._args[1]):
+                x, c = x._args[0], function(x._args[1], c)
+            # only integer constants keep the dtype of any series
+            neutral = 0 if function is operator.add else 1
+            if type(c) is int and c == neutral:
+                return _identity(x)
+            args = (x, c)
+    elif function is operator.neg and _arithmetic(args[0], operator.neg):
+        return _identity(args[0]._args[0])
+    elif function is operator.pos and _arithmetic(args[0]):
+        return args[0]
+
+    if function is node._function:
+        return _rebuild(node, args, {})
+    return LazyOperation(function, *args)
+
+
+def _push_window(expr, window):
+    """
+    applies between below the arithmetic of an expression
+
+    Parameters
+    ----------
+    expr : arithmetic node
+    window : (start, stop) arguments of between
+
+    Returns
+    -------
+    copy of the arithmetic of expr, its operands other than constants
+    restricted to the window
+    """
+    copies = {}
+    stack = [(expr, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if id(node) in copies:
+            continue
+        if not expanded:
+            stack.append((node, True))
+            stack.extend((arg, False) for arg in node._args if _arithmetic(arg) and id(arg) not in copies)
+            continue
+
+        args = []
+        for arg in node._args:
+            if id(arg) not in copies and not _constant(arg):
+                copies[id(arg)] = LazyOperation(_between, arg, *window)
+            args.append(copies[id(arg)] if id(arg) in copies else arg)
+        copies[id(node)] = LazyOperation(node._function, *args)
+    return copies[id(expr)]
+
+
+def _rewrite(root, rewrite):
+    """
+    rewrites a graph node by node in topological order
+
+    Parameters
+    ----------
+    root : node of the graph
+    rewrite : function of a node, its rewritten args and kwargs, and the
+              references to every node by id, returning its replacement
+
+    Returns
+    -------
+    replacement of root
+    """
+    order, references = root._topological()
+    replacements = {}
+    for node in order:
+        if node._result is not _MISSING:
+            replacements[id(node)] = node
+            continue
+        args = tuple(replacements[id(arg)] if isinstance(arg, LazyOperation) else arg for arg in node._args)
+        kwargs = {name: replacements[id(arg)] if isinstance(arg, LazyOperation) else arg
+                  for name, arg in node._kwargs.items()}
+        replacements[id(node)] = rewrite(node, args, kwargs, references)
+    return replacements[id(root)]
+
+
+def optimize(root, cse=False):
+    """
+    optimizes a graph of LazyOperations
+
+    Parameters
+    ----------
+    root : node of the graph to optimize
+    cse : merge common subexpressions of all functions, assuming they are
+          pure, not only of those in _PURE
+
+    Returns
+    -------
+    node evaluating to the same result as root with less work
+    """
+    common = {}
+
+    def simplify(node, args, kwargs, references):
+        if not cse and node._function not in _PURE:
+            return _rebuild(node, args, kwargs)
+        key = _signature(node._function, args, kwargs)
+        if key not in common:
+            result = _simplify(node, args) if node._function in _UFUNCS else _rebuild(node, args, kwargs)
+            # simplified nodes can equal others, e.g. x - 1 and x + -1
+            if isinstance(result, LazyOperation):
+                result = common.setdefault(_signature(result._function, result._args, result._kwargs), result)
+            common[key] = result
+        return common[key]
+
+    def push_windows(node, args, kwargs, references):
+        # a window on arithmetic read elsewhere too is cheaper as a view on its full result
+        if node._function is _between and not kwargs and _arithmetic(args[0]) and \
+                references[id(node._args[0])] == 1:
+            return _push_window(args[0], args[1:])
+        return _rebuild(node, args, kwargs)
+
+    root = _rewrite(root, simplify)
+    if not isinstance(root, LazyOperation):
+        return LazyOperation(_value, root)
+    return _rewrite(root, push_windows)
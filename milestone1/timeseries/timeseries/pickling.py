@@ -0,0 +1,78 @@
+"""
+Pickling of array backed timeseries with protocol 5 out-of-band buffers.
+
+With protocol 5 the time and value arrays are handed to pickle as
+PickleBuffer objects. A buffer_callback can then move them out-of-band
+without copying them into the pickle stream, and loads builds the arrays
+directly on the buffers passed back. Pickled in-band, writable arrays
+come back as bytearray (writable) and read-only ones as bytes (read-only),
+so time axes stay frozen and values stay writable.
+"""
+
+from collections import namedtuple
+import pickle
+import numpy as np
+
+Packed = namedtuple('Packed', ['buffer', 'dtype'])
+Packed.__doc__ = """ A one dimensional array as raw buffer and dtype """
+
+
+def pack(a, protocol):
+    """
+    prepares an array for pickling
+
+    Parameters
+    ----------
+    a : one dimensional array
+    protocol : pickle protocol
+
+    Returns
+    -------
+    Packed array around a PickleBuffer for protocol 5 and above, else the array itself
+    """
+    if protocol < 5:
+        return np.asarray(a)
+    a = np.ascontiguousarray(a)
+    # datetimes do not support the buffer protocol, their bytes do
+    return Packed(pickle.PickleBuffer(a.view(np.uint8)), a.dtype.str)
+
+
+def unpack(state):
+    """
+    inverts pack, without copying the buffer
+
+    Parameters
+    ----------
+    state : Packed array or array
+
+    Returns
+    -------
+    array viewing the unpickled buffer, writable if the buffer is
+    """
+    if isinstance(state, Packed):
+        return np.frombuffer(state.buffer, dtype=np.uint8).view(state.dtype)
+    return state
+
+
+def reduce_series(factory, args, protocol):
+    """
+    reduce value for __reduce_ex__ of a timeseries
+
+    Parameters
+    ----------
+    factory : picklable function building the series, e.g. a _from_arrays classmethod
+    args : arguments of factory, arrays among them are packed
+    protocol : pickle protocol
+
+    Returns
+    -------
+    (callable, arguments) rebuilding the series with factory(*args)
+    """
+    return rebuild, (factory,) + tuple(pack(a, protocol) if isinstance(a, np.ndarray) else a for a in args)
+
+
+def rebuild(factory, *args):
+    """
+    builds a series from unpickled arguments, see reduce_series
+    """
+    return factory(*[unpack(a) for a in args])
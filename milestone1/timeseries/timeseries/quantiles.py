@@ -0,0 +1,229 @@
+"""
+Exact and approximate quantiles of value arrays.
+
+Exact quantiles select all needed order statistics with a single
+partition pass. Approximate quantiles come from a QuantileSketch, a
+merging t-digest which summarizes any number of values in a few dozen
+centroids and can be merged with the sketches of other series.
+"""
+
+import numpy as np
+
+# number of values sorted and compressed together while building a sketch
+_CHUNK = 1 << 16
+
+
+def check_quantiles(qs):
+    """
+    validates quantiles
+
+    Parameters
+    ----------
+    qs : sequence of quantiles
+
+    Returns
+    -------
+    float array of quantiles, raises ValueError unless all are within [0, 1]
+    """
+    qs = np.asarray(qs, dtype=float)
+    if qs.ndim != 1:
+        raise ValueError('quantiles must be given as a flat sequence')
+    if np.any(np.isnan(qs)) or np.any(qs < 0) or np.any(qs > 1):
+        raise ValueError('quantiles must be within [0, 1]')
+    return qs
+
+
+def quantiles(values, qs):
+    """
+    exact quantiles of an array with linear interpolation between order
+    statistics (like np.quantile), using one partition pass for all of them
+
+    Parameters
+    ----------
+    values : non-empty one dimensional array
+    qs : sequence of quantiles within [0, 1]
+
+    Returns
+    -------
+    array with one quantile per entry of qs, in the dtype of values, all nan
+    if values contain nan (like np.quantile)
+    """
+    qs = check_quantiles(qs)
+    n = len(values)
+    if n == 0:
+        raise ValueError('can not compute quantiles of an empty timeseries')
+    pos = qs * (n - 1)
+    lo = np.floor(pos).astype(np.intp)
+    hi = np.minimum(lo + 1, n - 1)
+    kth = np.concatenate((lo, hi))
+    inexact = np.issubdtype(values.dtype, np.inexact)
+    if inexact:
+        # nan sorts last, partitioning the last position as well moves any nan there
+        kth = np.append(kth, n - 1)
+    # np.partition copies, so the series itself is left untouched
+    part = np.partition(values, np.unique(kth))
+    if inexact and np.isnan(part[-1]):
+        return np.full(len(qs), np.nan, dtype=values.dtype)
+    v0 = part[lo]
+    return (v0 + (part[hi] - v0) * (pos - lo)).astype(values.dtype, copy=False)
+
+
+def _scale(q, compression):
+    """
+    t-digest scale function k1, small clusters at both tails and large ones around the median
+    """
+    return compression / (2 * np.pi) * np.arcsin(2 * q - 1)
+
+
+class QuantileSketch(object):
+    """
+    Mergeable summary of a distribution for approximate quantiles, a merging t-digest.
+
+    Values are kept as weighted centroids. Clusters near the tails are kept
+    small, so extreme quantiles stay accurate, the total number of centroids
+    is bounded by about half the compression. Minimum and maximum are exact.
+
+    Attributes:
+        compression: accuracy parameter, twice the number of centroids kept at most
+        n: number of summarized values
+        min: smallest summarized value
+        max: largest summarized value
+    """
+
+    def __init__(self, compression=100):
+        """
+        initializes an empty sketch
+
+        Parameters
+        ----------
+        compression : accuracy parameter, larger values give more accurate quantiles and larger sketches
+        """
+        if not compression > 0:
+            raise ValueError('compression must be positive')
+        self.compression = compression
+        self.n = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self._means = np.empty(0)
+        self._weights = np.empty(0)
+
+    @classmethod
+    def from_values(cls, values, compression=100):
+        """
+        summarizes an array of values chunk by chunk
+
+        Parameters
+        ----------
+        values : one dimensional array of values
+        compression : accuracy parameter of the sketch
+
+        Returns
+        -------
+        new sketch of the values
+        """
+        sketch = cls(compression)
+        for start in range(0, len(values), _CHUNK):
+            sketch.update(values[start:start + _CHUNK])
+        return sketch
+
+    def update(self, values):
+        """
+        adds values to the sketch
+
+        Parameters
+        ----------
+        values : one dimensional array of values
+        """
+        values = np.asarray(values, dtype=float)
+        if len(values) == 0:
+            return
+        self._absorb(values, np.ones(len(values)), values.min(), values.max())
+
+    def _absorb(self, means, weights, lo, hi):
+        """
+        merges weighted centroids into the sketch and compresses all centroids again
+        """
+        self.n += int(np.sum(weights))
+        self.min = min(self.min, lo)
+        self.max = max(self.max, hi)
+        means = np.concatenate((self._means, means))
+        weights = np.concatenate((self._weights, weights))
+        order = np.argsort(means, kind='stable')
+        means = means[order]
+        weights = weights[order]
+
+        # clusters span at most one unit of the scale function, which is
+        # checked at the quantile of the center of every centroid
+        cum = np.cumsum(weights)
+        center = (cum - weights / 2) / cum[-1]
+        k = _scale(center, self.compression)
+        cluster = np.floor(k - k[0]).astype(np.intp)
+        starts = np.concatenate(([0], np.nonzero(cluster[1:] != cluster[:-1])[0] + 1))
+
+        self._weights = np.add.reduceat(weights, starts)
+        self._means = np.add.reduceat(means * weights, starts) / self._weights
+
+    def merge(self, other):
+        """
+        combines two sketches, e.g. of different series
+
+        Parameters
+        ----------
+        other : sketch to merge with
+
+        Returns
+        -------
+        new sketch summarizing the values of both
+        """
+        merged = QuantileSketch(max(self.compression, other.compression))
+        for sketch in (self, other):
+            if sketch.n > 0:
+                merged._absorb(sketch._means, sketch._weights, sketch.min, sketch.max)
+        return merged
+
+    def __add__(self, other):
+        return self.merge(other)
+
+    def __len__(self):
+        """
+        returns the number of centroids
+        """
+        return len(self._means)
+
+    def quantiles(self, qs):
+        """
+        approximate quantiles
+
+        Parameters
+        ----------
+        qs : sequence of quantiles within [0, 1]
+
+        Returns
+        -------
+        float array with one quantile per entry of qs
+        """
+        qs = check_quantiles(qs)
+        if self.n == 0:
+            raise ValueError('can not compute quantiles of an empty sketch')
+        # every centroid sits at the rank of its center, interpolate linearly in between
+        cum = np.cumsum(self._weights)
+        ranks = np.concatenate(([0], cum - self._weights / 2, [cum[-1]]))
+        means = np.concatenate(([self.min], self._means, [self.max]))
+        return np.interp(qs * self.n, ranks, means)
+
+    def quantile(self, q):
+        """
+        approximate quantile
+
+        Parameters
+        ----------
+        q : quantile within [0, 1]
+
+        Returns
+        -------
+        approximate quantile of the summarized values
+        """
+        return self.quantiles([q])[0]
+
+    def __repr__(self):
+        return '<QuantileSketch n={}, {} centroids>'.format(self.n, len(self))
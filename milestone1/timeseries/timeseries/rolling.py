@@ -0,0 +1,195 @@
+"""
+Rolling-window statistics in O(n) for sized timeseries.
+
+Sums, means and standard deviations of all windows are differences of
+compensated prefix sums. Minima and maxima of fixed-size windows use the
+van Herk/Gil-Werman block scheme, which numpy evaluates in a few passes,
+windows spanning a fixed time use a monotonic deque.
+"""
+
+from collections import deque
+import numpy as np
+
+
+def prefix_sums(x):
+    """
+    prefix sums with compensated summation
+
+    Every addition of the running sum is made error-free (TwoSum), and the
+    accumulated rounding errors are kept as a second, much smaller sum.
+
+    Parameters
+    ----------
+    x : one dimensional float array
+
+    Returns
+    -------
+    (hi, lo) arrays of length len(x) + 1 with sum(x[:i]) == hi[i] + lo[i]
+    up to rounding of the error terms
+    """
+    hi = np.concatenate(([0.0], np.cumsum(x, dtype=float)))
+    a, b, s = hi[:-1], x, hi[1:]
+    bb = s - a
+    err = (a - (s - bb)) + (b - bb)
+    lo = np.concatenate(([0.0], np.cumsum(err)))
+    return hi, lo
+
+
+def window_sums(x, starts):
+    """
+    sums of x[starts[i]:i + 1] for every i
+
+    Parameters
+    ----------
+    x : one dimensional float array
+    starts : first position of the window ending at every position
+
+    Returns
+    -------
+    array of window sums
+    """
+    hi, lo = prefix_sums(x)
+    stops = np.arange(1, len(x) + 1)
+    return (hi[stops] - hi[starts]) + (lo[stops] - lo[starts])
+
+
+def _sliding_extreme(x, window, ufunc, pad):
+    """
+    van Herk/Gil-Werman: extremes of all trailing windows of fixed size
+
+    The array is cut into blocks of window size, a running extreme forward
+    and backward within every block gives the extreme of any window as the
+    combination of one backward and one forward value.
+    """
+    n = len(x)
+    padded = np.concatenate((np.full(window - 1, pad), x))
+    blocks = -(-len(padded) // window)
+    padded = np.concatenate((padded, np.full(blocks * window - len(padded), pad))).reshape(blocks, window)
+    forward = ufunc.accumulate(padded, axis=1).ravel()
+    backward = ufunc.accumulate(padded[:, ::-1], axis=1)[:, ::-1].ravel()
+    return ufunc(backward[:n], forward[window - 1:window - 1 + n])
+
+
+def _deque_extreme(x, starts, keep):
+    """
+    extremes of windows of varying size with a monotonic deque of candidate positions
+
+    keep(a, b) tells whether an older value a stays a candidate next to a newer value b
+    """
+    values = x.tolist()
+    out = np.empty(len(values), dtype=x.dtype)
+    candidates = deque()
+    for i, v in enumerate(values):
+        while candidates and not keep(values[candidates[-1]], v):
+            candidates.pop()
+        candidates.append(i)
+        while candidates[0] < starts[i]:
+            candidates.popleft()
+        out[i] = values[candidates[0]]
+    return out
+
+
+class Rolling(object):
+    """
+    Statistics over a trailing window ending at every point of a timeseries.
+
+    Windows either hold a fixed number of points or all points within a
+    fixed span of time. The first windows are partial, they hold all points
+    since the start of the series. Every statistic is returned as a series
+    on the time points of the original one.
+    """
+
+    def __init__(self, times, values, window, by, wrap):
+        """
+        Parameters
+        ----------
+        times : sorted time points of the timeseries
+        values : values of the timeseries
+        window : number of points (by='count') or span of time (by='time') of the windows
+        by : 'count' for windows of the last window points, 'time' for windows of
+             the points within (t - window, t] for every time point t
+        wrap : function building a series on the original time points from an array of values
+        """
+        if by == 'count':
+            if not isinstance(window, (int, np.integer)) or window < 1:
+                raise ValueError('count windows must hold a positive number of points')
+            self._starts = np.maximum(np.arange(len(values)) - (window - 1), 0)
+        elif by == 'time':
+            if not window > window * 0:
+                raise ValueError('time windows must span a positive time')
+            self._starts = np.searchsorted(times, times - window, side='right')
+        else:
+            raise ValueError("by must be one of 'count' or 'time', not {!r}".format(by))
+        self._window = window
+        self._by = by
+        self._values = values
+        self._wrap = wrap
+
+    def count(self):
+        """
+        Returns
+        -------
+        series of the number of points in every window
+        """
+        return self._wrap(np.arange(1, len(self._values) + 1) - self._starts)
+
+    def sum(self):
+        """
+        Returns
+        -------
+        series of the sum of every window
+        """
+        return self._wrap(window_sums(self._values, self._starts).astype(self._values.dtype, copy=False))
+
+    def mean(self):
+        """
+        Returns
+        -------
+        series of the mean of every window
+        """
+        counts = np.arange(1, len(self._values) + 1) - self._starts
+        return self._wrap((window_sums(self._values, self._starts) / counts).astype(self._values.dtype, copy=False))
+
+    def std(self):
+        """
+        Returns
+        -------
+        series of the (population) standard deviation of every window
+        """
+        x = self._values.astype(float)
+        # shifting by the overall mean keeps the sums of squares small
+        if len(x):
+            x = x - x.mean()
+        counts = np.arange(1, len(x) + 1) - self._starts
+        mean = window_sums(x, self._starts) / counts
+        var = window_sums(x * x, self._starts) / counts - mean * mean
+        # rounding noise would be blown up by the square root where the variance is exactly 0
+        var[counts == 1] = 0
+        return self._wrap(np.sqrt(np.maximum(var, 0)).astype(self._values.dtype, copy=False))
+
+    def _extreme(self, ufunc, pad, keep):
+        """
+        minima or maxima of all windows
+        """
+        if len(self._values) == 0:
+            return self._wrap(self._values.copy())
+        if self._by == 'count':
+            window = min(self._window, len(self._values))
+            return self._wrap(_sliding_extreme(self._values, window, ufunc, pad).astype(self._values.dtype, copy=False))
+        return self._wrap(_deque_extreme(self._values, self._starts, keep))
+
+    def min(self):
+        """
+        Returns
+        -------
+        series of the minimum of every window
+        """
+        return self._extreme(np.minimum, np.inf, lambda old, new: old < new)
+
+    def max(self):
+        """
+        Returns
+        -------
+        series of the maximum of every window
+        """
+        return self._extreme(np.maximum, -np.inf, lambda old, new: old > new)
@@ -0,0 +1,159 @@
+"""
+ArrayTimeSeries in shared memory, for handing series to worker processes without pickling them.
+"""
+
+import threading
+from collections import namedtuple
+from multiprocessing import resource_tracker, shared_memory
+import numpy as np
+from timeseries.ArrayTimeSeries import ArrayTimeSeries
+
+# the value array starts at the first multiple of this after the time array
+_ALIGNMENT = 64
+
+SharedDescriptor = namedtuple('SharedDescriptor', ['name', 'n', 'time_dtype', 'dtype', 'value_offset'])
+SharedDescriptor.__doc__ = """ Picklable address of a series in shared memory, all a worker needs to attach to it """
+
+_tracker_lock = threading.Lock()
+
+
+def _attach_untracked(name):
+    """
+    maps an existing segment without registering it with the resource tracker
+
+    Before python 3.13 every SharedMemory registers its segment with the
+    resource tracker of the process. For a spawned worker that tracker would
+    unlink the segment when the worker exits, a forked worker shares the
+    tracker of the owner, where unregistering would drop the owner's entry.
+    Registration is therefore skipped while attaching.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        pass
+    with _tracker_lock:
+        register = resource_tracker.register
+        resource_tracker.register = lambda name, rtype: None
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+class SharedTimeSeries(object):
+    """
+    Handle to an ArrayTimeSeries whose arrays live in a shared memory segment.
+
+    Ownership and lifetime:
+        create copies a series into a new segment, the returned handle owns
+        it. Workers get the small descriptor (pickled in a few dozen bytes)
+        and attach to the segment without copying. Every handle closes its
+        own mapping, the owner additionally unlinks the segment once all
+        workers are done; the memory is freed when the last mapping is
+        closed. Using the handles as context managers does both.
+
+    Read-only semantics:
+        The time axis is always read-only. Attached series are read-only
+        too unless attached with writable=True, writes are then seen by all
+        processes without any synchronization, and their cached statistics
+        are not invalidated in other processes.
+
+    Before closing a handle, drop its series and everything viewing its
+    arrays, closing raises BufferError otherwise.
+
+    >>> with SharedTimeSeries.create(ArrayTimeSeries([0, 1], [1.0, 2.0])) as shared:
+    ...     with SharedTimeSeries.attach(shared.descriptor) as worker:
+    ...         print(worker.series.mean())
+    1.5
+    """
+
+    def __init__(self, shm, descriptor, owner, writable):
+        """
+        wraps a mapped segment, use create or attach instead
+
+        Parameters
+        ----------
+        shm : the mapped SharedMemory segment
+        descriptor : layout of the series in the segment
+        owner : whether this handle unlinks the segment
+        writable : whether the values of the series may be written
+        """
+        self._shm = shm
+        self.descriptor = descriptor
+        self.owner = owner
+        n = descriptor.n
+        times = np.ndarray(n, dtype=descriptor.time_dtype, buffer=shm.buf, offset=0)
+        values = np.ndarray(n, dtype=descriptor.dtype, buffer=shm.buf, offset=descriptor.value_offset)
+        values.flags.writeable = writable
+        self.series = ArrayTimeSeries._from_arrays(times, values)
+
+    @classmethod
+    def create(cls, ts):
+        """
+        copies a series into a new shared memory segment
+
+        Parameters
+        ----------
+        ts : the ArrayTimeSeries to share
+
+        Returns
+        -------
+        owning handle, its series is writable
+        """
+        times = ts.times()
+        values = ts.values()
+        value_offset = -(-times.nbytes // _ALIGNMENT) * _ALIGNMENT
+        # segments can not be empty
+        size = max(value_offset + values.nbytes, 1)
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        descriptor = SharedDescriptor(shm.name, len(times), times.dtype.str, values.dtype.str, value_offset)
+
+        handle = cls(shm, descriptor, owner=True, writable=True)
+        # the time axis is copied before freezing, the view handed out is read-only
+        np.ndarray(len(times), dtype=times.dtype, buffer=shm.buf)[:] = times
+        handle.series.values()[:] = values
+        return handle
+
+    @classmethod
+    def attach(cls, descriptor, writable=False):
+        """
+        maps a series created in another process without copying it
+
+        Parameters
+        ----------
+        descriptor : the SharedDescriptor of the owning handle
+        writable : whether the values of the series may be written
+
+        Returns
+        -------
+        non-owning handle, closing it leaves the segment to the owner
+        """
+        return cls(_attach_untracked(descriptor.name), descriptor, owner=False, writable=writable)
+
+    def close(self):
+        """
+        unmaps the segment in this process, the series can not be used afterwards
+        """
+        self.series = None
+        self._shm.close()
+
+    def unlink(self):
+        """
+        frees the segment once every process closed it, only the owner may do so
+        """
+        if not self.owner:
+            raise PermissionError('only the owner of a shared time series may unlink it')
+        self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        if self.owner:
+            self.unlink()
+        return False
+
+    def __repr__(self):
+        return '<SharedTimeSeries {} n={}{}>'.format(self.descriptor.name, self.descriptor.n,
+                                                     ' (owner)' if self.owner else '')